@@ -0,0 +1,148 @@
+# Typeahead suggestions for skills, locations and roles, served from an in-process prefix index.
+import heapq
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, List, Literal, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from models import JobPost, User
+from utils import split_csv
+
+AutocompleteField = Literal["skills", "location", "role"]
+FIELDS: Tuple[str, ...] = ("skills", "location", "role")
+MAX_SUGGESTIONS = 20
+# Prefixes up to this long match most of the index; their top suggestions are kept until a write touches them.
+SHORT_PREFIX_LENGTH = 2
+_MAX_TERM_LENGTH = 120  # As in utils.skill_tokens.
+
+Terms = Dict[str, Dict[str, str]]  # field -> {normalized key: display spelling}
+
+
+def normalize_term(value: str) -> str:
+    return " ".join(value.split()).lower()[:_MAX_TERM_LENGTH]
+
+
+def row_terms(skills: Optional[str], location: Optional[str], role) -> Terms:
+    # Distinct terms of one profile or job post; the first spelling of a key is the one suggested.
+    terms: Terms = {field: {} for field in FIELDS}
+    for skill in split_csv(skills):
+        terms["skills"].setdefault(normalize_term(skill), " ".join(skill.split()))
+    if location and location.strip():
+        terms["location"][normalize_term(location)] = " ".join(location.split())
+    if role is not None:
+        value = getattr(role, "value", role)
+        terms["role"][value] = value
+    return terms
+
+
+class PrefixIndex:
+    """Distinct normalized values per field in a sorted list, with the number of profiles and job posts using each.
+
+    A prefix is a contiguous slice of the sorted keys (two bisects) and suggestions are that slice's most frequent
+    keys, so a lookup costs the number of distinct values sharing the prefix, not the number of rows.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._keys: Dict[str, List[str]] = {field: [] for field in FIELDS}
+        self._counts: Dict[str, Dict[str, int]] = {field: {} for field in FIELDS}
+        self._display: Dict[str, Dict[str, str]] = {field: {} for field in FIELDS}
+        self._rows: Dict[Tuple[str, int], Terms] = {}
+        self._short: Dict[Tuple[str, str], List[Tuple[str, int]]] = {}
+        self.built = False
+
+    def build(self, db: Session) -> None:
+        users = db.execute(select(User.id, User.skills, User.location, User.role))
+        posts = db.execute(select(JobPost.id, JobPost.skills, JobPost.location, JobPost.role))
+        with self._lock:
+            self._clear()
+            for kind, rows in (("user", users), ("job", posts)):
+                for row_id, skills, location, role in rows:
+                    self._add((kind, row_id), row_terms(skills, location, role), keep_sorted=False)
+            for field in FIELDS:
+                self._keys[field] = sorted(self._counts[field])
+            self.built = True
+
+    def reset(self) -> None:
+        with self._lock:
+            self._clear()
+            self.built = False
+
+    def upsert(self, kind: str, row_id: int, skills: Optional[str], location: Optional[str], role) -> None:
+        if not self.built:
+            return  # The first build() will read the row from the database.
+        terms = row_terms(skills, location, role)
+        with self._lock:
+            self._remove((kind, row_id))
+            self._add((kind, row_id), terms)
+
+    def suggest(self, field: str, prefix: str, limit: int = 10) -> List[Tuple[str, int]]:
+        # (display value, count) pairs, most used first; ties in alphabetical order.
+        key = normalize_term(prefix)
+        with self._lock:
+            if len(key) > SHORT_PREFIX_LENGTH:
+                return self._top(field, key, limit)
+            top = self._short.get((field, key))
+            if top is None:
+                top = self._short[(field, key)] = self._top(field, key, MAX_SUGGESTIONS)
+            return top[:limit]
+
+    def _top(self, field: str, key: str, limit: int) -> List[Tuple[str, int]]:
+        keys, counts, display = self._keys[field], self._counts[field], self._display[field]
+        start = bisect_left(keys, key)
+        end = bisect_left(keys, key + "\U0010ffff", start)
+        # nlargest is stable, so equal counts keep the slice's alphabetical order.
+        return [(display[match], counts[match]) for match in heapq.nlargest(limit, keys[start:end], key=counts.get)]
+
+    def _add(self, row: Tuple[str, int], terms: Terms, keep_sorted: bool = True) -> None:
+        self._rows[row] = terms
+        for field, values in terms.items():
+            counts = self._counts[field]
+            for key, spelling in values.items():
+                if key in counts:
+                    counts[key] += 1
+                else:
+                    counts[key] = 1
+                    self._display[field][key] = spelling
+                    if keep_sorted:
+                        insort(self._keys[field], key)
+                self._forget(field, key)
+
+    def _remove(self, row: Tuple[str, int]) -> None:
+        for field, values in self._rows.pop(row, {}).items():
+            counts, keys = self._counts[field], self._keys[field]
+            for key in values:
+                counts[key] -= 1
+                if not counts[key]:
+                    del counts[key], self._display[field][key]
+                    del keys[bisect_left(keys, key)]
+                self._forget(field, key)
+
+    def _forget(self, field: str, key: str) -> None:
+        for length in range(min(len(key), SHORT_PREFIX_LENGTH) + 1):
+            self._short.pop((field, key[:length]), None)
+
+    def _clear(self) -> None:
+        for field in FIELDS:
+            self._keys[field] = []
+            self._counts[field].clear()
+            self._display[field].clear()
+        self._rows.clear()
+        self._short.clear()
+
+
+autocomplete_index = PrefixIndex()
+
+
+def ensure_autocomplete_index(db: Session) -> PrefixIndex:
+    if not autocomplete_index.built:
+        autocomplete_index.build(db)
+    return autocomplete_index
+
+
+def index_user_terms(user: User) -> None:
+    autocomplete_index.upsert("user", user.id, user.skills, user.location, user.role)
+
+
+def index_job_post_terms(post: JobPost) -> None:
+    autocomplete_index.upsert("job", post.id, post.skills, post.location, post.role)
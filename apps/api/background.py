@@ -0,0 +1,159 @@
+# Background task handlers: email notifications and per-user match refreshes, queued by the write paths.
+import logging
+import os
+import smtplib
+import time
+from email.message import EmailMessage
+from typing import List, Optional
+from urllib.parse import urlencode
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session, aliased
+from db import SessionLocal
+from matching import MATCH_TOP_K, ensure_index, skill_index
+from models import JobApplication, JobPost, User, UserMatch
+from security import PASSWORD_RESET_TTL_SECONDS, issue_reset_token
+from tasks import task
+
+logger = logging.getLogger(__name__)
+
+SMTP_HOST = os.getenv("SMTP_HOST")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_USER = os.getenv("SMTP_USER")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+MAIL_FROM = os.getenv("MAIL_FROM", "LaunchCircle <no-reply@launchcircle.dev>")
+WEB_BASE_URL = os.getenv("WEB_BASE_URL", "http://localhost:3000")
+DIGEST_NAMES = 10  # Applicants named in a bulk-import digest; the rest are counted.
+
+# Inside the API the match index is the one the write paths keep current. A standalone worker only sees the
+# users its own tasks touch, so worker.py sets this to rebuild its copy periodically.
+index_max_age_seconds: Optional[float] = None
+_index_built_at = 0.0
+
+
+def send_email(to: str, subject: str, body: str) -> None:
+    if not SMTP_HOST:
+        logger.info("email to %s: %s", to, subject)  # No SMTP server configured (local and test runs).
+        return
+    message = EmailMessage()
+    message["From"], message["To"], message["Subject"] = MAIL_FROM, to, subject
+    message.set_content(body)
+    with smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=10) as smtp:
+        smtp.starttls()
+        if SMTP_USER:
+            smtp.login(SMTP_USER, SMTP_PASSWORD or "")
+        smtp.send_message(message)
+
+
+@task("send_password_reset")
+def send_password_reset(email: str) -> None:
+    with SessionLocal() as db:
+        user = db.execute(select(User.id, User.name, User.version).where(User.email == email)).first()
+    if user is None:
+        return  # The endpoint answers the same either way, so addresses can't be probed.
+    # Only the signed, expiring, single-use token goes in the link; the address alone proves nothing.
+    link = f"{WEB_BASE_URL}/reset-password?{urlencode({'token': issue_reset_token(user.id, user.version)})}"
+    minutes = PASSWORD_RESET_TTL_SECONDS // 60
+    body = f"Hi {user.name},\n\nChoose a new password here (the link works once, for {minutes} minutes): {link}\n"
+    send_email(email, "Reset your LaunchCircle password", body)
+
+
+@task("notify_application")
+def notify_application(application_id: int) -> None:
+    # Tells the job owner about a new applicant.
+    owner, applicant = aliased(User), aliased(User)
+    with SessionLocal() as db:
+        row = db.execute(
+            select(owner.email, owner.name, applicant.name.label("applicant_name"), JobPost.id, JobPost.title)
+            .select_from(JobApplication)
+            .join(JobPost, JobPost.id == JobApplication.job_post_id)
+            .join(owner, owner.id == JobPost.owner_id)
+            .join(applicant, applicant.id == JobApplication.applicant_id)
+            .where(JobApplication.id == application_id)
+        ).first()
+    if row is None or not row.email:
+        return
+    link = f"{WEB_BASE_URL}/jobs/{row.id}"
+    body = f"Hi {row.name},\n\n{row.applicant_name} applied to {row.title}.\n\nReview applicants: {link}\n"
+    send_email(row.email, f"New applicant for {row.title}", body)
+
+
+@task("notify_application_status")
+def notify_application_status(application_id: int) -> None:
+    with SessionLocal() as db:
+        row = db.execute(
+            select(User.email, User.name, JobPost.title, JobApplication.status)
+            .select_from(JobApplication)
+            .join(JobPost, JobPost.id == JobApplication.job_post_id)
+            .join(User, User.id == JobApplication.applicant_id)
+            .where(JobApplication.id == application_id)
+        ).first()
+    if row is None or not row.email:
+        return
+    body = f"Hi {row.name},\n\nYour application to {row.title} is now {row.status.value}.\n"
+    send_email(row.email, f"Update on your application to {row.title}", body)
+
+
+@task("notify_applications")
+def notify_applications(job_post_id: int, application_ids: List[int]) -> None:
+    # One digest to the job owner for a bulk import, instead of an email per row.
+    with SessionLocal() as db:
+        post = db.execute(
+            select(User.email, User.name, JobPost.title)
+            .select_from(JobPost)
+            .join(User, User.id == JobPost.owner_id)
+            .where(JobPost.id == job_post_id)
+        ).first()
+        if post is None or not post.email:
+            return
+        names = db.execute(
+            select(User.name)
+            .join(JobApplication, JobApplication.applicant_id == User.id)
+            .where(JobApplication.id.in_(application_ids[:DIGEST_NAMES]))
+            .order_by(JobApplication.id)
+        ).scalars().all()
+    if not names:
+        return
+    listed = ", ".join(names[:DIGEST_NAMES])
+    if len(application_ids) > DIGEST_NAMES:
+        listed += f" and {len(application_ids) - DIGEST_NAMES} more"
+    link = f"{WEB_BASE_URL}/jobs/{job_post_id}"
+    body = f"Hi {post.name},\n\n{listed} applied to {post.title}.\n\nReview applicants: {link}\n"
+    send_email(post.email, f"{len(application_ids)} new applicants for {post.title}", body)
+
+
+@task("refresh_user_matches")
+def refresh_user_matches(user_id: int) -> None:
+    """Stores the user's top matches right away, instead of serving live ones until the next batch run."""
+    with SessionLocal() as db:
+        _refresh_matches(db, user_id)
+        db.commit()
+
+
+@task("refresh_user_matches_batch")
+def refresh_user_matches_batch(user_ids: List[int]) -> None:
+    # Queued by bulk imports, one task per chunk of users.
+    with SessionLocal() as db:
+        for user_id in user_ids:
+            _refresh_matches(db, user_id)
+        db.commit()
+
+
+def _refresh_matches(db: Session, user_id: int) -> None:
+    global _index_built_at
+    if index_max_age_seconds is not None and time.monotonic() - _index_built_at > index_max_age_seconds:
+        skill_index.reset()
+    if not skill_index.built:
+        _index_built_at = time.monotonic()
+    index = ensure_index(db)
+    user = db.execute(select(User.skills, User.preferences).where(User.id == user_id)).first()
+    db.execute(delete(UserMatch).where(UserMatch.user_id == user_id))
+    if user is None:
+        index.remove(user_id)
+        return
+    index.upsert(user_id, user.skills, user.preferences)
+    rows = [
+        {"user_id": user_id, "rank": rank, "candidate_id": candidate_id, "score": score}
+        for rank, (score, candidate_id) in enumerate(index.top_matches(user_id, MATCH_TOP_K))
+    ]
+    if rows:
+        db.execute(insert(UserMatch), rows)
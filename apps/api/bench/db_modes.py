@@ -0,0 +1,82 @@
+# Throughput of the sync (threadpool) vs async (AsyncSession) database modes under concurrent load.
+#
+#   python bench/db_modes.py --requests 2000 --concurrency 64
+#
+# Runs the app in-process over ASGI against DATABASE_URL (default: a scratch SQLite file), with the
+# response cache off so every request reaches the database.
+import argparse
+import asyncio
+import os
+import pathlib
+import statistics
+import sys
+import tempfile
+import time
+
+API_DIR = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(API_DIR))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.gettempdir()}/launchcircle_bench.db")
+os.environ["CACHE_BACKEND"] = "off"
+
+import httpx  # noqa: E402
+import db  # noqa: E402
+from main import app  # noqa: E402
+
+ROUTES = ("/api/users?limit=20", "/api/jobs?limit=20", "/api/users/1", "/api/jobs/1", "/api/jobs/1/applications")
+
+
+async def _run_mode(mode: str, requests: int, concurrency: int) -> dict:
+    if mode == "async":
+        app.dependency_overrides.update(db.ASYNC_OVERRIDES)
+    else:
+        for dependency in db.ASYNC_OVERRIDES:
+            app.dependency_overrides.pop(dependency, None)
+
+    latencies: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def one(i: int) -> None:
+            async with semaphore:
+                started = time.perf_counter()
+                res = await client.get(ROUTES[i % len(ROUTES)])
+                latencies.append(time.perf_counter() - started)
+                res.raise_for_status()
+
+        await asyncio.gather(*(one(i) for i in range(min(requests, concurrency))))  # Warm pools and caches.
+        latencies.clear()
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - started
+
+    await db.dispose_async_engine()
+    latencies.sort()
+    return {
+        "mode": mode,
+        "requests": requests,
+        "concurrency": concurrency,
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare sync and async database modes.")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    db.init_db(seed=True)
+    for mode in ("sync", "async"):
+        result = asyncio.run(_run_mode(mode, args.requests, args.concurrency))
+        print(
+            f"{result['mode']:>5}: {result['throughput_rps']:>8} req/s  "
+            f"p50 {result['p50_ms']} ms  p95 {result['p95_ms']} ms  "
+            f"({result['requests']} requests, concurrency {result['concurrency']})"
+        )
+
+
+if __name__ == "__main__":
+    main()
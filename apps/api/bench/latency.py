@@ -0,0 +1,350 @@
+# Per-route latency benchmark: drives every API route in-process and writes p50/p95/p99, throughput and
+# SQL statement counts to a JSON file so runs can be compared across commits.
+#
+#   python bench/latency.py --users 50000 --job-posts 10000 --applications 200000 --requests 500 --concurrency 16
+#   python bench/latency.py --routes users.list,jobs.get   # only some routes
+#
+# Runs against DATABASE_URL (default: a scratch SQLite file), topped up with synthetic rows from seed.py until
+# it holds at least the requested volumes. The response cache is off unless --cache is given.
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+API_DIR = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(API_DIR))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.gettempdir()}/launchcircle_latency.db")
+if "--cache" not in sys.argv:
+    os.environ["CACHE_BACKEND"] = "off"
+
+import httpx  # noqa: E402
+from fastapi.routing import APIRoute  # noqa: E402
+from sqlalchemy import event, func, select  # noqa: E402
+import db  # noqa: E402
+from main import app  # noqa: E402
+from models import JobPost, RoleType, User  # noqa: E402
+from seed import seed_synthetic  # noqa: E402
+
+
+@dataclass
+class Fixtures:
+    # Ids sampled from the database so requests hit real rows.
+    user_ids: List[int]
+    talent_ids: List[int]
+    owner_ids: List[int]
+    job_ids: List[int]
+    run: str  # Unique per run, keeps generated emails from colliding with earlier runs.
+
+
+@dataclass
+class RouteCase:
+    name: str
+    method: str
+    path: str  # Route template, matched against app.routes to report coverage.
+    build: Callable[[Fixtures, int], dict]  # -> httpx request kwargs for the i-th request
+
+
+def _pick(ids: List[int], i: int) -> int:
+    return ids[(i * 7919) % len(ids)]
+
+
+def _user_payload(fx: Fixtures, i: int) -> dict:
+    return {
+        "name": f"Bench {i}",
+        "email": f"bench-{fx.run}-{i}@example.com",
+        "role": "software_engineer",
+        "skills": ["Python", "SQL"],
+        "location": "Remote",
+    }
+
+
+def _job_payload(fx: Fixtures, i: int) -> dict:
+    return {
+        "title": f"Bench role {i}",
+        "role": "software_engineer",
+        "skills": ["Python"],
+        "work_style": "remote",
+        "owner_id": _pick(fx.owner_ids, i),
+    }
+
+
+CASES = [
+    RouteCase("users.list", "GET", "/api/users", lambda fx, i: {"url": "/api/users", "params": {"limit": 20}}),
+    RouteCase(
+        "users.list_filtered",
+        "GET",
+        "/api/users",
+        lambda fx, i: {"url": "/api/users", "params": {"skills": "python", "location": "remote", "view": "card"}},
+    ),
+    RouteCase("users.search", "GET", "/api/users", lambda fx, i: {"url": "/api/users", "params": {"q": "react"}}),
+    RouteCase("users.get", "GET", "/api/users/{user_id}", lambda fx, i: {"url": f"/api/users/{_pick(fx.user_ids, i)}"}),
+    RouteCase(
+        "users.matches",
+        "GET",
+        "/api/users/{user_id}/matches",
+        lambda fx, i: {"url": f"/api/users/{_pick(fx.user_ids, i)}/matches"},
+    ),
+    RouteCase("users.create", "POST", "/api/users", lambda fx, i: {"url": "/api/users", "json": _user_payload(fx, i)}),
+    RouteCase(
+        "users.update",
+        "PUT",
+        "/api/users/{user_id}",
+        lambda fx, i: {"url": f"/api/users/{_pick(fx.user_ids, i)}", "json": {"headline": f"Updated {i}"}},
+    ),
+    RouteCase(
+        "users.bulk",
+        "POST",
+        "/api/users/bulk",
+        lambda fx, i: {
+            "url": "/api/users/bulk",
+            "json": [_user_payload(fx, 1_000_000 + i * 100 + n) for n in range(100)],
+        },
+    ),
+    RouteCase("jobs.list", "GET", "/api/jobs", lambda fx, i: {"url": "/api/jobs", "params": {"limit": 20}}),
+    RouteCase(
+        "jobs.list_filtered",
+        "GET",
+        "/api/jobs",
+        lambda fx, i: {"url": "/api/jobs", "params": {"skills": "python", "work_style": "remote"}},
+    ),
+    RouteCase("jobs.get", "GET", "/api/jobs/{job_id}", lambda fx, i: {"url": f"/api/jobs/{_pick(fx.job_ids, i)}"}),
+    RouteCase("jobs.create", "POST", "/api/jobs", lambda fx, i: {"url": "/api/jobs", "json": _job_payload(fx, i)}),
+    RouteCase(
+        "jobs.update",
+        "PUT",
+        "/api/jobs/{job_id}",
+        lambda fx, i: {"url": f"/api/jobs/{_pick(fx.job_ids, i)}", "json": {"compensation": f"Bench {i}"}},
+    ),
+    RouteCase(
+        "jobs.bulk",
+        "POST",
+        "/api/jobs/bulk",
+        lambda fx, i: {"url": "/api/jobs/bulk", "json": [_job_payload(fx, i * 100 + n) for n in range(100)]},
+    ),
+    RouteCase(
+        "jobs.apply",
+        "POST",
+        "/api/jobs/{job_id}/apply",
+        lambda fx, i: {
+            "url": f"/api/jobs/{_pick(fx.job_ids, i)}/apply",
+            "json": {"job_post_id": _pick(fx.job_ids, i), "applicant_id": _pick(fx.talent_ids, i + 1)},
+        },
+    ),
+    RouteCase(
+        "jobs.applications_bulk",
+        "POST",
+        "/api/jobs/{job_id}/applications/bulk",
+        lambda fx, i: {
+            "url": f"/api/jobs/{_pick(fx.job_ids, i)}/applications/bulk",
+            "json": [{"applicant_id": _pick(fx.talent_ids, i * 100 + n)} for n in range(100)],
+        },
+    ),
+    RouteCase(
+        "jobs.applications",
+        "GET",
+        "/api/jobs/{job_id}/applications",
+        lambda fx, i: {"url": f"/api/jobs/{_pick(fx.job_ids, i)}/applications"},
+    ),
+    RouteCase(
+        "autocomplete.skills",
+        "GET",
+        "/api/autocomplete",
+        lambda fx, i: {"url": "/api/autocomplete", "params": {"field": "skills", "prefix": "py"[: 1 + i % 2]}},
+    ),
+    RouteCase(
+        "autocomplete.location",
+        "GET",
+        "/api/autocomplete",
+        lambda fx, i: {"url": "/api/autocomplete", "params": {"field": "location", "prefix": "san f"}},
+    ),
+    RouteCase(
+        "auth.signup",
+        "POST",
+        "/api/auth/signup",
+        lambda fx, i: {
+            "url": "/api/auth/signup",
+            "json": {"name": "Bench", "email": f"signup-{fx.run}-{i}@example.com", "password": "pw", "role": "founder"},
+        },
+    ),
+    RouteCase(
+        "auth.login",
+        "POST",
+        "/api/auth/login",
+        lambda fx, i: {"url": "/api/auth/login", "json": {"email": "ava@launchcircle.dev", "password": "wrong"}},
+    ),
+    RouteCase(
+        "auth.forgot",
+        "POST",
+        "/api/auth/forgot",
+        lambda fx, i: {"url": "/api/auth/forgot", "json": {"email": "ava@launchcircle.dev"}},
+    ),
+    RouteCase(
+        "export.users",
+        "GET",
+        "/api/export/users",
+        lambda fx, i: {"url": "/api/export/users", "params": {"after_id": _pick(fx.user_ids, i), "role": "founder"}},
+    ),
+    RouteCase(
+        "export.jobs",
+        "GET",
+        "/api/export/jobs",
+        lambda fx, i: {"url": "/api/export/jobs", "params": {"format": "csv", "work_style": "remote"}},
+    ),
+    RouteCase(
+        "export.applications",
+        "GET",
+        "/api/export/applications",
+        lambda fx, i: {"url": "/api/export/applications", "params": {"job_post_id": _pick(fx.job_ids, i)}},
+    ),
+]
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    # Nearest-rank percentile.
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+async def _run_case(client: httpx.AsyncClient, case: RouteCase, fx: Fixtures, requests: int, concurrency: int) -> dict:
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    statements = 0
+
+    def _count(*_args) -> None:
+        nonlocal statements
+        statements += 1
+
+    async def worker(offset: int) -> None:
+        for i in range(offset, requests, concurrency):
+            started = time.perf_counter()
+            res = await client.request(case.method, **case.build(fx, i))
+            latencies.append(time.perf_counter() - started)
+            if res.status_code >= 400:
+                errors[str(res.status_code)] = errors.get(str(res.status_code), 0) + 1
+
+    event.listen(db.engine, "before_cursor_execute", _count)
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+    finally:
+        elapsed = time.perf_counter() - started
+        event.remove(db.engine, "before_cursor_execute", _count)
+
+    latencies.sort()
+    return {
+        "method": case.method,
+        "path": case.path,
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+        "statements_per_request": round(statements / requests, 2),
+    }
+
+
+def _prepare(users: int, job_posts: int, applications: int) -> Fixtures:
+    db.init_db(seed=True)
+    with db.SessionLocal() as session:
+        have_users = session.execute(select(func.count(User.id))).scalar()
+        have_posts = session.execute(select(func.count(JobPost.id))).scalar()
+        missing = (max(0, users - have_users), max(0, job_posts - have_posts))
+        if any(missing):
+            seed_synthetic(session, users=missing[0], job_posts=missing[1], applications=applications)
+        providers = (RoleType.founder, RoleType.job_provider)
+        return Fixtures(
+            user_ids=list(session.execute(select(User.id).limit(5000)).scalars()),
+            talent_ids=list(session.execute(select(User.id).where(User.role.not_in(providers)).limit(5000)).scalars()),
+            owner_ids=list(session.execute(select(User.id).where(User.role.in_(providers)).limit(5000)).scalars()),
+            job_ids=list(session.execute(select(JobPost.id).limit(5000)).scalars()),
+            run=uuid.uuid4().hex[:8],
+        )
+
+
+def _uncovered_routes(cases: List[RouteCase]) -> List[str]:
+    covered = {(case.method, case.path) for case in cases}
+    return sorted(
+        f"{method} {route.path}"
+        for route in app.routes
+        if isinstance(route, APIRoute) and route.path.startswith("/api/") and "/cache/" not in route.path
+        for method in route.methods
+        if (method, route.path) not in covered and route.path not in ("/api/health", "/api/info")
+    )
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=API_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def _run(cases: List[RouteCase], fx: Fixtures, requests: int, concurrency: int) -> Dict[str, dict]:
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for case in cases:
+            await client.request(case.method, **case.build(fx, requests))  # Warm-up, not measured.
+            results[case.name] = await _run_case(client, case, fx, requests, concurrency)
+            result = results[case.name]
+            print(
+                f"{case.name:<24} p50 {result['p50_ms']:>8} ms  p95 {result['p95_ms']:>8} ms  "
+                f"p99 {result['p99_ms']:>8} ms  {result['throughput_rps']:>8} req/s  "
+                f"{result['statements_per_request']:>6} stmts/req  errors {result['errors'] or '-'}"
+            )
+    await db.dispose_async_engine()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark every API route in-process.")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--job-posts", type=int, default=200)
+    parser.add_argument("--applications", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per route")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--routes", help="Comma-separated case names (default: all)")
+    parser.add_argument("--cache", action="store_true", help="Keep the response cache on")
+    parser.add_argument("--output", type=pathlib.Path, help="JSON file (default: bench/results/latency-<commit>.json)")
+    args = parser.parse_args()
+
+    cases = [case for case in CASES if not args.routes or case.name in args.routes.split(",")]
+    uncovered = _uncovered_routes(CASES)
+    if uncovered:
+        print(f"warning: no benchmark case for {', '.join(uncovered)}", file=sys.stderr)
+
+    fx = _prepare(args.users, args.job_posts, args.applications)
+    routes = asyncio.run(_run(cases, fx, args.requests, args.concurrency))
+
+    commit = _git_commit()
+    output = args.output or API_DIR / "bench" / "results" / f"latency-{commit or 'local'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        "commit": commit,
+        "recorded_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "database": db.engine.dialect.name,
+        "db_mode": db.DB_MODE,
+        "cache": args.cache,
+        "dataset": {"users": args.users, "job_posts": args.job_posts, "applications": args.applications},
+        "requests_per_route": args.requests,
+        "concurrency": args.concurrency,
+        "routes": routes,
+    }
+    output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# Per-row cost of turning list results into a JSON body: FastAPI's response_model path vs responses.json_list_response.
+#
+#   python bench/serialization.py --rows 5000 --repeat 5
+#
+# "before" is what a list endpoint did when it returned the schema objects: FastAPI re-validates them against
+# the response_model, dumps them to Python and JSONResponse encodes them with json.dumps. "after" encodes the
+# same objects once in pydantic-core. Both columns include building the objects from ORM-shaped rows; for
+# UserOut "before" also validates the stored email as EmailStr, as the schema used to.
+import argparse
+import asyncio
+import datetime
+import json
+import pathlib
+import sys
+import time
+from types import SimpleNamespace
+from typing import Callable, List, Optional
+
+API_DIR = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(API_DIR))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_model_field  # noqa: E402
+from crud import _application_to_schema, _job_post_to_schema  # noqa: E402
+from models import ApplicationStatus, RoleType  # noqa: E402
+from responses import json_list_response  # noqa: E402
+from pydantic import EmailStr  # noqa: E402
+from schemas import JobApplicationOut, JobPostOut, UserOut  # noqa: E402
+
+CREATED = datetime.datetime(2025, 1, 1, 12, 0, 0)
+
+
+def _user_row(i: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=i,
+        name=f"User {i}",
+        email=f"user{i}@example.com",
+        headline="Full-stack engineer building developer tools",
+        bio="Ten years of shipping web products, most recently as the first engineer at a seed-stage startup.",
+        role=RoleType.software_engineer,
+        location="Berlin",
+        time_zone="Europe/Berlin",
+        availability="Part-time",
+        experience="Senior",
+        startups="Two seed-stage exits",
+        profile_photo=None,
+        resume_url=None,
+        preferences={"remote": True},
+        looking_for_cofounder=bool(i % 2),
+        skills="python,react,postgres,aws,typescript",
+        portfolio="https://example.com,https://github.com/example",
+        created_at=CREATED,
+        updated_at=CREATED,
+        version=1,
+    )
+
+
+def _job_post_row(i: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=i,
+        owner_id=i % 97 + 1,
+        owner=SimpleNamespace(name=f"Founder {i % 97}"),
+        title="Founding engineer",
+        headline="Own the product end to end",
+        description="We are a small team building scheduling software for clinics and need a generalist.",
+        role=RoleType.software_engineer,
+        skills="python,react,postgres",
+        location="Remote",
+        time_zone="UTC",
+        work_style="remote",
+        availability="Full-time",
+        timeline="3 months",
+        compensation="Equity + salary",
+        created_at=CREATED,
+        updated_at=CREATED,
+        version=1,
+        applications_count=3,
+        applied_count=2,
+        reviewed_count=1,
+        interviewing_count=0,
+        rejected_count=0,
+        accepted_count=0,
+    )
+
+
+def _application_row(i: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=i,
+        job_post_id=i % 50 + 1,
+        applicant_id=i % 500 + 1,
+        applicant=SimpleNamespace(name=f"Applicant {i}"),
+        job_post=SimpleNamespace(title="Founding engineer"),
+        status=ApplicationStatus.applied,
+        cover_letter="I have built two scheduling products and would love to help.",
+        created_at=CREATED,
+    )
+
+
+class _EmailCheckedUserOut(UserOut):
+    email: Optional[EmailStr] = None
+
+
+# name -> (row factory, before: (schema, row -> object), after: row -> object)
+CASES = {
+    "UserOut": (_user_row, (_EmailCheckedUserOut, _EmailCheckedUserOut.model_validate), UserOut.model_validate),
+    "JobPostOut": (_job_post_row, (JobPostOut, _job_post_to_schema), _job_post_to_schema),
+    "JobApplicationOut": (_application_row, (JobApplicationOut, _application_to_schema), _application_to_schema),
+}
+
+
+def _before(schema, to_schema: Callable, rows: List) -> bytes:
+    field = create_model_field(name="Response", type_=list[schema], mode="serialization")
+    items = [to_schema(row) for row in rows]
+    content = asyncio.run(serialize_response(field=field, response_content=items, is_coroutine=True))
+    return JSONResponse(content).body
+
+
+def _after(to_schema: Callable, rows: List) -> bytes:
+    return json_list_response([to_schema(row) for row in rows]).body
+
+
+def _per_row_us(run: Callable[[], bytes], rows: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+    return best / rows * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5, help="Best of this many runs is reported")
+    args = parser.parse_args()
+
+    print(f"{'schema':<20}{'before µs/row':>15}{'after µs/row':>15}{'speedup':>10}")
+    for name, (make_row, (schema, old_to_schema), to_schema) in CASES.items():
+        rows = [make_row(i) for i in range(1, args.rows + 1)]
+        assert json.loads(_before(schema, old_to_schema, rows)) == json.loads(_after(to_schema, rows))
+        before = _per_row_us(lambda: _before(schema, old_to_schema, rows), args.rows, args.repeat)
+        after = _per_row_us(lambda: _after(to_schema, rows), args.rows, args.repeat)
+        print(f"{name:<20}{before:>15.1f}{after:>15.1f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# The SQLite production profile (sqlite_profile.py) against the default SQLite configuration, under concurrent reads
+# and read-then-write transactions on the same file.
+#
+#   python bench/sqlite_profile.py --writers 8 --readers 16 --seconds 5
+#
+# Each profile gets a fresh database file with --users profiles. Writers run the shape of the API's write paths
+# (a SELECT, then an UPDATE, then COMMIT); readers page through the newest profiles like GET /api/users. The default
+# configuration shares one engine, as the API does without the profile; the production profile sends writes to its
+# single writer connection and reads to the reader pool.
+import argparse
+import os
+import pathlib
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+API_DIR = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(API_DIR))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.gettempdir()}/launchcircle_bench.db")
+
+from sqlalchemy import insert, select, update  # noqa: E402
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeout  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+import db  # noqa: E402
+from crud import USER_CARD_COLUMNS  # noqa: E402
+from models import Base, RoleType, User  # noqa: E402
+
+
+def _engines(path: pathlib.Path, profile: str):
+    url = f"sqlite:///{path}"
+    writer = db._create_engine(url, profile=profile)
+    reader = db._create_engine(url, role="reader", profile=profile) if profile == "production" else writer
+    return writer, reader
+
+
+def _seed(writer, users: int) -> None:
+    Base.metadata.create_all(writer)
+    rows = [{"name": f"Bench User {i}", "role": RoleType.software_engineer, "skills": "python"} for i in range(users)]
+    with Session(writer) as session:
+        session.execute(insert(User), rows)
+        session.commit()
+
+
+def _write(writer, users: int, rng: random.Random) -> None:
+    user_id = rng.randint(1, users)
+    with Session(writer) as session:
+        session.execute(select(User.role).where(User.id == user_id)).first()
+        session.execute(update(User).where(User.id == user_id).values(headline=f"headline {rng.random()}"))
+        session.commit()
+
+
+def _read(reader, users: int, rng: random.Random) -> None:
+    with Session(reader) as session:
+        session.execute(select(*USER_CARD_COLUMNS).order_by(User.created_at.desc(), User.id.desc()).limit(50)).all()
+
+
+def _run(profile: str, writers: int, readers: int, seconds: float, users: int) -> dict:
+    directory = tempfile.mkdtemp(prefix="launchcircle_sqlite_")
+    writer, reader = _engines(pathlib.Path(directory) / "bench.db", profile)
+    _seed(writer, users)
+    latencies = {"write": [], "read": []}
+    errors = {"write": 0, "read": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def loop(kind: str, seed: int) -> None:
+        rng = random.Random(seed)
+        operation, engine = (_write, writer) if kind == "write" else (_read, reader)
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                operation(engine, users, rng)
+            except (OperationalError, PoolTimeout):  # "database is locked", or no connection within pool_timeout.
+                with lock:
+                    errors[kind] += 1
+                continue
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies[kind].append(elapsed)
+
+    threads = [threading.Thread(target=loop, args=("write", i)) for i in range(writers)]
+    threads += [threading.Thread(target=loop, args=("read", 1000 + i)) for i in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    writer.dispose()
+    reader.dispose()
+
+    result = {"profile": profile}
+    for kind, samples in latencies.items():
+        samples.sort()
+        result[kind] = {
+            "ops_per_s": round(len(samples) / seconds, 1),
+            "p50_ms": round(statistics.median(samples) * 1000, 2) if samples else None,
+            "p99_ms": round(samples[max(int(len(samples) * 0.99) - 1, 0)] * 1000, 2) if samples else None,
+            "errors": errors[kind],
+        }
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare the SQLite production profile with the default setup.")
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--users", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{'profile':<12}{'op':<7}{'ops/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>9}")
+    for profile in ("default", "production"):
+        result = _run(profile, args.writers, args.readers, args.seconds, args.users)
+        for kind in ("write", "read"):
+            row = result[kind]
+            p50 = "-" if row["p50_ms"] is None else row["p50_ms"]
+            p99 = "-" if row["p99_ms"] is None else row["p99_ms"]
+            print(f"{profile:<12}{kind:<7}{row['ops_per_s']:>10}{p50:>10}{p99:>10}{row['errors']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+# Process startup: dev boots create and seed the schema; production boots only verify the Alembic revision.
+import logging
+import os
+import pathlib
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Iterator, Optional
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: no cross-process lock for SQLite.
+    fcntl = None
+
+# uvicorn only configures its own loggers, so report through them to be visible next to its startup lines.
+logger = logging.getLogger("uvicorn.error")
+
+API_DIR = pathlib.Path(__file__).resolve().parent
+# "dev" keeps create_all + seed on every start; "production" trusts migrations and skips DDL and seeding.
+BOOT_MODE = os.getenv("BOOT_MODE", "dev").lower()
+MIGRATE_ON_BOOT = os.getenv("MIGRATE_ON_BOOT", "true").lower() in {"1", "true", "yes"}
+SEED_ON_BOOT = os.getenv("SEED_ON_BOOT", "false").lower() in {"1", "true", "yes"}
+# Arbitrary but fixed key for pg_advisory_lock, shared by every API process.
+BOOT_LOCK_KEY = 0x4C430001
+
+
+@dataclass
+class BootReport:
+    mode: str
+    revision: Optional[str] = None
+    migrated: bool = False
+    seeded: bool = False
+    seconds: float = 0.0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def boot(engine: Engine, started_at: float, mode: str = BOOT_MODE) -> BootReport:
+    """Runs the startup work for `mode` and logs the cold-start time since `started_at` (a perf_counter value)."""
+    if mode == "production":
+        report = boot_production(engine)
+    else:
+        from db import init_db
+
+        report = BootReport(mode="dev")
+        with boot_lock(engine, connect=False):  # Workers starting together would otherwise race on the seed probe.
+            init_db(seed=True)
+    report.seconds = round(time.perf_counter() - started_at, 3)
+    logger.info(
+        "API ready in %.3fs (boot=%s, revision=%s, migrated=%s)",
+        report.seconds,
+        report.mode,
+        report.revision,
+        report.migrated,
+    )
+    return report
+
+
+def boot_production(
+    engine: Engine, migrate: bool = MIGRATE_ON_BOOT, seed: bool = SEED_ON_BOOT
+) -> BootReport:
+    # The common case is one SELECT on alembic_version; the lock is only taken when there is work to do.
+    head = alembic_head()
+    with engine.connect() as connection:
+        revision = current_revision(connection)
+    if revision == head and not seed:
+        return BootReport(mode="production", revision=revision)
+
+    with boot_lock(engine) as connection:
+        # Another worker may have finished the work while this one waited for the lock.
+        revision = current_revision(connection)
+        migrated = False
+        if revision != head:
+            if not migrate:
+                raise RuntimeError(f"Database is at revision {revision}, expected {head}; run `alembic upgrade head`")
+            if revision is None and inspect(connection).has_table("users"):
+                raise RuntimeError("Database has tables but no Alembic revision; run `alembic stamp head` once")
+            _upgrade(connection)
+            revision, migrated = head, True
+        connection.commit()
+
+    seeded = False
+    if seed:
+        from db import SessionLocal
+        from seed import seed_database
+
+        with boot_lock(engine, connect=False), SessionLocal() as session:
+            seed_database(session)
+        seeded = True
+    return BootReport(mode="production", revision=revision, migrated=migrated, seeded=seeded)
+
+
+def alembic_head() -> str:
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(_alembic_config()).get_current_head()
+
+
+def current_revision(connection: Connection) -> Optional[str]:
+    # Queried directly: alembic's MigrationContext first introspects the table, which costs another round trip.
+    try:
+        return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except DBAPIError:  # No alembic_version table yet.
+        connection.rollback()
+        return None
+
+
+@contextmanager
+def boot_lock(engine: Engine, connect: bool = True) -> Iterator[Optional[Connection]]:
+    """Serializes one-time startup work across processes and yields a connection to do it on.
+
+    Postgres uses a session-level advisory lock; SQLite locks a file next to the database. With connect=False the
+    work opens its own sessions, and on SQLite no connection is held meanwhile (the production profile's writer
+    pool is small and has no overflow).
+    """
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as connection:
+            connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": BOOT_LOCK_KEY})
+            try:
+                yield connection
+            finally:
+                connection.rollback()
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": BOOT_LOCK_KEY})
+                connection.commit()
+        return
+
+    with _file_lock(engine):
+        if not connect:
+            yield None
+            return
+        with engine.connect() as connection:
+            yield connection
+
+
+@contextmanager
+def _file_lock(engine: Engine) -> Iterator[None]:
+    database = engine.url.database
+    if engine.dialect.name != "sqlite" or fcntl is None or not database or database == ":memory:":
+        yield
+        return
+    with open(f"{database}.boot.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _alembic_config():
+    from alembic.config import Config
+
+    # No ini file: alembic.ini's logging section would replace uvicorn's logging configuration.
+    config = Config()
+    config.set_main_option("script_location", str(API_DIR / "migrations"))
+    return config
+
+
+def _upgrade(connection: Connection) -> None:
+    from alembic import command
+
+    config = _alembic_config()
+    config.attributes["connection"] = connection
+    command.upgrade(config, "head")
@@ -0,0 +1,276 @@
+# Batch imports: schema-validated rows inserted in chunked multi-row statements, with per-row errors.
+import json
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from autocomplete import autocomplete_index
+from cache import response_cache
+from counters import adjust_counts
+from crud import JOB_POST_OWNER_ROLES, job_post_row_values, user_row_values
+from matching import skill_index
+from models import ApplicationStatus, JobApplication, JobPost, JobPostSkill, RoleType, User, UserSkill
+from ranking import candidate_features, fit_index, job_features
+from schemas import BulkResult, BulkRowError, JobApplicationCreate, JobPostCreate, UserCreate
+from security import Principal
+from tasks import enqueue
+from utils import skill_tokens
+
+CHUNK_SIZE = 1000
+TASK_BATCH_SIZE = 200  # Users per queued match-refresh task.
+MAX_BULK_ROWS = 50_000
+
+Record = Tuple[int, Any]
+Item = Tuple[int, BaseModel]
+
+
+class _InvalidRecord:
+    def __init__(self, message: str) -> None:
+        self.message = message
+
+
+def parse_records(body: bytes, content_type: Optional[str]) -> List[Record]:
+    """(index, value) pairs from a JSON array or an NDJSON body.
+
+    A malformed NDJSON line only rejects that row; a malformed JSON array rejects the request.
+    """
+    if "ndjson" in (content_type or ""):
+        lines = [line for line in body.decode("utf-8").splitlines() if line.strip()]
+        records: List[Record] = []
+        for index, line in enumerate(lines):
+            try:
+                records.append((index, json.loads(line)))
+            except json.JSONDecodeError as exc:
+                records.append((index, _InvalidRecord(f"Invalid JSON: {exc.msg}")))
+    else:
+        try:
+            values = json.loads(body or b"null")
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"Invalid JSON: {exc.msg}") from exc
+        if not isinstance(values, list):
+            raise ValueError("Expected a JSON array or NDJSON body")
+        records = list(enumerate(values))
+    if not records:
+        raise ValueError("No rows to import")
+    if len(records) > MAX_BULK_ROWS:
+        raise ValueError(f"At most {MAX_BULK_ROWS} rows per request")
+    return records
+
+
+def bulk_create_users(db: Session, records: List[Record]) -> BulkResult:
+    items, errors = _validate(records, UserCreate)
+    payloads = dict(items)
+    inserted: Dict[int, int] = {}
+    seen_emails: set = set()
+    for chunk in _chunks(items):
+        rejected = _email_conflicts(db, chunk, seen_emails)
+        inserted.update(_insert_chunk(db, _reject(chunk, rejected, errors), errors, _insert_users))
+
+    for index, user_id in inserted.items():
+        values = user_row_values(payloads[index])
+        skill_index.upsert(user_id, values["skills"], values["preferences"])
+        fit_index.upsert_candidate(
+            user_id,
+            candidate_features(values["skills"], values["time_zone"], values["availability"], values["preferences"]),
+        )
+        autocomplete_index.upsert("user", user_id, values["skills"], values["location"], values["role"])
+    if inserted:
+        response_cache.invalidate("users")
+    user_ids = sorted(inserted.values())
+    for start in range(0, len(user_ids), TASK_BATCH_SIZE):
+        enqueue("refresh_user_matches_batch", user_ids=user_ids[start : start + TASK_BATCH_SIZE])
+    return _result(inserted, errors)
+
+
+def bulk_create_job_posts(db: Session, records: List[Record], principal: Optional[Principal] = None) -> BulkResult:
+    items, errors = _validate(records, JobPostCreate)
+    inserted: Dict[int, int] = {}
+    for chunk in _chunks(items):
+        owner_ids = {payload.owner_id for _, payload in chunk}
+        roles = dict(db.execute(select(User.id, User.role).where(User.id.in_(owner_ids))).all())
+        rejected = {}
+        for index, payload in chunk:
+            if principal is not None and principal.user_id != payload.owner_id:
+                rejected[index] = "Token does not belong to this user"
+            elif payload.owner_id not in roles:
+                rejected[index] = "Owner not found"
+            elif roles[payload.owner_id] not in JOB_POST_OWNER_ROLES:
+                rejected[index] = "Only job providers or founders can create job posts"
+        inserted.update(_insert_chunk(db, _reject(chunk, rejected, errors), errors, _insert_job_posts))
+
+    payloads = dict(items)
+    for index, job_post_id in inserted.items():
+        values = job_post_row_values(payloads[index])
+        features = job_features(values["skills"], values["time_zone"], values["work_style"], values["availability"])
+        fit_index.upsert_job(job_post_id, values["owner_id"], features)
+        autocomplete_index.upsert("job", job_post_id, values["skills"], values["location"], values["role"])
+    if inserted:
+        response_cache.invalidate("jobs")
+    return _result(inserted, errors)
+
+
+def bulk_apply(
+    db: Session, job_post_id: int, records: List[Record], principal: Optional[Principal] = None
+) -> Optional[BulkResult]:
+    # Returns None when the job post does not exist; rows may omit job_post_id, which defaults to the path.
+    if db.get(JobPost, job_post_id) is None:
+        return None
+    records = [
+        (index, {"job_post_id": job_post_id, **value} if isinstance(value, dict) else value)
+        for index, value in records
+    ]
+    items, errors = _validate(records, JobApplicationCreate)
+    inserted: Dict[int, int] = {}
+    seen_applicants: set = set()
+    for chunk in _chunks(items):
+        applicant_ids = {payload.applicant_id for _, payload in chunk}
+        roles = dict(db.execute(select(User.id, User.role).where(User.id.in_(applicant_ids))).all())
+        rejected = {}
+        for index, payload in chunk:
+            if payload.job_post_id != job_post_id:
+                rejected[index] = "job_post_id mismatch"
+            elif principal is not None and principal.user_id != payload.applicant_id:
+                rejected[index] = "Token does not belong to this user"
+            elif payload.applicant_id not in roles:
+                rejected[index] = "Applicant not found"
+            elif roles[payload.applicant_id] == RoleType.job_provider:
+                rejected[index] = "Job providers cannot apply to roles"
+        rejected.update(_application_conflicts(db, job_post_id, _reject(chunk, rejected, []), seen_applicants))
+        inserted.update(_insert_chunk(db, _reject(chunk, rejected, errors), errors, _insert_applications))
+
+    if inserted:
+        response_cache.invalidate(f"applications:{job_post_id}", f"job:{job_post_id}", "jobs")
+        enqueue("notify_applications", job_post_id=job_post_id, application_ids=sorted(inserted.values()))
+    return _result(inserted, errors)
+
+
+def _validate(records: List[Record], schema: Type[BaseModel]) -> Tuple[List[Item], List[BulkRowError]]:
+    items: List[Item] = []
+    errors: List[BulkRowError] = []
+    for index, value in records:
+        if isinstance(value, _InvalidRecord):
+            errors.append(BulkRowError(index=index, error=value.message))
+            continue
+        try:
+            items.append((index, schema.model_validate(value)))
+        except ValidationError as exc:
+            message = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}" for error in exc.errors()
+            )
+            errors.append(BulkRowError(index=index, error=message))
+    return items, errors
+
+
+def _chunks(items: List[Item]):
+    for start in range(0, len(items), CHUNK_SIZE):
+        yield items[start : start + CHUNK_SIZE]
+
+
+def _reject(chunk: List[Item], rejected: Dict[int, str], errors: List[BulkRowError]) -> List[Item]:
+    errors.extend(BulkRowError(index=index, error=message) for index, message in rejected.items())
+    return [(index, payload) for index, payload in chunk if index not in rejected]
+
+
+def _email_conflicts(db: Session, chunk: List[Item], seen: set) -> Dict[int, str]:
+    # One lookup per chunk for addresses already stored, plus duplicates earlier in the same request.
+    emails = {payload.email for _, payload in chunk if payload.email}
+    taken = set(db.execute(select(User.email).where(User.email.in_(emails))).scalars()) if emails else set()
+    rejected = {}
+    for index, payload in chunk:
+        if not payload.email:
+            continue
+        if payload.email in taken or payload.email in seen:
+            rejected[index] = "Email already registered"
+        seen.add(payload.email)
+    return rejected
+
+
+def _application_conflicts(db: Session, job_post_id: int, chunk: List[Item], seen: set) -> Dict[int, str]:
+    # Same shape as _email_conflicts, for the unique (job_post_id, applicant_id) index.
+    applicant_ids = {payload.applicant_id for _, payload in chunk}
+    query = select(JobApplication.applicant_id).where(
+        JobApplication.job_post_id == job_post_id, JobApplication.applicant_id.in_(applicant_ids)
+    )
+    applied = set(db.execute(query).scalars()) if applicant_ids else set()
+    rejected = {}
+    for index, payload in chunk:
+        if payload.applicant_id in applied or payload.applicant_id in seen:
+            rejected[index] = "Already applied"
+        seen.add(payload.applicant_id)
+    return rejected
+
+
+def _insert_chunk(
+    db: Session, chunk: List[Item], errors: List[BulkRowError], insert_rows: Callable[[Session, list], List[int]]
+) -> Dict[int, int]:
+    # One transaction per chunk; a constraint violation replays the chunk row by row to find the offending rows.
+    if not chunk:
+        return {}
+    try:
+        ids = insert_rows(db, [payload for _, payload in chunk])
+        db.commit()
+    except IntegrityError as exc:
+        db.rollback()
+        if len(chunk) == 1:
+            errors.append(BulkRowError(index=chunk[0][0], error=f"Rejected by the database: {exc.orig}"))
+            return {}
+        inserted: Dict[int, int] = {}
+        for item in chunk:
+            inserted.update(_insert_chunk(db, [item], errors, insert_rows))
+        return inserted
+    return {index: row_id for (index, _), row_id in zip(chunk, ids)}
+
+
+def _insert_returning_ids(db: Session, model, rows: List[dict]) -> List[int]:
+    # executemany with RETURNING is batched into multi-row INSERT ... VALUES statements by SQLAlchemy.
+    if db.get_bind().dialect.name == "sqlite":
+        # SQLite can't return rows in parameter order from a batch, and asking for it falls back to one
+        # INSERT per row. Rowids are assigned max+1 row by row under the write lock, so sorting restores order.
+        return sorted(db.execute(insert(model).returning(model.id), rows).scalars())
+    statement = insert(model).returning(model.id, sort_by_parameter_order=True)
+    return list(db.execute(statement, rows).scalars())
+
+
+def _insert_users(db: Session, payloads: List[UserCreate]) -> List[int]:
+    rows = [user_row_values(payload) for payload in payloads]
+    ids = _insert_returning_ids(db, User, rows)
+    tags = [
+        {"user_id": user_id, "skill": skill} for user_id, row in zip(ids, rows) for skill in skill_tokens(row["skills"])
+    ]
+    if tags:
+        db.execute(insert(UserSkill), tags)
+    return ids
+
+
+def _insert_job_posts(db: Session, payloads: List[JobPostCreate]) -> List[int]:
+    rows = [job_post_row_values(payload) for payload in payloads]
+    ids = _insert_returning_ids(db, JobPost, rows)
+    tags = [
+        {"job_post_id": post_id, "skill": skill}
+        for post_id, row in zip(ids, rows)
+        for skill in skill_tokens(row["skills"])
+    ]
+    if tags:
+        db.execute(insert(JobPostSkill), tags)
+    return ids
+
+
+def _insert_applications(db: Session, payloads: List[JobApplicationCreate]) -> List[int]:
+    rows = [
+        {"job_post_id": payload.job_post_id, "applicant_id": payload.applicant_id, "cover_letter": payload.cover_letter}
+        for payload in payloads
+    ]
+    ids = _insert_returning_ids(db, JobApplication, rows)
+    for job_post_id, count in Counter(row["job_post_id"] for row in rows).items():
+        adjust_counts(db, job_post_id, {ApplicationStatus.applied: count})
+    return ids
+
+
+def _result(inserted: Dict[int, int], errors: List[BulkRowError]) -> BulkResult:
+    return BulkResult(
+        inserted=len(inserted),
+        ids=[inserted[index] for index in sorted(inserted)],
+        errors=sorted(errors, key=lambda error: error.index),
+    )
@@ -0,0 +1,247 @@
+# Read-through cache for crud reads with tag-based invalidation (Redis when REDIS_URL is set, in-process LRU otherwise).
+import enum
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "30"))
+LRU_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "2048"))
+KEY_PREFIX = "lc:"
+
+MISSING = object()
+
+
+class LRUBackend:
+    """Bounded in-process store; entries expire lazily on read and the oldest are evicted first."""
+
+    name = "lru"
+
+    def __init__(self, max_entries: int = LRU_MAX_ENTRIES) -> None:
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self.max_entries = max_entries
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def add(self, key: str, value: Any, ttl: int) -> bool:
+        # Set only if absent (or expired); True when this call stored the value.
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] >= time.monotonic():
+                return False
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def generations(self, tags: List[str]) -> List[int]:
+        with self._lock:
+            return [self._generations.get(tag, 0) for tag in tags]
+
+    def bump(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+
+class RedisBackend:
+    """Shared store for multi-worker deployments; values are pickled, so the Redis instance must be private."""
+
+    name = "redis"
+
+    def __init__(self, url: str) -> None:
+        import redis  # Optional dependency, only needed when REDIS_URL is set.
+
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Any:
+        raw = self._client.get(key)
+        return MISSING if raw is None else pickle.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        self._client.set(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), ex=ttl)
+
+    def add(self, key: str, value: Any, ttl: int) -> bool:
+        return bool(self._client.set(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), ex=ttl, nx=True))
+
+    def delete(self, key: str) -> None:
+        self._client.delete(key)
+
+    def generations(self, tags: List[str]) -> List[int]:
+        if not tags:
+            return []
+        return [int(raw or 0) for raw in self._client.mget([f"{KEY_PREFIX}gen:{tag}" for tag in tags])]
+
+    def bump(self, tags: Iterable[str]) -> None:
+        pipe = self._client.pipeline(transaction=False)
+        for tag in tags:
+            pipe.incr(f"{KEY_PREFIX}gen:{tag}")
+        pipe.execute()
+
+    def clear(self) -> None:
+        keys = list(self._client.scan_iter(f"{KEY_PREFIX}*"))
+        if keys:
+            self._client.delete(*keys)
+
+
+class ResponseCache:
+    """Keys embed the current generation of every tag they depend on; writes bump tags instead of deleting keys.
+
+    Generations are read before the underlying query runs, so a value computed
+    concurrently with a write is stored under the pre-write key and never served
+    after the bump.
+    """
+
+    def __init__(self, backend, ttl: int = DEFAULT_TTL_SECONDS) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = True
+        self._stats_lock = threading.Lock()
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+
+    def get_or_compute(self, namespace: str, params: Dict[str, Any], tags: List[str], compute: Callable[[], Any]):
+        if not self.enabled:
+            return compute()
+        try:
+            generations = self.backend.generations(tags)
+            key = _cache_key(namespace, params, generations)
+            value = self.backend.get(key)
+        except Exception:  # A cache outage must never fail the request.
+            logger.warning("cache read failed for %s", namespace, exc_info=True)
+            return compute()
+
+        if value is not MISSING:
+            self._count(self.hits, namespace)
+            return value
+        self._count(self.misses, namespace)
+        value = compute()
+        try:
+            self.backend.set(key, value, self.ttl)
+        except Exception:
+            logger.warning("cache write failed for %s", namespace, exc_info=True)
+        return value
+
+    def invalidate(self, *tags: str) -> None:
+        try:
+            self.backend.bump(tags)
+        except Exception:
+            logger.warning("cache invalidation failed for %s", tags, exc_info=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            hits, misses = dict(self.hits), dict(self.misses)
+        return {
+            "backend": self.backend.name,
+            "enabled": self.enabled,
+            "ttl_seconds": self.ttl,
+            "hits": sum(hits.values()),
+            "misses": sum(misses.values()),
+            "namespaces": {
+                name: {"hits": hits.get(name, 0), "misses": misses.get(name, 0)}
+                for name in sorted(hits.keys() | misses.keys())
+            },
+        }
+
+    def reset_stats(self) -> None:
+        with self._stats_lock:
+            self.hits.clear()
+            self.misses.clear()
+
+    def _count(self, counter: Dict[str, int], namespace: str) -> None:
+        with self._stats_lock:
+            counter[namespace] = counter.get(namespace, 0) + 1
+
+
+def create_backend(max_entries: int = LRU_MAX_ENTRIES):
+    url = os.getenv("REDIS_URL")
+    if url:
+        try:
+            return RedisBackend(url)
+        except ImportError:
+            logger.warning("REDIS_URL is set but the redis package is not installed; using the in-process cache")
+    return LRUBackend(max_entries)
+
+
+response_cache = ResponseCache(create_backend())
+response_cache.enabled = os.getenv("CACHE_BACKEND", "").lower() != "off"
+
+
+def cached(namespace: str, tags: Callable[..., Iterable[str]], normalize: Optional[Dict[str, Callable]] = None):
+    """Wraps a crud read `fn(db, ...)`; the cache key is its normalized arguments, minus the session."""
+
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(db, *args, **kwargs):
+            bound = signature.bind(db, *args, **kwargs)
+            bound.apply_defaults()
+            params = {
+                name: (normalize or {}).get(name, _normalize)(value)
+                for name, value in bound.arguments.items()
+                if name != "db"
+            }
+            if db.info.get("replica"):
+                # A lagging replica could otherwise refill an entry a write just invalidated, and the stale copy
+                # would then be served to clients reading their own writes from the primary.
+                params["replica"] = True
+            return response_cache.get_or_compute(
+                namespace, params, list(tags(**bound.arguments)), lambda: fn(db, *args, **kwargs)
+            )
+
+        wrapper.uncached = fn
+        return wrapper
+
+    return decorator
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (list, tuple, set)):
+        return sorted(_normalize(item) for item in value)
+    return value
+
+
+def _cache_key(namespace: str, params: Dict[str, Any], generations: List[int]) -> str:
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    return f"{KEY_PREFIX}{namespace}:{digest}:{'.'.join(map(str, generations))}"
@@ -0,0 +1,72 @@
+# Conditional GETs: ETag / Last-Modified from row versions, and 304s answered from a version-only query.
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, Optional
+from fastapi import Request, Response
+
+# Clients may keep the body but must revalidate it on every use.
+CACHE_CONTROL = "no-cache"
+
+
+def resource_etag(kind: str, row_id: int, version: int) -> str:
+    # Weak: the JSON for one version is equivalent but not guaranteed byte-identical across encoders.
+    return f'W/"{kind}-{row_id}-{version}"'
+
+
+def page_etag(rows: Iterable, next_cursor: Optional[str], view: str) -> str:
+    """Digest of the page's (id, version) pairs; works on schema objects and on version-only rows alike.
+
+    `view` picks the fields rendered for the same rows, so it is part of the digest. The other query parameters
+    change which rows come back, or their order, and those are hashed already.
+    """
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(f"{view};".encode("ascii"))
+    for row in rows:
+        digest.update(f"{row.id}:{row.version},".encode("ascii"))
+    digest.update((next_cursor or "").encode("ascii"))
+    return f'W/"{digest.hexdigest()}"'
+
+
+def newest(rows: Iterable) -> Optional[datetime]:
+    return max((row.updated_at for row in rows), default=None)
+
+
+def is_conditional(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def is_not_modified(request: Request, etag: str, modified_at: Optional[datetime]) -> bool:
+    # If-None-Match wins when both are sent (RFC 9110 13.2.2); weak comparison either way.
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag.removeprefix("W/") in tags
+    since = request.headers.get("if-modified-since")
+    if since is None or modified_at is None:
+        return False
+    try:
+        since_at = parsedate_to_datetime(since)
+    except (TypeError, ValueError):
+        return False
+    if since_at.tzinfo is None:
+        since_at = since_at.replace(tzinfo=timezone.utc)
+    return _as_utc(modified_at).replace(microsecond=0) <= since_at
+
+
+def set_validators(response: Response, etag: str, modified_at: Optional[datetime]) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    if modified_at is not None:
+        response.headers["Last-Modified"] = format_datetime(_as_utc(modified_at), usegmt=True)
+
+
+def not_modified(etag: str, modified_at: Optional[datetime]) -> Response:
+    response = Response(status_code=304)
+    set_validators(response, etag, modified_at)
+    return response
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Timestamps are stored as naive UTC.
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
@@ -0,0 +1,102 @@
+# Per-post application counters (total and per status) stored on job_posts, so reads never COUNT(*) applications.
+# The write paths adjust them in the same transaction; reconciliation recomputes them from job_applications.
+#
+#   python counters.py      # repair drift, e.g. nightly or after manual SQL on job_applications
+import argparse
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, Mapping
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm import Session
+from models import ApplicationStatus, JobApplication, JobPost
+
+STATUS_COLUMNS = {status: getattr(JobPost, f"{status.value}_count") for status in ApplicationStatus}
+COUNT_COLUMNS = (JobPost.applications_count, *STATUS_COLUMNS.values())
+RECONCILE_BATCH = 5000
+
+
+@dataclass
+class ReconcileReport:
+    posts: int = 0
+    repaired: int = 0
+    seconds: float = 0.0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def status_counts(post) -> Dict[ApplicationStatus, int]:
+    # Works on ORM rows and on column rows that carry the counter columns.
+    return {status: getattr(post, column.key) for status, column in STATUS_COLUMNS.items()}
+
+
+def adjust_counts(db: Session, job_post_id: int, deltas: Mapping[ApplicationStatus, int]) -> None:
+    """Adds `deltas` (status -> change) to a post's counters with one relative UPDATE; the total follows the sum."""
+    values = {STATUS_COLUMNS[status].key: STATUS_COLUMNS[status] + delta for status, delta in deltas.items() if delta}
+    total = sum(deltas.values())
+    if total:
+        values["applications_count"] = JobPost.applications_count + total
+    if values:
+        statement = update(JobPost).where(JobPost.id == job_post_id).values(**values)
+        db.execute(statement, execution_options={"synchronize_session": False})
+
+
+def reconcile_application_counts(db: Session, batch_size: int = RECONCILE_BATCH) -> ReconcileReport:
+    """Recomputes every post's counters from job_applications in id batches and rewrites only the drifted rows."""
+    started = time.perf_counter()
+    report = ReconcileReport()
+    last_id = 0
+    while True:
+        stored = db.execute(
+            select(JobPost.id, *COUNT_COLUMNS).where(JobPost.id > last_id).order_by(JobPost.id).limit(batch_size)
+        ).all()
+        if not stored:
+            break
+        first, last_id = stored[0].id, stored[-1].id
+        actual = {
+            row[0]: tuple(row[1:])
+            for row in db.execute(
+                select(
+                    JobApplication.job_post_id,
+                    func.count(),
+                    *[func.sum(case((JobApplication.status == status, 1), else_=0)) for status in STATUS_COLUMNS],
+                )
+                .where(JobApplication.job_post_id.between(first, last_id))
+                .group_by(JobApplication.job_post_id)
+            )
+        }
+        empty = (0,) * len(COUNT_COLUMNS)
+        repairs = [
+            {"id": row.id, **dict(zip((column.key for column in COUNT_COLUMNS), actual.get(row.id, empty)))}
+            for row in stored
+            if tuple(row[1:]) != actual.get(row.id, empty)
+        ]
+        if repairs:
+            # ORM bulk UPDATE by primary key: one executemany per batch.
+            db.execute(update(JobPost), repairs)
+        db.commit()
+        report.posts += len(stored)
+        report.repaired += len(repairs)
+        if len(stored) < batch_size:
+            break
+    report.seconds = round(time.perf_counter() - started, 3)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recompute job post application counters from job_applications.")
+    parser.add_argument("--batch-size", type=int, default=RECONCILE_BATCH)
+    args = parser.parse_args()
+
+    from cache import response_cache
+    from db import SessionLocal
+
+    with SessionLocal() as session:
+        report = reconcile_application_counts(session, batch_size=args.batch_size)
+    if report.repaired:
+        response_cache.invalidate("jobs")  # Reaches the API workers when the cache is in Redis.
+    print(f"checked {report.posts} job posts, repaired {report.repaired} in {report.seconds:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,81 @@
 import hashlib
-from typing import List, Optional
-from sqlalchemy import and_, select
-from sqlalchemy.orm import Session
-from models import ApplicationStatus, JobApplication, JobPost, RoleType, User
+import heapq
+from typing import List, Literal, Optional, Tuple
+from sqlalchemy import and_, delete, exists, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, contains_eager, joinedload
+from autocomplete import index_job_post_terms, index_user_terms
+from cache import cached, response_cache
+from counters import adjust_counts, status_counts
+from matching import index_user
+from models import ApplicationStatus, JobApplication, JobPost, JobPostSkill, RoleType, User, UserMatch, UserSkill
+from pagination import DEFAULT_PAGE_SIZE, keyset, split_page
+from ranking import ensure_fit_index, fit_score, index_candidate, index_job_post
+from search import apply_search
+from tasks import enqueue
+from security import Principal, issue_token, principal_cache, principal_for, verify_reset_token
 from schemas import (
     AuthLogin,
+    AuthPasswordReset,
     AuthResponse,
     AuthSignup,
     JobApplicationOut,
+    JobPostCard,
     JobPostCreate,
     JobPostOut,
     JobPostUpdate,
+    RecommendedJobOut,
+    UserCard,
     UserCreate,
     UserOut,
     UserUpdate,
 )
-from utils import join_csv
+from utils import join_csv, skill_tokens
+
+SkillMatch = Literal["all", "any"]
+JOB_POST_OWNER_ROLES = frozenset({RoleType.job_provider, RoleType.founder})
+_skill_key = {"skills": lambda skills: sorted(skill_tokens(skills))}
+ListView = Literal["full", "card"]
+JobSort = Literal["created", "popular"]
+
+# Columns selected for the card view; the SELECT list is exactly the schema, so no ORM rows are hydrated.
+USER_CARD_COLUMNS = (
+    User.id,
+    User.name,
+    User.headline,
+    User.role,
+    User.location,
+    User.availability,
+    User.skills,
+    User.created_at,
+    User.updated_at,
+    User.version,
+)
+JOB_POST_CARD_COLUMNS = (
+    JobPost.id,
+    JobPost.title,
+    JobPost.headline,
+    JobPost.role,
+    JobPost.location,
+    JobPost.work_style,
+    JobPost.timeline,
+    JobPost.compensation,
+    JobPost.owner_id,
+    User.name.label("owner_name"),
+    JobPost.created_at,
+    JobPost.updated_at,
+    JobPost.version,
+    JobPost.applications_count,
+)
+# Just enough to rebuild a page's validators (ids, versions and the keyset sort columns) for conditional GETs.
+USER_VERSION_COLUMNS = (User.id, User.created_at, User.updated_at, User.version)
+JOB_POST_VERSION_COLUMNS = (
+    JobPost.id,
+    JobPost.created_at,
+    JobPost.applications_count,
+    JobPost.updated_at,
+    JobPost.version,
+)
 
 
 def _hash_password(password: str) -> str:
@@ -28,8 +88,41 @@ def _join_optional(values: Optional[List[str]]) -> Optional[str]:
     return join_csv(values)
 
 
-def create_user(db: Session, payload: UserCreate) -> UserOut:
-    user = User(
+def _insert_ignoring_conflicts(db: Session, model, *conflict_columns: str):
+    # INSERT ... ON CONFLICT (columns) DO NOTHING; SQLite and PostgreSQL spell it the same way.
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    return dialect_insert(model).on_conflict_do_nothing(index_elements=list(conflict_columns))
+
+
+def _write_skill_tags(db: Session, tag_cls, owner_column: str, owner_id: int, skills_csv, replace: bool) -> None:
+    # Unchanged (owner, skill) keys are never deleted and re-inserted: stale tags go, new ones are added if absent.
+    wanted = skill_tokens(skills_csv)
+    owner = getattr(tag_cls, owner_column)
+    if replace:
+        db.execute(delete(tag_cls).where(owner == owner_id, tag_cls.skill.not_in(wanted)))
+    if wanted:
+        statement = _insert_ignoring_conflicts(db, tag_cls, owner_column, "skill") if replace else insert(tag_cls)
+        db.execute(statement, [{owner_column: owner_id, "skill": skill} for skill in wanted])
+
+
+def _update_values(updates: dict) -> dict:
+    # List fields are stored as CSV; an explicit null clears the column.
+    return {
+        field: join_csv(value) if field in ("skills", "portfolio") and value is not None else value
+        for field, value in updates.items()
+    }
+
+
+def _skill_filter(owner_id, tag_cls, tag_owner_id, skills: List[str], match: SkillMatch):
+    # Exact-token semi-joins served by the (skill, owner_id) index on the tag table.
+    if match == "any":
+        return exists().where(tag_owner_id == owner_id, tag_cls.skill.in_(skills))
+    return and_(*[exists().where(tag_owner_id == owner_id, tag_cls.skill == skill) for skill in skills])
+
+
+def user_row_values(payload: UserCreate) -> dict:
+    # Column values for a new users row; shared by create_user and the bulk importer.
+    return dict(
         name=payload.name,
         email=payload.email,
         profile_photo=payload.profile_photo,
@@ -47,79 +140,153 @@ def create_user(db: Session, payload: UserCreate) -> UserOut:
         role=payload.role,
         preferences=payload.preferences,
     )
-    db.add(user)
+
+
+def create_user(db: Session, payload: UserCreate) -> UserOut:
+    # The row comes back from INSERT ... RETURNING; nothing is read again after the commit.
+    user = db.execute(insert(User).values(**user_row_values(payload)).returning(*User.__table__.c)).one()
+    _write_skill_tags(db, UserSkill, "user_id", user.id, user.skills, replace=False)
     db.commit()
-    db.refresh(user)
+    index_user(user)
+    index_candidate(user)
+    index_user_terms(user)
+    response_cache.invalidate("users", f"user:{user.id}")
+    enqueue("refresh_user_matches", user_id=user.id)
     return UserOut.model_validate(user)
 
 
 def update_user(db: Session, user_id: int, payload: UserUpdate) -> Optional[UserOut]:
-    user = db.get(User, user_id)
-    if not user:
+    updates = payload.model_dump(exclude_unset=True)
+    if not updates:
+        return get_user(db, user_id)
+    statement = update(User).where(User.id == user_id).values(**_update_values(updates))
+    user = db.execute(
+        statement.returning(*User.__table__.c), execution_options={"synchronize_session": False}
+    ).one_or_none()
+    if user is None:
         return None
-
-    for field, value in payload.model_dump(exclude_unset=True).items():
-        if field == "skills" and value is not None:
-            setattr(user, field, join_csv(value))
-        elif field == "portfolio" and value is not None:
-            setattr(user, field, join_csv(value))
-        else:
-            setattr(user, field, value)
+    if "skills" in updates:
+        _write_skill_tags(db, UserSkill, "user_id", user_id, user.skills, replace=True)
+    rematch = bool(updates.keys() & {"skills", "preferences"})
+    if rematch:
+        # The precomputed list is stale now; live matches are served until the queued refresh stores a new one.
+        db.execute(delete(UserMatch).where(UserMatch.user_id == user_id))
+    if "name" in updates:
+        # Job posts embed the owner's name, so their versions move with it.
+        db.execute(
+            update(JobPost).where(JobPost.owner_id == user_id).values(version=JobPost.version + 1),
+            execution_options={"synchronize_session": False},
+        )
 
     db.commit()
-    db.refresh(user)
+    index_user(user)
+    index_candidate(user)
+    index_user_terms(user)
+    principal_cache.refresh(user)
+    # Job posts and applications embed the owner/applicant name; without a prior read, any rename counts.
+    response_cache.invalidate("users", f"user:{user_id}", *(["user_names"] if "name" in updates else []))
+    if rematch:
+        enqueue("refresh_user_matches", user_id=user_id)
     return UserOut.model_validate(user)
 
 
+@cached("users:get", tags=lambda user_id, **_: [f"user:{user_id}"])
 def get_user(db: Session, user_id: int) -> Optional[UserOut]:
     user = db.get(User, user_id)
     return UserOut.model_validate(user) if user else None
 
 
-def _normalize_skills(skills: Optional[List[str]]) -> List[str]:
-    if not skills:
-        return []
-    normalized: List[str] = []
-    for skill in skills:
-        parts = [part.strip() for part in skill.split(",") if part.strip()]
-        normalized.extend(parts)
-    return normalized
+def get_user_version(db: Session, user_id: int):
+    # (version, updated_at) by primary key; conditional GETs compare it without loading the profile.
+    return db.execute(select(User.version, User.updated_at).where(User.id == user_id)).first()
 
 
-def list_users(
-    db: Session,
+def _order_page(db: Session, query, model, q: Optional[str], cursor: Optional[str], limit: int, sort_col=None):
+    if not q:
+        return keyset(query, model.created_at if sort_col is None else sort_col, model.id, cursor, limit)
+    if cursor:
+        raise ValueError("cursor cannot be combined with q")
+    if sort_col is not None:
+        raise ValueError("sort cannot be combined with q")
+    # Relevance-ranked searches return a single page with the best `limit` matches.
+    return apply_search(query, db.get_bind().dialect.name, model.__tablename__, model.id, q).limit(limit)
+
+
+def _fetch_page(
+    db: Session, query, limit: int, entities: bool, sort_key: str = "created_at"
+) -> Tuple[list, Optional[str]]:
+    result = db.execute(query)
+    return split_page(result.scalars().unique().all() if entities else result.all(), limit, sort_key)
+
+
+def user_filters(
     role: Optional[RoleType] = None,
     skills: Optional[List[str]] = None,
     location: Optional[str] = None,
     availability: Optional[str] = None,
     experience: Optional[str] = None,
-) -> List[UserOut]:
-    query = select(User)
+    skills_match: SkillMatch = "all",
+) -> list:
+    # WHERE clauses shared by the paged list and the export stream.
+    clauses = []
     if role:
-        query = query.where(User.role == role)
+        clauses.append(User.role == role)
     if location:
-        query = query.where(User.location.ilike(f"%{location}%"))
+        clauses.append(User.location.ilike(f"%{location}%"))
     if availability:
-        query = query.where(User.availability.ilike(f"%{availability}%"))
+        clauses.append(User.availability.ilike(f"%{availability}%"))
     if experience:
-        query = query.where(User.experience.ilike(f"%{experience}%"))
-    normalized_skills = _normalize_skills(skills)
+        clauses.append(User.experience.ilike(f"%{experience}%"))
+    normalized_skills = skill_tokens(skills)
     if normalized_skills:
-        skill_filters = [User.skills.ilike(f"%{skill}%") for skill in normalized_skills]
-        query = query.where(and_(*skill_filters))
+        clauses.append(_skill_filter(User.id, UserSkill, UserSkill.user_id, normalized_skills, skills_match))
+    return clauses
 
-    users = db.execute(query).scalars().unique().all()
-    return [UserOut.model_validate(u) for u in users]
 
+@cached("users:list", tags=lambda **_: ["users"], normalize=_skill_key)
+def list_users(
+    db: Session,
+    role: Optional[RoleType] = None,
+    skills: Optional[List[str]] = None,
+    location: Optional[str] = None,
+    availability: Optional[str] = None,
+    experience: Optional[str] = None,
+    skills_match: SkillMatch = "all",
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    view: ListView = "full",
+    q: Optional[str] = None,
+) -> Tuple[List[UserOut] | List[UserCard], Optional[str]]:
+    query = select(*USER_CARD_COLUMNS) if view == "card" else select(User)
+    query = query.where(*user_filters(role, skills, location, availability, experience, skills_match))
+    query = _order_page(db, query, User, q, cursor, limit)
+    rows, next_cursor = _fetch_page(db, query, limit, entities=view == "full")
+    if view == "card":
+        return [UserCard(**row._mapping) for row in rows], next_cursor
+    return [UserOut.model_validate(u) for u in rows], next_cursor
+
+
+def list_user_versions(
+    db: Session,
+    role: Optional[RoleType] = None,
+    skills: Optional[List[str]] = None,
+    location: Optional[str] = None,
+    availability: Optional[str] = None,
+    experience: Optional[str] = None,
+    skills_match: SkillMatch = "all",
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    q: Optional[str] = None,
+) -> Tuple[list, Optional[str]]:
+    # The same page as list_users, selecting only the columns its validators are built from.
+    query = select(*USER_VERSION_COLUMNS).where(
+        *user_filters(role, skills, location, availability, experience, skills_match)
+    )
+    return _fetch_page(db, _order_page(db, query, User, q, cursor, limit), limit, entities=False)
 
-def create_job_post(db: Session, payload: JobPostCreate) -> JobPostOut:
-    owner = db.get(User, payload.owner_id)
-    if not owner:
-        raise ValueError("Owner not found")
-    if owner.role not in {RoleType.job_provider, RoleType.founder}:
-        raise ValueError("Only job providers or founders can create job posts")
 
-    post = JobPost(
+def job_post_row_values(payload: JobPostCreate) -> dict:
+    return dict(
         title=payload.title,
         headline=payload.headline,
         description=payload.description,
@@ -133,84 +300,318 @@ def create_job_post(db: Session, payload: JobPostCreate) -> JobPostOut:
         compensation=payload.compensation,
         owner_id=payload.owner_id,
     )
-    db.add(post)
-    db.commit()
-    db.refresh(post)
-    return _job_post_to_schema(post)
 
 
-def update_job_post(db: Session, job_post_id: int, payload: JobPostUpdate) -> Optional[JobPostOut]:
-    post = db.get(JobPost, job_post_id)
-    if not post:
-        return None
+def create_job_post(db: Session, payload: JobPostCreate, principal: Optional[Principal] = None) -> JobPostOut:
+    if principal is not None and principal.user_id == payload.owner_id:
+        # An authenticated caller already carries the owner's role and name.
+        owner_role, owner_name = principal.role, principal.name
+    else:
+        owner = db.get(User, payload.owner_id)
+        if not owner:
+            raise ValueError("Owner not found")
+        owner_role, owner_name = owner.role, owner.name
+    if owner_role not in JOB_POST_OWNER_ROLES:
+        raise ValueError("Only job providers or founders can create job posts")
 
-    for field, value in payload.model_dump(exclude_unset=True).items():
-        if field == "skills" and value is not None:
-            setattr(post, field, join_csv(value))
-        else:
-            setattr(post, field, value)
+    post = db.execute(insert(JobPost).values(**job_post_row_values(payload)).returning(*JobPost.__table__.c)).one()
+    _write_skill_tags(db, JobPostSkill, "job_post_id", post.id, post.skills, replace=False)
+    db.commit()
+    index_job_post(post)
+    index_job_post_terms(post)
+    response_cache.invalidate("jobs", f"job:{post.id}")
+    return _job_post_to_schema(post, owner_name=owner_name)
+
+
+def update_job_post(
+    db: Session, job_post_id: int, payload: JobPostUpdate, principal: Optional[Principal] = None
+) -> Optional[JobPostOut]:
+    # One UPDATE ... RETURNING, with the owner's name as a scalar subquery; the ownership check is in the WHERE.
+    updates = payload.model_dump(exclude_unset=True)
+    owner_name = select(User.name).where(User.id == JobPost.owner_id).scalar_subquery().label("owner_name")
+    statement = update(JobPost).where(JobPost.id == job_post_id)
+    if principal is not None:
+        statement = statement.where(JobPost.owner_id == principal.user_id)
+    if not updates:
+        # Nothing to write; a no-op assignment still locks and returns the row under the same checks. Assigning
+        # the version columns to themselves keeps them from being bumped.
+        updates = {"version": JobPost.version, "updated_at": JobPost.updated_at}
+    post = db.execute(
+        statement.values(**_update_values(updates)).returning(*JobPost.__table__.c, owner_name),
+        execution_options={"synchronize_session": False},
+    ).one_or_none()
+    if post is None:
+        db.rollback()
+        if principal is not None and db.get(JobPost, job_post_id) is not None:
+            raise PermissionError("Only the owner can update this job post")
+        return None
+    if "skills" in updates:
+        _write_skill_tags(db, JobPostSkill, "job_post_id", job_post_id, post.skills, replace=True)
 
     db.commit()
-    db.refresh(post)
-    return _job_post_to_schema(post)
+    index_job_post(post)
+    index_job_post_terms(post)
+    response_cache.invalidate("jobs", f"job:{job_post_id}")
+    return _job_post_to_schema(post, owner_name=post.owner_name)
 
 
-def list_job_posts(
-    db: Session,
+def job_post_filters(
     role: Optional[RoleType] = None,
     skills: Optional[List[str]] = None,
     location: Optional[str] = None,
     work_style: Optional[str] = None,
-) -> List[JobPostOut]:
-    query = select(JobPost).join(JobPost.owner)
+    skills_match: SkillMatch = "all",
+) -> list:
+    clauses = []
     if role:
-        query = query.where(JobPost.role == role)
+        clauses.append(JobPost.role == role)
     if location:
-        query = query.where(JobPost.location.ilike(f"%{location}%"))
+        clauses.append(JobPost.location.ilike(f"%{location}%"))
     if work_style:
-        query = query.where(JobPost.work_style.ilike(f"%{work_style}%"))
-    normalized_skills = _normalize_skills(skills)
+        clauses.append(JobPost.work_style.ilike(f"%{work_style}%"))
+    normalized_skills = skill_tokens(skills)
     if normalized_skills:
-        skill_filters = [JobPost.skills.ilike(f"%{skill}%") for skill in normalized_skills]
-        query = query.where(and_(*skill_filters))
+        clauses.append(
+            _skill_filter(JobPost.id, JobPostSkill, JobPostSkill.job_post_id, normalized_skills, skills_match)
+        )
+    return clauses
+
 
-    posts = db.execute(query).scalars().unique().all()
-    return [_job_post_to_schema(p) for p in posts]
+@cached("jobs:list", tags=lambda **_: ["jobs", "user_names"], normalize=_skill_key)
+def list_job_posts(
+    db: Session,
+    role: Optional[RoleType] = None,
+    skills: Optional[List[str]] = None,
+    location: Optional[str] = None,
+    work_style: Optional[str] = None,
+    skills_match: SkillMatch = "all",
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    view: ListView = "full",
+    q: Optional[str] = None,
+    sort: JobSort = "created",
+) -> Tuple[List[JobPostOut] | List[JobPostCard], Optional[str]]:
+    # sort=popular orders by the denormalized applications_count, newest post first among equals.
+    sort_col = JobPost.applications_count if sort == "popular" else None
+    if view == "card":
+        query = select(*JOB_POST_CARD_COLUMNS).join(JobPost.owner)
+    else:
+        query = select(JobPost).join(JobPost.owner).options(contains_eager(JobPost.owner))
+    query = query.where(*job_post_filters(role, skills, location, work_style, skills_match))
+    query = _order_page(db, query, JobPost, q, cursor, limit, sort_col)
+    sort_key = "created_at" if sort_col is None else sort_col.key
+    rows, next_cursor = _fetch_page(db, query, limit, entities=view == "full", sort_key=sort_key)
+    if view == "card":
+        return [JobPostCard(**row._mapping) for row in rows], next_cursor
+    return [_job_post_to_schema(p) for p in rows], next_cursor
+
+
+def list_job_post_versions(
+    db: Session,
+    role: Optional[RoleType] = None,
+    skills: Optional[List[str]] = None,
+    location: Optional[str] = None,
+    work_style: Optional[str] = None,
+    skills_match: SkillMatch = "all",
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    q: Optional[str] = None,
+    sort: JobSort = "created",
+) -> Tuple[list, Optional[str]]:
+    # Every post has an owner, so the owner join list_job_posts adds doesn't change which rows match.
+    sort_col = JobPost.applications_count if sort == "popular" else None
+    query = select(*JOB_POST_VERSION_COLUMNS).where(
+        *job_post_filters(role, skills, location, work_style, skills_match)
+    )
+    query = _order_page(db, query, JobPost, q, cursor, limit, sort_col)
+    sort_key = "created_at" if sort_col is None else sort_col.key
+    return _fetch_page(db, query, limit, entities=False, sort_key=sort_key)
 
 
+@cached("jobs:get", tags=lambda job_post_id, **_: [f"job:{job_post_id}", "user_names"])
 def get_job_post(db: Session, job_post_id: int) -> Optional[JobPostOut]:
-    post = db.get(JobPost, job_post_id)
+    post = db.get(JobPost, job_post_id, options=[joinedload(JobPost.owner)])
     return _job_post_to_schema(post) if post else None
 
 
-def apply_to_job(db: Session, job_post_id: int, applicant_id: int, cover_letter: Optional[str]) -> JobApplicationOut:
-    post = db.get(JobPost, job_post_id)
-    applicant = db.get(User, applicant_id)
-    if not post or not applicant:
+def get_job_post_version(db: Session, job_post_id: int):
+    return db.execute(select(JobPost.version, JobPost.updated_at).where(JobPost.id == job_post_id)).first()
+
+
+def apply_to_job(
+    db: Session,
+    job_post_id: int,
+    applicant_id: int,
+    cover_letter: Optional[str],
+    principal: Optional[Principal] = None,
+) -> Tuple[JobApplicationOut, bool]:
+    """Returns the application and whether it was created; applying twice returns the first application."""
+    if principal is not None and principal.user_id == applicant_id:
+        job_title = db.execute(select(JobPost.title).where(JobPost.id == job_post_id)).scalar_one_or_none()
+        applicant_role, applicant_name = principal.role, principal.name
+    else:
+        row = db.execute(
+            select(JobPost.title, User.role, User.name)
+            .select_from(JobPost)
+            .join(User, User.id == applicant_id)
+            .where(JobPost.id == job_post_id)
+        ).first()
+        job_title, applicant_role, applicant_name = row if row else (None, None, None)
+    if job_title is None or applicant_role is None:
         raise ValueError("Job post or applicant not found")
-    if applicant.role == RoleType.job_provider:
+    if applicant_role == RoleType.job_provider:
         raise ValueError("Job providers cannot apply to roles")
 
-    application = JobApplication(
-        job_post_id=job_post_id,
-        applicant_id=applicant_id,
-        cover_letter=cover_letter,
+    statement = _insert_ignoring_conflicts(db, JobApplication, "job_post_id", "applicant_id").values(
+        job_post_id=job_post_id, applicant_id=applicant_id, cover_letter=cover_letter
+    )
+    application = db.execute(statement.returning(*JobApplication.__table__.c)).one_or_none()
+    created = application is not None
+    if created:
+        adjust_counts(db, job_post_id, {application.status: 1})
+        db.commit()
+        response_cache.invalidate(f"applications:{job_post_id}", f"job:{job_post_id}", "jobs")
+        enqueue("notify_application", application_id=application.id)
+    else:
+        application = db.execute(
+            select(*JobApplication.__table__.c).where(
+                JobApplication.job_post_id == job_post_id, JobApplication.applicant_id == applicant_id
+            )
+        ).one()
+        db.rollback()
+    return _application_to_schema(application, applicant_name=applicant_name, job_title=job_title), created
+
+
+def update_application_status(
+    db: Session,
+    job_post_id: int,
+    application_id: int,
+    status: ApplicationStatus,
+    principal: Optional[Principal] = None,
+) -> Optional[JobApplicationOut]:
+    # The UPDATE only applies if the status is still the one just read, so the counter deltas are always right.
+    current_query = (
+        select(JobApplication.status, JobPost.owner_id, JobPost.title, User.name)
+        .join(JobPost, JobPost.id == JobApplication.job_post_id)
+        .join(User, User.id == JobApplication.applicant_id)
+        .where(JobApplication.id == application_id, JobApplication.job_post_id == job_post_id)
     )
-    db.add(application)
+    for _ in range(3):
+        current = db.execute(current_query).first()
+        if current is None:
+            return None
+        if principal is not None and principal.user_id != current.owner_id:
+            raise PermissionError("Only the owner can update applications to this job post")
+        statement = (
+            update(JobApplication)
+            .where(JobApplication.id == application_id, JobApplication.status == current.status)
+            .values(status=status)
+            .returning(*JobApplication.__table__.c)
+        )
+        application = db.execute(statement, execution_options={"synchronize_session": False}).one_or_none()
+        if application is not None:
+            break
+        db.rollback()
+    else:
+        raise ValueError("Application status is being changed concurrently; retry")
+
+    changed = current.status != status
+    adjust_counts(db, job_post_id, {current.status: -1, status: 1} if changed else {})
     db.commit()
-    db.refresh(application)
-    return _application_to_schema(application)
+    response_cache.invalidate(f"applications:{job_post_id}", f"job:{job_post_id}", "jobs")
+    if changed:
+        enqueue("notify_application_status", application_id=application_id)
+    return _application_to_schema(application, applicant_name=current.name, job_title=current.title)
 
 
-def list_job_applications(db: Session, job_post_id: int) -> List[JobApplicationOut]:
-    rows = db.execute(
-        select(JobApplication).where(JobApplication.job_post_id == job_post_id).join(JobApplication.applicant)
-    ).scalars().unique().all()
-    return [_application_to_schema(a) for a in rows]
-
-
-def _job_post_to_schema(post: JobPost) -> JobPostOut:
-    return JobPostOut(
+@cached(
+    "applications:list",
+    tags=lambda job_post_id, **_: [f"applications:{job_post_id}", f"job:{job_post_id}", "user_names"],
+)
+def list_job_applications(
+    db: Session, job_post_id: int, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None
+) -> Tuple[List[JobApplicationOut], Optional[str]]:
+    # Oldest first so owners review applications in the order they arrived.
+    query = (
+        select(JobApplication)
+        .join(JobApplication.applicant)
+        .join(JobApplication.job_post)
+        .where(JobApplication.job_post_id == job_post_id)
+        .options(contains_eager(JobApplication.applicant), contains_eager(JobApplication.job_post))
+    )
+    query = keyset(query, JobApplication.created_at, JobApplication.id, cursor, limit, descending=False)
+    rows, next_cursor = split_page(db.execute(query).scalars().unique().all(), limit)
+    return [_application_to_schema(a) for a in rows], next_cursor
+
+
+def rank_job_applications(db: Session, job_post_id: int, limit: int = DEFAULT_PAGE_SIZE) -> List[JobApplicationOut]:
+    # Scores every applicant from the fit index, then loads only the best `limit` applications in full.
+    index = ensure_fit_index(db)
+    if index.job(job_post_id) is None:
+        post = db.get(JobPost, job_post_id)
+        if not post:
+            return []
+        index_job_post(post)
+    job = index.job(job_post_id)
+
+    applications = db.execute(
+        select(JobApplication.id, JobApplication.applicant_id).where(JobApplication.job_post_id == job_post_id)
+    ).all()
+    unindexed = {applicant_id for _, applicant_id in applications if index.candidate(applicant_id) is None}
+    if unindexed:
+        for user in db.execute(select(User).where(User.id.in_(unindexed))).scalars():
+            index_candidate(user)
+
+    scored = [
+        (fit_score(candidate, job), -application_id)
+        for application_id, applicant_id in applications
+        if (candidate := index.candidate(applicant_id)) is not None
+    ]
+    top = {-negated_id: score for score, negated_id in heapq.nlargest(limit, scored)}
+    if not top:
+        return []
+    query = (
+        select(JobApplication)
+        .join(JobApplication.applicant)
+        .join(JobApplication.job_post)
+        .where(JobApplication.id.in_(top))
+        .options(contains_eager(JobApplication.applicant), contains_eager(JobApplication.job_post))
+    )
+    ranked = [_application_to_schema(a, fit_score=top[a.id]) for a in db.execute(query).scalars().unique()]
+    return sorted(ranked, key=lambda application: (-application.fit_score, application.id))
+
+
+def recommend_jobs(db: Session, user_id: int, limit: int = 10) -> Optional[List[RecommendedJobOut]]:
+    index = ensure_fit_index(db)
+    if index.candidate(user_id) is None:
+        # Written by another process since the index was built; pull it in once.
+        user = db.get(User, user_id)
+        if not user:
+            return None
+        index_candidate(user)
+
+    applied = db.execute(select(JobApplication.job_post_id).where(JobApplication.applicant_id == user_id)).scalars()
+    top = index.top_jobs(user_id, limit, exclude=applied)
+    if not top:
+        return []
+    query = (
+        select(JobPost)
+        .join(JobPost.owner)
+        .where(JobPost.id.in_([job_id for _, job_id in top]))
+        .options(contains_eager(JobPost.owner))
+    )
+    posts = {post.id: post for post in db.execute(query).scalars()}
+    return [
+        _job_post_to_schema(post, schema=RecommendedJobOut, fit_score=score)
+        for score, job_id in top
+        if (post := posts.get(job_id)) is not None
+    ]
+
+
+def _job_post_to_schema(post: JobPost, owner_name: Optional[str] = None, schema=JobPostOut, **extra) -> JobPostOut:
+    if owner_name is None and post.owner:
+        owner_name = post.owner.name
+    return schema(
         id=post.id,
         title=post.title,
         headline=post.headline,
@@ -224,12 +625,27 @@ def _job_post_to_schema(post: JobPost) -> JobPostOut:
         timeline=post.timeline,
         compensation=post.compensation,
         created_at=post.created_at,
+        updated_at=post.updated_at,
+        version=post.version,
         owner_id=post.owner_id,
-        owner_name=post.owner.name if post.owner else None,
+        owner_name=owner_name,
+        applications_count=post.applications_count,
+        status_counts=status_counts(post),
+        **extra,
     )
 
 
-def _application_to_schema(application: JobApplication) -> JobApplicationOut:
+def _application_to_schema(
+    application: JobApplication,
+    applicant_name: Optional[str] = None,
+    job_title: Optional[str] = None,
+    fit_score: Optional[int] = None,
+) -> JobApplicationOut:
+    # Callers that already know the names pass them in to skip the relationship loads.
+    if applicant_name is None and application.applicant:
+        applicant_name = application.applicant.name
+    if job_title is None and application.job_post:
+        job_title = application.job_post.title
     return JobApplicationOut(
         id=application.id,
         job_post_id=application.job_post_id,
@@ -237,9 +653,10 @@ def _application_to_schema(application: JobApplication) -> JobApplicationOut:
         status=application.status,
         cover_letter=application.cover_letter,
         created_at=application.created_at,
-    applicant_name=application.applicant.name if application.applicant else None,
-    job_title=application.job_post.title if application.job_post else None,
-)
+        applicant_name=applicant_name,
+        job_title=job_title,
+        fit_score=fit_score,
+    )
 
 
 def signup(db: Session, payload: AuthSignup) -> AuthResponse:
@@ -252,18 +669,21 @@ def signup(db: Session, payload: AuthSignup) -> AuthResponse:
         role=payload.role,
         skills=[],
     )
-    user = User(
+    statement = insert(User).values(
         name=user_payload.name,
         email=user_payload.email,
         role=user_payload.role,
         skills="",
         password_hash=_hash_password(payload.password),
     )
-    db.add(user)
+    user = db.execute(statement.returning(*User.__table__.c)).one()
     db.commit()
-    db.refresh(user)
-    token = _hash_password(f"{user.email}:{user.id}")
-    return AuthResponse(user=UserOut.model_validate(user), token=token)
+    index_user(user)
+    index_candidate(user)
+    index_user_terms(user)
+    response_cache.invalidate("users", f"user:{user.id}")
+    principal_cache.put(principal_for(user))
+    return AuthResponse(user=UserOut.model_validate(user), token=issue_token(user.id))
 
 
 def login(db: Session, payload: AuthLogin) -> Optional[AuthResponse]:
@@ -272,5 +692,21 @@ def login(db: Session, payload: AuthLogin) -> Optional[AuthResponse]:
         return None
     if user.password_hash != _hash_password(payload.password):
         return None
-    token = _hash_password(f"{user.email}:{user.id}")
-    return AuthResponse(user=UserOut.model_validate(user), token=token)
+    principal_cache.put(principal_for(user))
+    return AuthResponse(user=UserOut.model_validate(user), token=issue_token(user.id))
+
+
+def reset_password(db: Session, payload: AuthPasswordReset) -> None:
+    user_id, version = verify_reset_token(payload.token)  # InvalidToken is a ValueError.
+    # Matching the version makes the token single-use: this UPDATE bumps it.
+    statement = (
+        update(User)
+        .where(User.id == user_id, User.version == version)
+        .values(password_hash=_hash_password(payload.password))
+    )
+    updated = db.execute(statement.returning(User.id), execution_options={"synchronize_session": False}).first()
+    if updated is None:
+        db.rollback()
+        raise ValueError("Reset link is invalid or has already been used")
+    db.commit()
+    response_cache.invalidate("users", f"user:{user_id}")
@@ -1,7 +1,26 @@
 # Database setup and session helpers for the LaunchCircle API.
+import itertools
 import os
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+from fastapi import Request
 from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from starlette.concurrency import run_in_threadpool
+from metrics import instrument_engine
+from sqlite_profile import install_pragmas, reader_pool_options, uses_profile, writer_pool_options
+
+T = TypeVar("T")
+
+# QueuePool sizing for the primary and each replica (per process; the async engines get their own pools).
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# A client that wrote something reads from the primary for this long, which should cover the replicas' lag.
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "10"))
+PRIMARY_COOKIE = "lc_read_primary"
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
 
 
 def _database_url() -> str:
@@ -9,16 +28,94 @@ def _database_url() -> str:
     return os.getenv("DATABASE_URL") or os.getenv("POSTGRES_URL") or "sqlite:///./dev.db"
 
 
-def _create_engine(url: str):
+def _replica_urls() -> List[str]:
+    return [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+
+
+def _async_database_url(url: str) -> str:
+    # Same database, async driver: aiosqlite locally, psycopg 3's async mode for Postgres.
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    for prefix in ("postgresql+psycopg2:", "postgresql:", "postgres:"):
+        if url.startswith(prefix):
+            return "postgresql+psycopg:" + url[len(prefix):]
+    return url
+
+
+def _pool_options(url: str) -> dict:
+    # Only QueuePool takes sizing: in-memory SQLite keeps one connection per thread and aiosqlite opens a fresh one
+    # per checkout.
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and (
+        parsed.get_driver_name() == "aiosqlite" or parsed.database in (None, "", ":memory:")
+    ):
+        return {}
+    return {"pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW, "pool_timeout": DB_POOL_TIMEOUT}
+
+
+def _create_engine(url: str, role: str = "primary", profile: Optional[str] = None):
+    # role is "primary" or "reader" (replicas, and read-only connections to the primary's file); only the SQLite
+    # production profile tells them apart.
     connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
-    return create_engine(url, connect_args=connect_args, future=True, pool_pre_ping=True)
+    options = _pool_options(url)
+    tuned = uses_profile(url, profile)
+    if tuned:
+        options.update(reader_pool_options() if role == "reader" else writer_pool_options())
+    created = create_engine(url, connect_args=connect_args, future=True, pool_pre_ping=True, **options)
+    if tuned:
+        install_pragmas(created, writer=role == "primary")
+    return created
 
 
 DATABASE_URL = _database_url()
+# "sync" runs endpoints' queries in the threadpool; "async" awaits them on the event loop.
+DB_MODE = os.getenv("DB_MODE", "sync").lower()
 engine = _create_engine(DATABASE_URL)
+instrument_engine(engine, "primary")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, future=True)
+# Reads that go to the primary: the same engine, except under the SQLite production profile, where the writer
+# connections are kept for write requests and reads use a pool of read-only connections to the same file.
+SQLITE_TUNED = uses_profile(DATABASE_URL)
+read_engine = _create_engine(DATABASE_URL, role="reader") if SQLITE_TUNED else engine
+if SQLITE_TUNED:
+    instrument_engine(read_engine, "primary_reader")
+ReadSessionLocal = sessionmaker(autoflush=False, bind=read_engine, future=True) if SQLITE_TUNED else SessionLocal
 Base = declarative_base()
 
+_replica_urls_in_use: List[str] = []
+_replica_factories: List[sessionmaker] = []
+_next_replica = itertools.count()
+_async_factories: Dict[str, async_sessionmaker] = {}
+
+
+def configure_replicas(urls: List[str]) -> None:
+    """Points reads at these replicas (none: reads use the primary); called at import from DATABASE_REPLICA_URLS."""
+    global _replica_urls_in_use, _replica_factories
+    factories = []
+    for number, url in enumerate(urls, 1):
+        replica = _create_engine(url, role="reader")
+        instrument_engine(replica, f"replica{number}")
+        # Session.info marks replica reads, so the response cache keeps them apart from primary reads.
+        factories.append(sessionmaker(autoflush=False, bind=replica, future=True, info={"replica": True}))
+    for factory in _replica_factories:
+        factory.kw["bind"].dispose()
+    _replica_urls_in_use, _replica_factories = list(urls), factories
+
+
+configure_replicas(_replica_urls())
+
+
+def _pick_replica() -> int:
+    return next(_next_replica) % len(_replica_factories)  # Round-robin.
+
+
+def replica_session() -> Session:
+    return _replica_factories[_pick_replica()]() if _replica_factories else ReadSessionLocal()
+
+
+def reads_from_primary(request: Request) -> bool:
+    return not _replica_factories or PRIMARY_COOKIE in request.cookies
+
 
 def get_db():
     db = SessionLocal()
@@ -28,12 +125,93 @@ def get_db():
         db.close()
 
 
+def get_read_db(request: Request):
+    # For read-only endpoints: a replica, unless this client wrote something in the last REPLICA_STICKY_SECONDS.
+    db = ReadSessionLocal() if reads_from_primary(request) else replica_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _async_session_factory(url: str, name: str, **session_options: Any) -> async_sessionmaker:
+    # Created on first use so sync deployments never need the async drivers installed.
+    if url not in _async_factories:
+        async_url = _async_database_url(url)
+        async_engine = create_async_engine(async_url, pool_pre_ping=True, **_pool_options(async_url))
+        instrument_engine(async_engine.sync_engine, name)
+        _async_factories[url] = async_sessionmaker(async_engine, autoflush=False, **session_options)
+    return _async_factories[url]
+
+
+def get_async_engine():
+    return _async_session_factory(DATABASE_URL, "async").kw["bind"]
+
+
+async def get_async_db():
+    async with _async_session_factory(DATABASE_URL, "async")() as db:
+        yield db
+
+
+async def get_async_read_db(request: Request):
+    if reads_from_primary(request):
+        factory = _async_session_factory(DATABASE_URL, "async")
+    else:
+        number = _pick_replica()
+        url, name = _replica_urls_in_use[number], f"async_replica{number + 1}"
+        factory = _async_session_factory(url, name, info={"replica": True})
+    async with factory() as db:
+        yield db
+
+
+# Moves every endpoint onto AsyncSession: app.dependency_overrides.update(ASYNC_OVERRIDES).
+ASYNC_OVERRIDES = {get_db: get_async_db, get_read_db: get_async_read_db}
+
+
+async def dispose_async_engine() -> None:
+    for factory in list(_async_factories.values()):
+        await factory.kw["bind"].dispose()
+    _async_factories.clear()
+
+
+class ReadYourWritesMiddleware:
+    """Pure ASGI middleware: a successful write marks the client (cookie) to read from the primary for a while."""
+
+    def __init__(self, app, sticky_seconds: int = REPLICA_STICKY_SECONDS) -> None:
+        self.app = app
+        self.cookie = f"{PRIMARY_COOKIE}=1; Max-Age={sticky_seconds}; Path=/; HttpOnly; SameSite=Lax".encode("latin-1")
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS or not _replica_factories:
+            await self.app(scope, receive, send)
+            return
+
+        async def mark(message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", self.cookie)]
+            await send(message)
+
+        await self.app(scope, receive, mark)
+
+
+async def run_db(db, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    # crud functions are written once against Session; on an AsyncSession they run via
+    # run_sync, where every statement is awaited on the async driver instead of blocking a thread.
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
 def init_db(seed: bool = True) -> None:
     # Create tables and optionally add seed data if the database is empty.
     from models import Base as ModelBase  # Lazy import to avoid circular deps.
-    from seed import seed_database
+    from search import install_fulltext
+    from seed import backfill_skill_tags, seed_database
 
     ModelBase.metadata.create_all(bind=engine)
-    if seed:
-        with SessionLocal() as session:
+    with engine.begin() as connection:
+        install_fulltext(connection)
+    with SessionLocal() as session:
+        if seed:
             seed_database(session)
+        backfill_skill_tags(session)
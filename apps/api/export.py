@@ -0,0 +1,166 @@
+# Streaming exports: rows leave the database in fixed-size batches and are written straight to the response.
+import csv
+import enum
+import io
+import json
+from datetime import datetime
+from typing import Iterator, List, Literal, Optional
+from sqlalchemy import Select, select
+from crud import SkillMatch, job_post_filters, user_filters
+from db import SessionLocal, replica_session
+from models import ApplicationStatus, JobApplication, JobPost, RoleType, User
+from search import match_clause
+
+ExportFormat = Literal["ndjson", "csv"]
+EXPORT_BATCH_SIZE = 1000
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Explicit column lists: exports never include password hashes or search vectors.
+USER_EXPORT_COLUMNS = (
+    User.id,
+    User.name,
+    User.email,
+    User.profile_photo,
+    User.headline,
+    User.bio,
+    User.experience,
+    User.startups,
+    User.portfolio,
+    User.resume_url,
+    User.looking_for_cofounder,
+    User.availability,
+    User.skills,
+    User.location,
+    User.time_zone,
+    User.role,
+    User.preferences,
+    User.created_at,
+)
+JOB_POST_EXPORT_COLUMNS = (
+    JobPost.id,
+    JobPost.title,
+    JobPost.headline,
+    JobPost.description,
+    JobPost.role,
+    JobPost.skills,
+    JobPost.location,
+    JobPost.time_zone,
+    JobPost.work_style,
+    JobPost.availability,
+    JobPost.timeline,
+    JobPost.compensation,
+    JobPost.owner_id,
+    User.name.label("owner_name"),
+    JobPost.created_at,
+)
+APPLICATION_EXPORT_COLUMNS = (
+    JobApplication.id,
+    JobApplication.job_post_id,
+    JobApplication.applicant_id,
+    JobApplication.status,
+    JobApplication.cover_letter,
+    JobApplication.created_at,
+)
+
+
+def users_export_query(
+    after_id: int = 0,
+    q: Optional[str] = None,
+    role: Optional[RoleType] = None,
+    skills: Optional[List[str]] = None,
+    location: Optional[str] = None,
+    availability: Optional[str] = None,
+    experience: Optional[str] = None,
+    skills_match: SkillMatch = "all",
+) -> Select:
+    query = select(*USER_EXPORT_COLUMNS).where(
+        User.id > after_id, *user_filters(role, skills, location, availability, experience, skills_match)
+    )
+    if q:
+        query = query.where(match_clause(_dialect_name(), "users", User.id, q))
+    return query.order_by(User.id)
+
+
+def job_posts_export_query(
+    after_id: int = 0,
+    q: Optional[str] = None,
+    role: Optional[RoleType] = None,
+    skills: Optional[List[str]] = None,
+    location: Optional[str] = None,
+    work_style: Optional[str] = None,
+    skills_match: SkillMatch = "all",
+) -> Select:
+    query = (
+        select(*JOB_POST_EXPORT_COLUMNS)
+        .join(JobPost.owner)
+        .where(JobPost.id > after_id, *job_post_filters(role, skills, location, work_style, skills_match))
+    )
+    if q:
+        query = query.where(match_clause(_dialect_name(), "job_posts", JobPost.id, q))
+    return query.order_by(JobPost.id)
+
+
+def applications_export_query(
+    after_id: int = 0,
+    job_post_id: Optional[int] = None,
+    applicant_id: Optional[int] = None,
+    status: Optional[ApplicationStatus] = None,
+) -> Select:
+    query = select(*APPLICATION_EXPORT_COLUMNS).where(JobApplication.id > after_id)
+    if job_post_id is not None:
+        query = query.where(JobApplication.job_post_id == job_post_id)
+    if applicant_id is not None:
+        query = query.where(JobApplication.applicant_id == applicant_id)
+    if status:
+        query = query.where(JobApplication.status == status)
+    return query.order_by(JobApplication.id)
+
+
+def stream_export(query: Select, fmt: ExportFormat) -> Iterator[str]:
+    """Yields the encoded rows of `query`, one chunk per database batch.
+
+    Runs on its own session (on a replica when there are any) because the
+    response body outlives the request's dependencies. yield_per streams from a server-side cursor on Postgres, so
+    memory is bounded by EXPORT_BATCH_SIZE whatever the table size. Rows are in
+    id order: a client that stops early resumes with after_id=<last id seen>.
+    """
+    db = replica_session()
+    try:
+        result = db.execute(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        columns = list(result.keys())
+        if fmt == "csv":
+            yield _csv_lines([columns])
+        for batch in result.partitions():
+            if fmt == "csv":
+                yield _csv_lines([_csv_value(value) for value in row] for row in batch)
+            else:
+                yield "".join(
+                    json.dumps(dict(zip(columns, row)), default=_json_default, separators=(",", ":")) + "\n"
+                    for row in batch
+                )
+    finally:
+        db.close()
+
+
+def _dialect_name() -> str:
+    return SessionLocal.kw["bind"].dialect.name
+
+
+def _csv_lines(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    return buffer.getvalue()
+
+
+def _csv_value(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    return _json_default(value) if isinstance(value, (enum.Enum, datetime)) else value
+
+
+def _json_default(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
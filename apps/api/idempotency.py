@@ -0,0 +1,142 @@
+# Idempotency-Key support for writes: the first response to a key is stored briefly and replayed to retries.
+import hashlib
+import json
+import logging
+import os
+from typing import List, Optional, Tuple
+from starlette.datastructures import Headers
+from cache import MISSING, create_backend
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "3600"))
+IDEMPOTENCY_MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000"))
+# How long a key stays locked while its first request runs; a crashed worker frees it after this.
+IN_PROGRESS_TTL_SECONDS = 60
+MAX_KEY_LENGTH = 255
+METHODS = frozenset({"POST", "PUT", "PATCH"})
+KEY_PREFIX = "lc:idem:"
+REPLAYED_HEADER = (b"idempotent-replayed", b"true")
+
+RawHeaders = List[Tuple[bytes, bytes]]
+
+# Separate from the response cache so cached reads never evict stored responses; Redis when REDIS_URL is set.
+idempotency_store = create_backend(IDEMPOTENCY_MAX_ENTRIES)
+
+
+class IdempotencyMiddleware:
+    """Pure ASGI middleware for POST/PUT/PATCH requests that carry an Idempotency-Key header.
+
+    Keys are scoped to the method, path and Authorization header. A retry with the same body gets the stored
+    response (marked Idempotent-Replayed); a different body is a 422, and a retry while the first request is
+    still running is a 409. Responses with a 5xx status are not stored, so those requests can be retried.
+    """
+
+    def __init__(self, app, store=None, ttl: int = IDEMPOTENCY_TTL_SECONDS) -> None:
+        self.app = app
+        self.store = store if store is not None else idempotency_store
+        self.ttl = ttl
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["method"] not in METHODS:
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        key = headers.get("idempotency-key")
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            await _send_error(send, 400, f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")
+            return
+
+        body = await _read_body(receive)
+        if body is None:
+            return  # The client went away before sending the body.
+        fingerprint = hashlib.blake2b(body, digest_size=16).hexdigest()
+        store_key = _store_key(scope, headers, key)
+        try:
+            claimed = self.store.add(store_key, (fingerprint, None), IN_PROGRESS_TTL_SECONDS)
+            stored = MISSING if claimed else self.store.get(store_key)
+        except Exception:  # A store outage degrades to running the request once, as without the header.
+            logger.warning("idempotency store unavailable", exc_info=True)
+            await self.app(scope, _replay_body(body, receive), send)
+            return
+
+        if not claimed:
+            if stored is not MISSING and stored[0] != fingerprint:
+                await _send_error(send, 422, "Idempotency-Key was already used with a different request body")
+            elif stored is MISSING or stored[1] is None:
+                await _send_error(send, 409, "A request with this Idempotency-Key is still in progress")
+            else:
+                status, raw_headers, response_body = stored[1]
+                await _send_response(send, status, raw_headers + [REPLAYED_HEADER], response_body)
+            return
+
+        response: dict = {"status": 500, "headers": [], "body": []}
+
+        async def capture(message) -> None:
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, _replay_body(body, receive), capture)
+        finally:
+            self._finish(store_key, fingerprint, response)
+
+    def _finish(self, store_key: str, fingerprint: str, response: dict) -> None:
+        try:
+            if response["status"] >= 500:
+                self.store.delete(store_key)
+            else:
+                result = (response["status"], response["headers"], b"".join(response["body"]))
+                self.store.set(store_key, (fingerprint, result), self.ttl)
+        except Exception:
+            logger.warning("idempotency store write failed", exc_info=True)
+
+
+def _store_key(scope, headers: Headers, key: str) -> str:
+    # The Authorization header is hashed in so one caller's key never replays another caller's response.
+    query = scope.get("query_string", b"").decode("latin-1")
+    scope_text = "\x1f".join((scope["method"], scope["path"], query, headers.get("authorization", "")))
+    digest = hashlib.blake2b(scope_text.encode("utf-8"), digest_size=16).hexdigest()
+    return f"{KEY_PREFIX}{digest}:{key}"
+
+
+async def _read_body(receive) -> Optional[bytes]:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+def _replay_body(body: bytes, receive):
+    sent = False
+
+    async def replay():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return replay
+
+
+async def _send_response(send, status: int, raw_headers: RawHeaders, body: bytes) -> None:
+    await send({"type": "http.response.start", "status": status, "headers": raw_headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_error(send, status: int, detail: str) -> None:
+    body = json.dumps({"detail": detail}).encode("utf-8")
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode("latin-1"))]
+    await _send_response(send, status, headers, body)
@@ -1,11 +1,36 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-import os
-from routers import auth, jobs, users
-from db import init_db
+import time
+
+_STARTED = time.perf_counter()  # Cold-start clock: measured from the first import of the app module.
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
+from fastapi.responses import PlainTextResponse  # noqa: E402
+import os  # noqa: E402
+from routers import auth, autocomplete, export, jobs, users  # noqa: E402
+from autocomplete import autocomplete_index  # noqa: E402
+from boot import boot  # noqa: E402
+from cache import response_cache  # noqa: E402
+from db import (  # noqa: E402
+    ASYNC_OVERRIDES,
+    DB_MODE,
+    SQLITE_TUNED,
+    ReadSessionLocal,
+    ReadYourWritesMiddleware,
+    dispose_async_engine,
+    engine,
+)
+from idempotency import IdempotencyMiddleware  # noqa: E402
+from metrics import MetricsMiddleware, registry  # noqa: E402
+from sqlite_profile import SQLiteMaintenance  # noqa: E402
+from tasks import INLINE_WORKERS, Worker  # noqa: E402
+import background  # noqa: E402,F401  (registers the task handlers)
 
 app = FastAPI(title="LaunchCircle API", version="0.3.0")
 
+# Innermost, so replayed responses still get fresh CORS and Server-Timing headers.
+app.add_middleware(IdempotencyMiddleware)
+app.add_middleware(ReadYourWritesMiddleware)
+
 origins = [origin.strip() for origin in os.getenv("CORS_ORIGINS", "").split(",") if origin.strip()]
 if origins:
     app.add_middleware(
@@ -14,12 +39,37 @@ if origins:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["Link", "X-Next-Cursor", "Server-Timing", "Idempotent-Replayed"],
     )
+app.add_middleware(MetricsMiddleware)
+
+
+if DB_MODE == "async":
+    # Every router depends on get_db or get_read_db; swapping the providers moves all endpoints onto AsyncSession.
+    app.dependency_overrides.update(ASYNC_OVERRIDES)
 
 
 @app.on_event("startup")
 def _startup() -> None:
-    init_db(seed=True)
+    app.state.boot = boot(engine, _STARTED)
+    with ReadSessionLocal() as session:
+        autocomplete_index.build(session)  # Before the first keystroke, rather than on it.
+    app.state.worker = None
+    if INLINE_WORKERS:
+        app.state.worker = Worker(concurrency=INLINE_WORKERS)
+        app.state.worker.start()
+    app.state.sqlite_maintenance = SQLiteMaintenance(engine) if SQLITE_TUNED else None
+    if app.state.sqlite_maintenance is not None:
+        app.state.sqlite_maintenance.start()
+
+
+@app.on_event("shutdown")
+async def _shutdown() -> None:
+    if getattr(app.state, "worker", None) is not None:
+        app.state.worker.stop()
+    if getattr(app.state, "sqlite_maintenance", None) is not None:
+        app.state.sqlite_maintenance.stop()
+    await dispose_async_engine()
 
 
 @app.get("/api/health")
@@ -27,11 +77,24 @@ def health():
     return {"status": "ok"}
 
 
+@app.get("/api/cache/stats")
+def cache_stats():
+    return response_cache.stats()
+
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/api/info")
 def info():
-    return {"name": "LaunchCircle API", "version": "0.3.0"}
+    report = getattr(app.state, "boot", None)
+    return {"name": "LaunchCircle API", "version": "0.3.0", "boot": report.as_dict() if report else None}
 
 
 app.include_router(users.router)
 app.include_router(jobs.router)
 app.include_router(auth.router)
+app.include_router(export.router)
+app.include_router(autocomplete.router)
@@ -0,0 +1,284 @@
+# Batch all-pairs matching: scores every user against every other with sparse matrix products and stores the
+# top matches per user in user_matches. Incremental runs only redo the lists that profile changes can affect.
+#
+#   python match_batch.py            # incremental (a full run the first time)
+#   python match_batch.py --full     # recompute every list
+#
+# Needs numpy and scipy; the API only reads the table and runs without them.
+import argparse
+import hashlib
+import itertools
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Sequence, Set, Tuple
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+from matching import INTERESTS_WEIGHT, MATCH_TOP_K, SKILLS_WEIGHT, interest_tokens, skill_set
+from models import User, UserMatch, UserMatchState
+
+# Dense score blocks are rows x users cells; this caps each block at a few tens of MB whatever the user count.
+BLOCK_CELLS = 2_000_000
+ID_CHUNK = 500
+# Rows written between commits; a commit per score block would dominate the run time on SQLite.
+COMMIT_ROWS = 50_000
+
+
+@dataclass
+class MatchRunReport:
+    users: int = 0
+    changed: int = 0
+    deleted: int = 0
+    recomputed: int = 0
+    merged: int = 0
+    rows_written: int = 0
+    full: bool = False
+    seconds: float = 0.0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class _Profiles:
+    """Every user's skill and interest tokens as binary CSR matrices, rows ordered by user id."""
+
+    def __init__(self, rows: Sequence[Tuple[int, FrozenSet[str], FrozenSet[str]]]) -> None:
+        import numpy as np
+
+        self.ids = np.array([user_id for user_id, _, _ in rows], dtype=np.int64)
+        self.position = {user_id: index for index, (user_id, _, _) in enumerate(rows)}
+        self.skills = _binary_matrix([skills for _, skills, _ in rows])
+        self.interests = _binary_matrix([interests for _, _, interests in rows])
+        self.skill_sizes = np.diff(self.skills.indptr).astype(np.float64)
+        self.interest_sizes = np.diff(self.interests.indptr).astype(np.float64)
+        # Token x user, built once: the all-users product reuses it for every block.
+        self.skills_by_token = self.skills.T.tocsr()
+        self.interests_by_token = self.interests.T.tocsr()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def scores(self, rows, columns=None):
+        """Match scores for users at `rows` against users at `columns` (default: everyone), as int64 array.
+
+        Same arithmetic as matching._score_candidate, so the stored lists equal what the live index returns.
+        """
+        import numpy as np
+
+        width = len(self) if columns is None else len(columns)
+        total = np.zeros((len(rows), width), dtype=np.int64)
+        _add_weighted(total, self.skills, self.skills_by_token, self.skill_sizes, rows, columns, SKILLS_WEIGHT)
+        _add_weighted(
+            total, self.interests, self.interests_by_token, self.interest_sizes, rows, columns, INTERESTS_WEIGHT
+        )
+        np.minimum(total, 100, out=total)
+        return total
+
+
+def recompute_matches(session: Session, full: bool = False, top_k: int = MATCH_TOP_K) -> MatchRunReport:
+    import numpy as np
+
+    started = time.perf_counter()
+    rows = [
+        (user_id, skill_set(skills), interest_tokens(preferences))
+        for user_id, skills, preferences in session.execute(
+            select(User.id, User.skills, User.preferences).order_by(User.id)
+        )
+    ]
+    profiles = _Profiles(rows)
+    fingerprints = {user_id: _fingerprint(skills, interests) for user_id, skills, interests in rows}
+    previous = dict(session.execute(select(UserMatchState.user_id, UserMatchState.fingerprint)).all())
+    full = full or not previous
+
+    report = MatchRunReport(users=len(profiles), full=full)
+    if full:
+        changed = set(fingerprints)
+        deleted = set(previous) - changed
+        session.execute(delete(UserMatch))
+        session.execute(delete(UserMatchState))
+        affected = changed
+    else:
+        changed = {user_id for user_id, fingerprint in fingerprints.items() if previous.get(user_id) != fingerprint}
+        deleted = set(previous) - set(fingerprints)
+        for chunk in _chunks(sorted(deleted)):
+            session.execute(delete(UserMatch).where(UserMatch.user_id.in_(chunk)))
+            session.execute(delete(UserMatchState).where(UserMatchState.user_id.in_(chunk)))
+        # A list that holds a changed or deleted candidate may need candidates from outside it: redo it fully.
+        affected = changed | _lists_holding(session, changed | deleted)
+        affected &= set(fingerprints)
+    report.changed, report.deleted = len(changed), len(deleted)
+
+    everyone = np.arange(len(profiles))
+    committed = 0
+    affected_positions = np.array(sorted(profiles.position[user_id] for user_id in affected), dtype=np.int64)
+    for block in _blocks(affected_positions, len(profiles)):
+        scores = profiles.scores(block)
+        scores[np.arange(len(block)), block] = 0  # Nobody matches themselves.
+        lists = dict(zip(profiles.ids[block].tolist(), _top_k(scores, profiles.ids, top_k)))
+        report.rows_written += _replace_lists(session, lists, replace=not full)
+        report.recomputed += len(block)
+        committed = _commit_every(session, report.rows_written, committed)
+
+    if changed and not full:
+        # Everyone else keeps their list and only needs their new scores against the changed users merged in.
+        changed_positions = np.array(sorted(profiles.position[user_id] for user_id in changed), dtype=np.int64)
+        changed_ids = profiles.ids[changed_positions]
+        unaffected = np.setdiff1d(everyone, affected_positions, assume_unique=True)
+        for block in _blocks(unaffected, len(changed_positions)):
+            scores = profiles.scores(block, changed_positions)
+            hits = {
+                int(profiles.ids[position]): [
+                    (int(changed_ids[column]), int(scores[row, column])) for column in np.flatnonzero(scores[row])
+                ]
+                for row, position in enumerate(block)
+                if scores[row].any()
+            }
+            if not hits:
+                continue
+            lists = {}
+            for user_id, current in _current_lists(session, hits).items():
+                merged = sorted(current + hits[user_id], key=lambda pair: (-pair[1], pair[0]))[:top_k]
+                if merged != current:  # Most new scores fall below the existing top k.
+                    lists[user_id] = merged
+            report.rows_written += _replace_lists(session, lists, replace=True)
+            report.merged += len(lists)
+            committed = _commit_every(session, report.rows_written, committed)
+
+    computed_at = datetime.utcnow()
+    for chunk in _chunks(sorted(changed)):
+        if not full:
+            session.execute(delete(UserMatchState).where(UserMatchState.user_id.in_(chunk)))
+        states = [{"user_id": user_id, "fingerprint": fingerprints[user_id]} for user_id in chunk]
+        session.execute(insert(UserMatchState).values(computed_at=computed_at), states)
+    session.commit()
+    report.seconds = round(time.perf_counter() - started, 3)
+    return report
+
+
+def _binary_matrix(token_sets: Sequence[FrozenSet[str]]):
+    import numpy as np
+    from scipy import sparse
+
+    vocabulary: Dict[str, int] = {}
+    indptr = [0]
+    indices: List[int] = []
+    for tokens in token_sets:
+        indices.extend(vocabulary.setdefault(token, len(vocabulary)) for token in tokens)
+        indptr.append(len(indices))
+    data = np.ones(len(indices), dtype=np.float32)  # Overlap counts stay exact in float32 far beyond any skill list.
+    return sparse.csr_matrix((data, indices, indptr), shape=(len(token_sets), max(len(vocabulary), 1)))
+
+
+def _add_weighted(total, matrix, by_token, sizes, rows, columns, weight: int) -> None:
+    # Vectorized matching._weighted_overlap: int(overlap / max(a_size, b_size) * weight), 0 without overlap.
+    # Dense from here on: popular skills make most blocks mostly nonzero, and in-place passes beat scatter-adds.
+    import numpy as np
+
+    others = by_token if columns is None else matrix[columns].T.tocsr()
+    column_sizes = sizes if columns is None else sizes[columns]
+    overlap = (matrix[rows] @ others).toarray().astype(np.float64)
+    denominator = np.maximum(sizes[rows][:, None], column_sizes[None, :])
+    np.divide(overlap, denominator, out=overlap, where=overlap > 0)
+    overlap *= weight
+    np.floor(overlap, out=overlap)
+    total += overlap.astype(np.int64)
+
+
+def _top_k(scores, ids, k: int) -> Iterator[List[Tuple[int, int]]]:
+    # Best score first, then lowest candidate id, as SkillIndex.top_matches orders them. Columns are in id order.
+    import numpy as np
+
+    columns = scores.shape[1]
+    k = min(k, columns)
+    if k == 0:
+        yield from ([] for _ in range(scores.shape[0]))
+        return
+    keys = scores * columns + (columns - 1 - np.arange(columns))
+    best = np.argpartition(-keys, k - 1, axis=1)[:, :k]
+    best = np.take_along_axis(best, np.argsort(-np.take_along_axis(keys, best, axis=1), axis=1), axis=1)
+    best_scores = np.take_along_axis(scores, best, axis=1)
+    for row_columns, row_scores in zip(best, best_scores):
+        keep = row_scores > 0
+        yield list(zip(ids[row_columns[keep]].tolist(), row_scores[keep].tolist()))
+
+
+def _blocks(positions, columns: int) -> Iterator:
+    size = max(1, BLOCK_CELLS // max(columns, 1))
+    for start in range(0, len(positions), size):
+        yield positions[start : start + size]
+
+
+def _replace_lists(session: Session, lists: Dict[int, List[Tuple[int, int]]], replace: bool) -> int:
+    if replace:
+        for chunk in _chunks(list(lists)):
+            session.execute(delete(UserMatch).where(UserMatch.user_id.in_(chunk)))
+    values = [
+        {"user_id": user_id, "rank": rank, "candidate_id": candidate_id, "score": score}
+        for user_id, matches in lists.items()
+        for rank, (candidate_id, score) in enumerate(matches)
+    ]
+    if values:
+        # Core insert on the table: the ORM bulk path costs more per row than the scoring does.
+        session.connection().execute(insert(UserMatch.__table__), values)
+    return len(values)
+
+
+def _commit_every(session: Session, written: int, committed: int) -> int:
+    if written - committed < COMMIT_ROWS:
+        return committed
+    session.commit()
+    return written
+
+
+def _lists_holding(session: Session, candidate_ids: Set[int]) -> Set[int]:
+    holders: Set[int] = set()
+    for chunk in _chunks(sorted(candidate_ids)):
+        holders.update(
+            session.execute(select(UserMatch.user_id).where(UserMatch.candidate_id.in_(chunk)).distinct()).scalars()
+        )
+    return holders
+
+
+def _current_lists(session: Session, user_ids: Iterable[int]) -> Dict[int, List[Tuple[int, int]]]:
+    lists: Dict[int, List[Tuple[int, int]]] = {user_id: [] for user_id in user_ids}
+    for chunk in _chunks(sorted(lists)):
+        query = (
+            select(UserMatch.user_id, UserMatch.candidate_id, UserMatch.score)
+            .where(UserMatch.user_id.in_(chunk))
+            .order_by(UserMatch.user_id, UserMatch.rank)
+        )
+        for user_id, candidate_id, score in session.execute(query):
+            lists[user_id].append((candidate_id, score))
+    return lists
+
+
+def _fingerprint(skills: FrozenSet[str], interests: FrozenSet[str]) -> str:
+    text = "\x1f".join(sorted(skills)) + "\x1e" + "\x1f".join(sorted(interests))
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _chunks(values: List[int]) -> Iterator[List[int]]:
+    iterator = iter(values)
+    while chunk := list(itertools.islice(iterator, ID_CHUNK)):
+        yield chunk
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Precompute every user's top matches into user_matches.")
+    parser.add_argument("--full", action="store_true", help="Recompute every list instead of only changed ones")
+    parser.add_argument("--top-k", type=int, default=MATCH_TOP_K)
+    args = parser.parse_args()
+
+    from db import SessionLocal
+
+    with SessionLocal() as session:
+        report = recompute_matches(session, full=args.full, top_k=args.top_k)
+    print(
+        f"{'full' if report.full else 'incremental'} run over {report.users} users: {report.changed} changed, "
+        f"{report.deleted} deleted, {report.recomputed} lists recomputed, {report.merged} merged, "
+        f"{report.rows_written} rows written in {report.seconds:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
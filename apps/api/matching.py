@@ -1,61 +1,221 @@
-# Simple founder-matching based on shared skills and interests.
-from typing import List
+# Founder matching based on shared skills and interests, served from precomputed lists or an in-process index.
+import heapq
+import threading
+from collections import defaultdict
+from typing import Dict, FrozenSet, List, Optional, Set
 from sqlalchemy import select
 from sqlalchemy.orm import Session
-from models import User
+from models import User, UserMatch
 from schemas import MatchSuggestionOut
-from utils import normalize_tokens, split_csv
+from utils import normalize_tokens, skill_tokens
 
+SKILLS_WEIGHT = 60
+INTERESTS_WEIGHT = 40
+# Matches kept per user by match_batch.py, and the largest limit the matches endpoint accepts.
+MATCH_TOP_K = 50
 
-def find_user_matches(db: Session, user_id: int, limit: int = 10) -> List[MatchSuggestionOut]:
-    subject = db.get(User, user_id)
-    if not subject:
+
+def skill_set(skills: Optional[str]) -> FrozenSet[str]:
+    return frozenset(skill_tokens(skills))
+
+
+def interest_tokens(preferences: Optional[dict]) -> FrozenSet[str]:
+    # Preferences are free-form key/value pairs (work_style, availability, ...); each pair is one interest.
+    if not isinstance(preferences, dict):
+        return frozenset()
+    pairs = [f"{key}:{value}" for key, value in preferences.items() if value not in (None, "")]
+    return frozenset(normalize_tokens(pairs))
+
+
+class SkillIndex:
+    """Token -> user id posting lists, kept in sync with crud writes.
+
+    Skills and interests live in separate posting maps so a shared token in one
+    never counts towards the other's overlap score.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._skill_postings: Dict[str, Set[int]] = defaultdict(set)
+        self._interest_postings: Dict[str, Set[int]] = defaultdict(set)
+        self._skills: Dict[int, FrozenSet[str]] = {}
+        self._interests: Dict[int, FrozenSet[str]] = {}
+        self.built = False
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._skills
+
+    def build(self, db: Session) -> None:
+        rows = db.execute(select(User.id, User.skills, User.preferences)).all()
+        with self._lock:
+            self._clear()
+            for user_id, skills, preferences in rows:
+                self._add(user_id, skill_set(skills), interest_tokens(preferences))
+            self.built = True
+
+    def upsert(self, user_id: int, skills: Optional[str], preferences: Optional[dict]) -> None:
+        if not self.built:
+            return  # The first build() will read the row from the database.
+        with self._lock:
+            self._remove(user_id)
+            self._add(user_id, skill_set(skills), interest_tokens(preferences))
+
+    def remove(self, user_id: int) -> None:
+        with self._lock:
+            self._remove(user_id)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._clear()
+            self.built = False
+
+    def top_matches(self, user_id: int, limit: int) -> List[tuple[int, int]]:
+        # Returns (score, user_id) pairs for the best `limit` candidates, best first.
+        with self._lock:
+            subject_skills = self._skills.get(user_id, frozenset())
+            subject_interests = self._interests.get(user_id, frozenset())
+            skill_overlap = _count_overlap(subject_skills, self._skill_postings, user_id)
+            interest_overlap = _count_overlap(subject_interests, self._interest_postings, user_id)
+
+            scored = []
+            for candidate_id in skill_overlap.keys() | interest_overlap.keys():
+                score = min(
+                    100,
+                    _weighted_overlap(
+                        skill_overlap.get(candidate_id, 0),
+                        len(subject_skills),
+                        len(self._skills[candidate_id]),
+                        SKILLS_WEIGHT,
+                    )
+                    + _weighted_overlap(
+                        interest_overlap.get(candidate_id, 0),
+                        len(subject_interests),
+                        len(self._interests[candidate_id]),
+                        INTERESTS_WEIGHT,
+                    ),
+                )
+                if score > 0:
+                    scored.append((score, -candidate_id))
+
+        return [(score, -neg_id) for score, neg_id in heapq.nlargest(limit, scored)]
+
+    def _add(self, user_id: int, skills: FrozenSet[str], interests: FrozenSet[str]) -> None:
+        self._skills[user_id] = skills
+        self._interests[user_id] = interests
+        for token in skills:
+            self._skill_postings[token].add(user_id)
+        for token in interests:
+            self._interest_postings[token].add(user_id)
+
+    def _remove(self, user_id: int) -> None:
+        for token in self._skills.pop(user_id, frozenset()):
+            _discard_posting(self._skill_postings, token, user_id)
+        for token in self._interests.pop(user_id, frozenset()):
+            _discard_posting(self._interest_postings, token, user_id)
+
+    def _clear(self) -> None:
+        self._skill_postings.clear()
+        self._interest_postings.clear()
+        self._skills.clear()
+        self._interests.clear()
+
+
+skill_index = SkillIndex()
+
+
+def ensure_index(db: Session) -> SkillIndex:
+    if not skill_index.built:
+        skill_index.build(db)
+    return skill_index
+
+
+def index_user(user: User) -> None:
+    skill_index.upsert(user.id, user.skills, user.preferences)
+
+
+def find_user_matches(db: Session, user_id: int, limit: int = 10) -> Optional[List[MatchSuggestionOut]]:
+    precomputed = precomputed_matches(db, user_id, limit)
+    if precomputed:
+        return precomputed
+
+    index = ensure_index(db)
+    if user_id not in index:
+        # Written by another process since the index was built; pull it in once.
+        subject = db.get(User, user_id)
+        if not subject:
+            return None
+        index_user(subject)
+
+    top = index.top_matches(user_id, limit)
+    if not top:
         return []
 
-    candidates = db.execute(select(User).where(User.id != user_id)).scalars().unique().all()
-    scored = []
-    for candidate in candidates:
-        score = _score_candidate(subject, candidate)
-        if score > 0:
-            scored.append((score, candidate))
-
-    scored.sort(key=lambda item: item[0], reverse=True)
-    top_matches = scored[:limit]
-
-    return [
-        MatchSuggestionOut(
-            user_id=user.id,
-            name=user.name,
-            headline=user.headline,
-            founder_type=user.founder_type,
-            stage_preference=user.stage_preference,
-            time_zone=user.time_zone,
-            commitment_level=user.commitment_level,
-            skills=user.skills,
-            looking_for=user.looking_for,
-            match_score=score,
-        )
-        for score, user in top_matches
-    ]
+    users = {
+        user.id: user
+        for user in db.execute(select(User).where(User.id.in_([uid for _, uid in top]))).scalars()
+    }
+    return [_suggestion(user, score) for score, uid in top if (user := users.get(uid)) is not None]
+
+
+def precomputed_matches(db: Session, user_id: int, limit: int) -> List[MatchSuggestionOut]:
+    # Empty when the batch job has not stored a list for this user (or the profile changed since it ran).
+    query = (
+        select(UserMatch.score, User)
+        .join(User, User.id == UserMatch.candidate_id)
+        .where(UserMatch.user_id == user_id, UserMatch.rank < limit)
+        .order_by(UserMatch.rank)
+    )
+    return [_suggestion(user, score) for score, user in db.execute(query)]
+
+
+def _suggestion(user: User, score: int) -> MatchSuggestionOut:
+    return MatchSuggestionOut(
+        user_id=user.id,
+        name=user.name,
+        headline=user.headline,
+        role=user.role,
+        location=user.location,
+        time_zone=user.time_zone,
+        availability=user.availability,
+        looking_for_cofounder=user.looking_for_cofounder,
+        skills=user.skills,
+        match_score=score,
+    )
+
+
+def _count_overlap(tokens: FrozenSet[str], postings: Dict[str, Set[int]], exclude_id: int) -> Dict[int, int]:
+    counts: Dict[int, int] = defaultdict(int)
+    for token in tokens:
+        for candidate_id in postings.get(token, ()):
+            if candidate_id != exclude_id:
+                counts[candidate_id] += 1
+    return counts
+
+
+def _discard_posting(postings: Dict[str, Set[int]], token: str, user_id: int) -> None:
+    posting = postings.get(token)
+    if posting is None:
+        return
+    posting.discard(user_id)
+    if not posting:
+        del postings[token]
 
 
 def _score_candidate(subject: User, candidate: User) -> int:
-    subject_skills = set(normalize_tokens(split_csv(subject.skills)))
-    candidate_skills = set(normalize_tokens(split_csv(candidate.skills)))
-    skills_score = _overlap_score(subject_skills, candidate_skills, weight=60)
+    # Reference scorer for a single pair; the index computes the same score from posting-list overlap counts.
+    skills_score = _overlap_score(skill_set(subject.skills), skill_set(candidate.skills), SKILLS_WEIGHT)
+    interests_score = _overlap_score(
+        interest_tokens(subject.preferences), interest_tokens(candidate.preferences), INTERESTS_WEIGHT
+    )
+    return min(100, skills_score + interests_score)
 
-    subject_interests = set(normalize_tokens(split_csv(subject.looking_for)))
-    candidate_interests = set(normalize_tokens(split_csv(candidate.looking_for)))
-    interests_score = _overlap_score(subject_interests, candidate_interests, weight=40)
 
-    total = skills_score + interests_score
-    return min(100, total)
+def _overlap_score(a: FrozenSet[str], b: FrozenSet[str], weight: int) -> int:
+    return _weighted_overlap(len(a & b), len(a), len(b), weight)
 
 
-def _overlap_score(a: set[str], b: set[str], weight: int) -> int:
-    if not a or not b:
+def _weighted_overlap(overlap: int, a_size: int, b_size: int, weight: int) -> int:
+    if not overlap or not a_size or not b_size:
         return 0
-    overlap = len(a & b)
-    denominator = max(len(a), len(b))
-    fraction = overlap / denominator
+    fraction = overlap / max(a_size, b_size)
     return int(fraction * weight)
@@ -0,0 +1,320 @@
+# Request and database instrumentation, exposed in the Prometheus text format at /api/metrics.
+import asyncio
+import functools
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+UNMATCHED_ROUTE = "<unmatched>"
+
+LabelValues = Tuple[str, ...]
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def _label_text(self, values: LabelValues, extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labels, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, amount: float = 1, *labels: str) -> None:
+        self.inc(-amount, *labels)
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return self.header() + [f"{self.name}{self._label_text(labels)} {_number(v)}" for labels, v in values]
+
+
+class Counter(Gauge):
+    kind = "counter"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS) -> None:
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+        self._series: Dict[LabelValues, List[float]] = {}  # per-bucket counts, then +Inf count, then sum
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            snapshot = sorted((labels, list(series)) for labels, series in self._series.items())
+        lines = self.header()
+        for labels, series in snapshot:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{self._label_text(labels, le)} {_number(cumulative)}")
+            lines.append(f"{self.name}_sum{self._label_text(labels)} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{self._label_text(labels)} {_number(cumulative)}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[_Metric]]] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collect: Callable[[], Iterable[_Metric]]) -> None:
+        # Collectors build gauges at scrape time from state owned elsewhere (pools, caches).
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        metrics = list(self._metrics)
+        for collect in self._collectors:
+            metrics.extend(collect())
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+registry = Registry()
+REQUESTS_IN_FLIGHT = registry.register(Gauge("launchcircle_http_requests_in_flight", "Requests being served"))
+REQUEST_SECONDS = registry.register(
+    Histogram("launchcircle_http_request_duration_seconds", "Request latency", ("method", "route", "status"))
+)
+RESPONSE_BYTES = registry.register(
+    Histogram("launchcircle_http_response_size_bytes", "Response body size", ("method", "route"), SIZE_BUCKETS)
+)
+REQUEST_STATEMENTS = registry.register(
+    Histogram("launchcircle_db_statements_per_request", "SQL statements per request", ("route",), STATEMENT_BUCKETS)
+)
+REQUEST_DB_SECONDS = registry.register(
+    Histogram("launchcircle_db_time_per_request_seconds", "Time spent in SQL statements per request", ("route",))
+)
+STATEMENT_SECONDS = registry.register(
+    Histogram("launchcircle_db_statement_duration_seconds", "SQL statement latency", ("engine",))
+)
+POOL_WAIT_SECONDS = registry.register(
+    Histogram("launchcircle_db_pool_checkout_wait_seconds", "Time waiting for a pooled connection", ("engine",))
+)
+
+
+@dataclass
+class RequestStats:
+    started: float
+    statements: int = 0
+    db_seconds: float = 0.0
+    handler_done: Optional[float] = None
+
+    def server_timing(self, now: float) -> str:
+        serialize = now - self.handler_done if self.handler_done is not None else 0.0
+        return (
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.statements} queries", '
+            f"serialize;dur={serialize * 1000:.1f}, total;dur={(now - self.started) * 1000:.1f}"
+        )
+
+
+# The same RequestStats object is visible from the threadpool and run_sync, since both copy the context.
+_current: ContextVar[Optional[RequestStats]] = ContextVar("launchcircle_request_stats", default=None)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: times each request, counts in-flight requests and body bytes, adds Server-Timing."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(started=time.perf_counter())
+        token = _current.set(stats)
+        status = 500
+        size = 0
+
+        async def send_with_timing(message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing(time.perf_counter()))
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            _current.reset(token)
+            route = scope.get("route")
+            route_path = route.path if isinstance(route, APIRoute) else UNMATCHED_ROUTE
+            method = scope["method"]
+            REQUEST_SECONDS.observe(time.perf_counter() - stats.started, method, route_path, str(status))
+            RESPONSE_BYTES.observe(size, method, route_path)
+            REQUEST_STATEMENTS.observe(stats.statements, route_path)
+            REQUEST_DB_SECONDS.observe(stats.db_seconds, route_path)
+
+
+class TimedRoute(APIRoute):
+    # Marks when the endpoint returns, so Server-Timing can split serialization from the rest of the request.
+    def __init__(self, path: str, endpoint: Callable, **kwargs) -> None:
+        super().__init__(path, _mark_handler_done(endpoint), **kwargs)
+
+
+def _mark_handler_done(endpoint: Callable) -> Callable:
+    if asyncio.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def timed_async(*args, **kwargs):
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                _handler_done()
+
+        return timed_async
+
+    @functools.wraps(endpoint)
+    def timed(*args, **kwargs):
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            _handler_done()
+
+    return timed
+
+
+def _handler_done() -> None:
+    stats = _current.get()
+    if stats is not None:
+        stats.handler_done = time.perf_counter()
+
+
+_instrumented: Dict[str, Engine] = {}
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Times every statement (attributed to the current request) and the pool's checkout wait for `engine`."""
+    if _instrumented.get(name) is engine:
+        return
+    _instrumented[name] = engine  # A re-created engine (e.g. after dispose) replaces the old one.
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["metrics_started"].pop()
+        STATEMENT_SECONDS.observe(elapsed, name)
+        stats = _current.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.db_seconds += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        started = context.connection.info.get("metrics_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+    pool = engine.pool
+    if hasattr(pool, "_do_get"):
+        # QueuePool.connect() blocks in _do_get while the pool is exhausted; time it from outside.
+        checkout = pool._do_get
+
+        def timed_checkout():
+            started = time.perf_counter()
+            try:
+                return checkout()
+            finally:
+                POOL_WAIT_SECONDS.observe(time.perf_counter() - started, name)
+
+        pool._do_get = timed_checkout
+
+
+def _pool_gauges() -> Iterable[_Metric]:
+    size = Gauge("launchcircle_db_pool_size", "Configured pool size", ("engine",))
+    checked_out = Gauge("launchcircle_db_pool_checked_out", "Connections currently checked out", ("engine",))
+    overflow = Gauge("launchcircle_db_pool_overflow", "Connections opened beyond the pool size", ("engine",))
+    saturation = Gauge("launchcircle_db_pool_saturation", "Checked out / (size + max overflow)", ("engine",))
+    for name, engine in sorted(_instrumented.items()):
+        pool = engine.pool
+        if not hasattr(pool, "checkedout"):
+            continue
+        capacity = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+        size.set(pool.size(), name)
+        checked_out.set(pool.checkedout(), name)
+        overflow.set(max(pool.overflow(), 0), name)
+        saturation.set(pool.checkedout() / capacity if capacity else 0.0, name)
+    return (size, checked_out, overflow, saturation)
+
+
+def _cache_counters() -> Iterable[_Metric]:
+    from cache import response_cache
+
+    hits = Counter("launchcircle_cache_hits_total", "Response cache hits", ("namespace",))
+    misses = Counter("launchcircle_cache_misses_total", "Response cache misses", ("namespace",))
+    for namespace, counts in response_cache.stats()["namespaces"].items():
+        hits.set(counts["hits"], namespace)
+        misses.set(counts["misses"], namespace)
+    return (hits, misses)
+
+
+registry.add_collector(_pool_gauges)
+registry.add_collector(_cache_counters)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
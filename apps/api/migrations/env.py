@@ -24,6 +24,10 @@ target_metadata = Base.metadata
 # my_important_option = config.get_main_option("my_important_option")
 # ... etc.
 
+# Use the same DATABASE_URL/POSTGRES_URL resolution as the app unless -x url=... is given.
+from db import _database_url  # type: ignore
+config.set_main_option("sqlalchemy.url", context.get_x_argument(as_dictionary=True).get("url", _database_url()))
+
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
@@ -56,6 +60,14 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
+    # boot.py passes the connection that holds its migration lock.
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
@@ -0,0 +1,101 @@
+"""initial schema: users, job posts, applications
+
+Revision ID: 0001_initial
+Revises:
+Create Date: 2026-10-18 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_initial"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ROLE_TYPES = (
+    "founder",
+    "software_developer",
+    "software_engineer",
+    "designer",
+    "product_manager",
+    "marketer",
+    "growth",
+    "sales",
+    "operations",
+    "job_seeker",
+    "job_provider",
+)
+APPLICATION_STATUSES = ("applied", "reviewed", "interviewing", "rejected", "accepted")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(120), nullable=False),
+        sa.Column("email", sa.String(255), nullable=True, unique=True),
+        sa.Column("password_hash", sa.String(255), nullable=True),
+        sa.Column("profile_photo", sa.String(255), nullable=True),
+        sa.Column("headline", sa.String(255), nullable=True),
+        sa.Column("bio", sa.Text(), nullable=True),
+        sa.Column("experience", sa.Text(), nullable=True),
+        sa.Column("startups", sa.Text(), nullable=True),
+        sa.Column("portfolio", sa.Text(), nullable=True),
+        sa.Column("resume_url", sa.String(255), nullable=True),
+        sa.Column("looking_for_cofounder", sa.Boolean(), nullable=False),
+        sa.Column("availability", sa.String(80), nullable=True),
+        sa.Column("skills", sa.Text(), nullable=True),
+        sa.Column("location", sa.String(120), nullable=True),
+        sa.Column("time_zone", sa.String(80), nullable=True),
+        sa.Column("role", sa.Enum(*ROLE_TYPES, name="roletype"), nullable=False),
+        sa.Column("preferences", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+
+    op.create_table(
+        "job_posts",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String(180), nullable=False),
+        sa.Column("headline", sa.String(255), nullable=True),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("role", sa.Enum(*ROLE_TYPES, name="roletype", create_type=False), nullable=False),
+        sa.Column("skills", sa.Text(), nullable=True),
+        sa.Column("location", sa.String(120), nullable=True),
+        sa.Column("time_zone", sa.String(80), nullable=True),
+        sa.Column("work_style", sa.String(60), nullable=True),
+        sa.Column("availability", sa.String(80), nullable=True),
+        sa.Column("timeline", sa.String(120), nullable=True),
+        sa.Column("compensation", sa.String(120), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+    )
+    op.create_index("ix_job_posts_id", "job_posts", ["id"])
+
+    op.create_table(
+        "job_applications",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("job_post_id", sa.Integer(), sa.ForeignKey("job_posts.id"), nullable=False),
+        sa.Column("applicant_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("status", sa.Enum(*APPLICATION_STATUSES, name="applicationstatus"), nullable=False),
+        sa.Column("cover_letter", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_job_applications_id", "job_applications", ["id"])
+    op.create_index("ix_job_applications_job_post_id", "job_applications", ["job_post_id"])
+    op.create_index("ix_job_applications_applicant_id", "job_applications", ["applicant_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("job_applications")
+    op.drop_table("job_posts")
+    op.drop_table("users")
+    sa.Enum(name="applicationstatus").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="roletype").drop(op.get_bind(), checkfirst=True)
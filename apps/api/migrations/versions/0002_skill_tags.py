@@ -0,0 +1,67 @@
+"""normalized skill tag tables for users and job posts
+
+Revision ID: 0002_skill_tags
+Revises: 0001_initial
+Create Date: 2026-10-18 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_skill_tags"
+down_revision: Union[str, Sequence[str], None] = "0001_initial"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+
+def _tokens(csv: str | None) -> list[str]:
+    # Frozen copy of utils.skill_tokens so the migration does not change if the app helper does.
+    if not csv:
+        return []
+    tokens = (part.strip().lower()[:120] for part in csv.split(","))
+    return list(dict.fromkeys(token for token in tokens if token))
+
+
+def _backfill(source: str, tag_table: sa.Table, owner_column: str) -> None:
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(f"SELECT id, skills FROM {source} WHERE skills IS NOT NULL AND skills <> ''"))
+    batch: list[dict] = []
+    for owner_id, skills in rows:
+        batch.extend({owner_column: owner_id, "skill": skill} for skill in _tokens(skills))
+        if len(batch) >= BATCH_SIZE:
+            op.bulk_insert(tag_table, batch)
+            batch = []
+    if batch:
+        op.bulk_insert(tag_table, batch)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    user_skills = op.create_table(
+        "user_skills",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("skill", sa.String(120), primary_key=True),
+    )
+    op.create_index("ix_user_skills_skill_user_id", "user_skills", ["skill", "user_id"])
+
+    job_post_skills = op.create_table(
+        "job_post_skills",
+        sa.Column("job_post_id", sa.Integer(), sa.ForeignKey("job_posts.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("skill", sa.String(120), primary_key=True),
+    )
+    op.create_index("ix_job_post_skills_skill_job_post_id", "job_post_skills", ["skill", "job_post_id"])
+
+    _backfill("users", user_skills, "user_id")
+    _backfill("job_posts", job_post_skills, "job_post_id")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("job_post_skills")
+    op.drop_table("user_skills")
@@ -0,0 +1,36 @@
+"""composite (created_at, id) indexes for keyset pagination
+
+Revision ID: 0003_keyset_indexes
+Revises: 0002_skill_tags
+Create Date: 2026-10-18 11:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_keyset_indexes"
+down_revision: Union[str, Sequence[str], None] = "0002_skill_tags"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_users_created_at_id", "users", ["created_at", "id"])
+    op.create_index("ix_job_posts_created_at_id", "job_posts", ["created_at", "id"])
+    op.create_index(
+        "ix_job_applications_job_post_id_created_at_id",
+        "job_applications",
+        ["job_post_id", "created_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_job_applications_job_post_id_created_at_id", table_name="job_applications")
+    op.drop_index("ix_job_posts_created_at_id", table_name="job_posts")
+    op.drop_index("ix_users_created_at_id", table_name="users")
@@ -0,0 +1,68 @@
+"""full-text search: tsvector + GIN on Postgres, FTS5 tables on SQLite
+
+Revision ID: 0004_fulltext_search
+Revises: 0003_keyset_indexes
+Create Date: 2026-10-18 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_fulltext_search"
+down_revision: Union[str, Sequence[str], None] = "0003_keyset_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_COLUMNS = {
+    "users": ("name", "headline", "bio", "experience", "skills", "location", "availability"),
+    "job_posts": ("title", "headline", "description", "skills", "location", "work_style", "availability"),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    for table_name, columns in SEARCH_COLUMNS.items():
+        if dialect == "postgresql":
+            document = " || ' ' || ".join(f"coalesce({name}, '')" for name in columns)
+            op.execute(
+                f"ALTER TABLE {table_name} ADD COLUMN search_vector tsvector "
+                f"GENERATED ALWAYS AS (to_tsvector('english', {document})) STORED"
+            )
+            op.execute(f"CREATE INDEX ix_{table_name}_search_vector ON {table_name} USING GIN (search_vector)")
+        elif dialect == "sqlite":
+            fts = f"{table_name}_fts"
+            names = ", ".join(columns)
+            new_values = ", ".join(f"new.{name}" for name in columns)
+            old_values = ", ".join(f"old.{name}" for name in columns)
+            op.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5({names}, content='{table_name}', content_rowid='id')")
+            op.execute(
+                f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table_name} BEGIN "
+                f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END"
+            )
+            op.execute(
+                f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table_name} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); END"
+            )
+            op.execute(
+                f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {names} ON {table_name} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); "
+                f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END"
+            )
+            op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    for table_name in SEARCH_COLUMNS:
+        if dialect == "postgresql":
+            op.drop_index(f"ix_{table_name}_search_vector", table_name=table_name)
+            op.drop_column(table_name, "search_vector")
+        elif dialect == "sqlite":
+            for suffix in ("ai", "ad", "au"):
+                op.execute(f"DROP TRIGGER IF EXISTS {table_name}_fts_{suffix}")
+            op.execute(f"DROP TABLE IF EXISTS {table_name}_fts")
@@ -0,0 +1,42 @@
+"""precomputed user matches and per-user match fingerprints
+
+Revision ID: 0005_user_matches
+Revises: 0004_fulltext_search
+Create Date: 2026-10-18 16:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_user_matches"
+down_revision: Union[str, Sequence[str], None] = "0004_fulltext_search"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "user_matches",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("rank", sa.Integer(), primary_key=True),
+        sa.Column("candidate_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("score", sa.Integer(), nullable=False),
+    )
+    op.create_index("ix_user_matches_candidate_id", "user_matches", ["candidate_id"])
+    op.create_table(
+        "user_match_state",
+        sa.Column("user_id", sa.Integer(), primary_key=True),
+        sa.Column("fingerprint", sa.String(32), nullable=False),
+        sa.Column("computed_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("user_match_state")
+    op.drop_table("user_matches")
@@ -0,0 +1,37 @@
+"""one application per applicant and job post
+
+Revision ID: 0006_unique_applications
+Revises: 0005_user_matches
+Create Date: 2026-10-18 18:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_unique_applications"
+down_revision: Union[str, Sequence[str], None] = "0005_user_matches"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Retried requests may already have stored duplicates; keep the earliest application of each pair.
+    op.execute(
+        "DELETE FROM job_applications WHERE id NOT IN "
+        "(SELECT min(id) FROM job_applications GROUP BY job_post_id, applicant_id)"
+    )
+    op.create_index(
+        "uq_job_applications_job_post_id_applicant_id",
+        "job_applications",
+        ["job_post_id", "applicant_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("uq_job_applications_job_post_id_applicant_id", table_name="job_applications")
@@ -0,0 +1,44 @@
+"""per-post application counters
+
+Revision ID: 0007_application_counters
+Revises: 0006_unique_applications
+Create Date: 2026-10-18 19:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_application_counters"
+down_revision: Union[str, Sequence[str], None] = "0006_unique_applications"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STATUSES = ("applied", "reviewed", "interviewing", "rejected", "accepted")
+COLUMNS = ("applications_count", *(f"{status}_count" for status in STATUSES))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for column in COLUMNS:
+        op.add_column("job_posts", sa.Column(column, sa.Integer(), server_default="0", nullable=False))
+    # Backfill once with correlated counts; afterwards the write paths keep the columns current.
+    assignments = ["applications_count = (SELECT count(*) FROM job_applications a WHERE a.job_post_id = job_posts.id)"]
+    assignments += [
+        f"{status}_count = (SELECT count(*) FROM job_applications a "
+        f"WHERE a.job_post_id = job_posts.id AND a.status = '{status}')"
+        for status in STATUSES
+    ]
+    op.execute(f"UPDATE job_posts SET {', '.join(assignments)}")
+    op.create_index("ix_job_posts_applications_count_id", "job_posts", ["applications_count", "id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_job_posts_applications_count_id", table_name="job_posts")
+    with op.batch_alter_table("job_posts") as batch:
+        for column in reversed(COLUMNS):
+            batch.drop_column(column)
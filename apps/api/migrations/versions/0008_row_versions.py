@@ -0,0 +1,43 @@
+"""row versions for conditional GETs
+
+Revision ID: 0008_row_versions
+Revises: 0007_application_counters
+Create Date: 2026-10-18 21:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_row_versions"
+down_revision: Union[str, Sequence[str], None] = "0007_application_counters"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("users", "job_posts")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Plain ADD/DROP COLUMN rather than batch mode, which would rebuild the tables and drop SQLite's FTS triggers.
+    # The placeholder default only lets existing rows satisfy NOT NULL until they are backfilled.
+    for table in TABLES:
+        op.add_column(table, sa.Column("version", sa.Integer(), server_default="1", nullable=False))
+        op.add_column(
+            table,
+            sa.Column("updated_at", sa.DateTime(), server_default=sa.text("'1970-01-01 00:00:00'"), nullable=False),
+        )
+        # Existing rows start out last modified when they were created.
+        op.execute(f"UPDATE {table} SET updated_at = created_at")
+        if op.get_bind().dialect.name != "sqlite":
+            op.alter_column(table, "updated_at", server_default=None)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.drop_column(table, "updated_at")
+        op.drop_column(table, "version")
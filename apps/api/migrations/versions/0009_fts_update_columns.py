@@ -0,0 +1,51 @@
+"""re-index SQLite FTS rows only when indexed text changes
+
+Revision ID: 0009_fts_update_columns
+Revises: 0008_row_versions
+Create Date: 2026-10-19 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009_fts_update_columns"
+down_revision: Union[str, Sequence[str], None] = "0008_row_versions"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_COLUMNS = {
+    "users": ("name", "headline", "bio", "experience", "skills", "location", "availability"),
+    "job_posts": ("title", "headline", "description", "skills", "location", "work_style", "availability"),
+}
+
+
+def _replace_update_trigger(indexed_only: bool) -> None:
+    # The update triggers from 0004 fired on every UPDATE (counters, row versions, passwords) and re-indexed the row.
+    for table_name, columns in SEARCH_COLUMNS.items():
+        fts = f"{table_name}_fts"
+        names = ", ".join(columns)
+        new_values = ", ".join(f"new.{name}" for name in columns)
+        old_values = ", ".join(f"old.{name}" for name in columns)
+        of = f" OF {names}" if indexed_only else ""
+        op.execute(f"DROP TRIGGER IF EXISTS {fts}_au")
+        op.execute(
+            f"CREATE TRIGGER {fts}_au AFTER UPDATE{of} ON {table_name} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); "
+            f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END"
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Postgres keeps search_vector as a generated column; there is no trigger to change.
+    if op.get_bind().dialect.name == "sqlite":
+        _replace_update_trigger(True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "sqlite":
+        _replace_update_trigger(False)
@@ -1,11 +1,20 @@
 # ORM models for LaunchCircle: users, projects, needs, and matches.
 import enum
 from datetime import datetime
-from sqlalchemy import JSON, Boolean, Column, DateTime, Enum, ForeignKey, Integer, String, Text
+from sqlalchemy import JSON, Boolean, Column, DateTime, Enum, ForeignKey, Index, Integer, String, Text, literal_column
 from sqlalchemy.orm import relationship
 from db import Base
 
 
+# Row versions for conditional GETs: every UPDATE issued through SQLAlchemy bumps both, whichever code path runs it.
+def _version_column():
+    return Column(Integer, default=1, server_default="1", onupdate=literal_column("version + 1"), nullable=False)
+
+
+def _updated_at_column():
+    return Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+
 class RoleType(str, enum.Enum):
     founder = "founder"
     software_developer = "software_developer"
@@ -22,6 +31,7 @@ class RoleType(str, enum.Enum):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (Index("ix_users_created_at_id", "created_at", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(120), nullable=False)
@@ -42,13 +52,20 @@ class User(Base):
     role = Column(Enum(RoleType), nullable=False)
     preferences = Column(JSON, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = _updated_at_column()
+    version = _version_column()
 
     job_posts = relationship("JobPost", back_populates="owner", cascade="all, delete")
     applications = relationship("JobApplication", back_populates="applicant", cascade="all, delete")
+    skill_tags = relationship("UserSkill", cascade="all, delete-orphan")
 
 
 class JobPost(Base):
     __tablename__ = "job_posts"
+    __table_args__ = (
+        Index("ix_job_posts_created_at_id", "created_at", "id"),
+        Index("ix_job_posts_applications_count_id", "applications_count", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(180), nullable=False)
@@ -63,10 +80,37 @@ class JobPost(Base):
     timeline = Column(String(120), nullable=True)
     compensation = Column(String(120), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = _updated_at_column()
+    version = _version_column()
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # Denormalized from job_applications by the apply and status-change writes; counters.py repairs drift.
+    applications_count = Column(Integer, default=0, server_default="0", nullable=False)
+    applied_count = Column(Integer, default=0, server_default="0", nullable=False)
+    reviewed_count = Column(Integer, default=0, server_default="0", nullable=False)
+    interviewing_count = Column(Integer, default=0, server_default="0", nullable=False)
+    rejected_count = Column(Integer, default=0, server_default="0", nullable=False)
+    accepted_count = Column(Integer, default=0, server_default="0", nullable=False)
 
     owner = relationship("User", back_populates="job_posts")
     applications = relationship("JobApplication", back_populates="job_post", cascade="all, delete-orphan")
+    skill_tags = relationship("JobPostSkill", cascade="all, delete-orphan")
+
+
+class UserSkill(Base):
+    # One row per normalized skill token; users.skills keeps the display CSV.
+    __tablename__ = "user_skills"
+    __table_args__ = (Index("ix_user_skills_skill_user_id", "skill", "user_id"),)
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    skill = Column(String(120), primary_key=True)
+
+
+class JobPostSkill(Base):
+    __tablename__ = "job_post_skills"
+    __table_args__ = (Index("ix_job_post_skills_skill_job_post_id", "skill", "job_post_id"),)
+
+    job_post_id = Column(Integer, ForeignKey("job_posts.id", ondelete="CASCADE"), primary_key=True)
+    skill = Column(String(120), primary_key=True)
 
 
 class ApplicationStatus(str, enum.Enum):
@@ -79,6 +123,11 @@ class ApplicationStatus(str, enum.Enum):
 
 class JobApplication(Base):
     __tablename__ = "job_applications"
+    __table_args__ = (
+        Index("ix_job_applications_job_post_id_created_at_id", "job_post_id", "created_at", "id"),
+        # One application per applicant and post; apply_to_job inserts with ON CONFLICT DO NOTHING against it.
+        Index("uq_job_applications_job_post_id_applicant_id", "job_post_id", "applicant_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     job_post_id = Column(Integer, ForeignKey("job_posts.id"), nullable=False, index=True)
@@ -89,3 +138,23 @@ class JobApplication(Base):
 
     job_post = relationship("JobPost", back_populates="applications")
     applicant = relationship("User", back_populates="applications")
+
+
+class UserMatch(Base):
+    # Precomputed top matches per user, written by match_batch.py and served by the matches endpoint.
+    __tablename__ = "user_matches"
+    __table_args__ = (Index("ix_user_matches_candidate_id", "candidate_id"),)
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    rank = Column(Integer, primary_key=True)
+    candidate_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    score = Column(Integer, nullable=False)
+
+
+class UserMatchState(Base):
+    # Profile fingerprint per user as of the last match run; no foreign key, so deleted users stay detectable.
+    __tablename__ = "user_match_state"
+
+    user_id = Column(Integer, primary_key=True)
+    fingerprint = Column(String(32), nullable=False)
+    computed_at = Column(DateTime, nullable=False)
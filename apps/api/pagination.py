@@ -0,0 +1,58 @@
+# Keyset (cursor) pagination over (sort column, id) for list endpoints; the sort column is created_at by default.
+import base64
+import binascii
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple, TypeVar, Union
+from fastapi import Request, Response
+from sqlalchemy import Select, tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+T = TypeVar("T")
+
+
+def encode_cursor(value: Union[datetime, int], row_id: int) -> str:
+    text = value.isoformat() if isinstance(value, datetime) else str(value)
+    raw = f"{text}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, value_type: type = datetime) -> Tuple[Union[datetime, int], int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        value, row_id = raw.rsplit("|", 1)
+        return (datetime.fromisoformat(value) if value_type is datetime else int(value)), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def keyset(query: Select, sort_col, id_col, cursor: Optional[str], limit: int, descending: bool = True) -> Select:
+    # Seek past the cursor instead of OFFSET so page N costs the same as page one; fetch one extra row to detect more.
+    if cursor:
+        position = tuple_(sort_col, id_col)
+        after = decode_cursor(cursor, sort_col.type.python_type)
+        query = query.where(position < after if descending else position > after)
+    if descending:
+        query = query.order_by(sort_col.desc(), id_col.desc())
+    else:
+        query = query.order_by(sort_col, id_col)
+    return query.limit(limit + 1)
+
+
+def split_page(rows: Sequence[T], limit: int, sort_key: str = "created_at") -> Tuple[List[T], Optional[str]]:
+    # Rows may be ORM objects or column rows; both expose the sort column and id as attributes.
+    page = list(rows[:limit])
+    if len(rows) <= limit or not page:
+        return page, None
+    last = page[-1]
+    return page, encode_cursor(getattr(last, sort_key), last.id)
+
+
+def set_page_headers(request: Request, response: Response, next_cursor: Optional[str]) -> None:
+    # The body stays a plain JSON array; the next page is advertised out of band.
+    if not next_cursor:
+        return
+    next_url = request.url.include_query_params(cursor=next_cursor)
+    response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["Link"] = f'<{next_url}>; rel="next"'
@@ -0,0 +1,178 @@
+# Job <-> candidate fit scoring, served from per-entity feature vectors kept in an in-process index.
+import heapq
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from matching import skill_set
+from models import JobPost, User
+
+SKILLS_WEIGHT = 55
+TIME_ZONE_WEIGHT = 15
+WORK_STYLE_WEIGHT = 15
+AVAILABILITY_WEIGHT = 15
+
+
+@dataclass(frozen=True)
+class Features:
+    skills: FrozenSet[str]
+    time_zone: Optional[str] = None
+    work_style: Optional[str] = None
+    availability: Optional[str] = None
+
+
+def candidate_features(
+    skills: Optional[str], time_zone: Optional[str], availability: Optional[str], preferences: Optional[dict]
+) -> Features:
+    # Users have no work_style column; it comes from preferences, as the profile form stores it.
+    preferences = preferences if isinstance(preferences, dict) else {}
+    return Features(
+        skills=skill_set(skills),
+        time_zone=_normalize(time_zone),
+        work_style=_normalize(preferences.get("work_style")),
+        availability=_normalize(availability or preferences.get("availability")),
+    )
+
+
+def job_features(
+    skills: Optional[str], time_zone: Optional[str], work_style: Optional[str], availability: Optional[str]
+) -> Features:
+    return Features(
+        skills=skill_set(skills),
+        time_zone=_normalize(time_zone),
+        work_style=_normalize(work_style),
+        availability=_normalize(availability),
+    )
+
+
+def fit_score(candidate: Features, job: Features) -> int:
+    """0-100: the share of the job's skills the candidate has, plus time zone, work style and availability."""
+    score = 0
+    if job.skills:
+        score += int(len(job.skills & candidate.skills) / len(job.skills) * SKILLS_WEIGHT)
+    score += _attribute_score(candidate.time_zone, job.time_zone, TIME_ZONE_WEIGHT)
+    score += _attribute_score(candidate.work_style, job.work_style, WORK_STYLE_WEIGHT)
+    score += _attribute_score(candidate.availability, job.availability, AVAILABILITY_WEIGHT)
+    return min(100, score)
+
+
+class FitIndex:
+    """Feature vectors for every job post and candidate, plus skill -> job id postings, kept in sync with writes.
+
+    Recommendations only score the jobs that share a skill with the candidate.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._jobs: Dict[int, Features] = {}
+        self._owners: Dict[int, int] = {}
+        self._candidates: Dict[int, Features] = {}
+        self._job_postings: Dict[str, Set[int]] = defaultdict(set)
+        self.built = False
+
+    def build(self, db: Session) -> None:
+        job_columns = (JobPost.skills, JobPost.time_zone, JobPost.work_style, JobPost.availability)
+        jobs = db.execute(select(JobPost.id, JobPost.owner_id, *job_columns))
+        users = db.execute(select(User.id, User.skills, User.time_zone, User.availability, User.preferences))
+        with self._lock:
+            self._clear()
+            for job_id, owner_id, *values in jobs:
+                self._add_job(job_id, owner_id, job_features(*values))
+            for user_id, *values in users:
+                self._candidates[user_id] = candidate_features(*values)
+            self.built = True
+
+    def reset(self) -> None:
+        with self._lock:
+            self._clear()
+            self.built = False
+
+    def upsert_job(self, job_id: int, owner_id: int, features: Features) -> None:
+        if not self.built:
+            return  # The first build() will read the row from the database.
+        with self._lock:
+            self._remove_job(job_id)
+            self._add_job(job_id, owner_id, features)
+
+    def upsert_candidate(self, user_id: int, features: Features) -> None:
+        if not self.built:
+            return
+        with self._lock:
+            self._candidates[user_id] = features
+
+    def candidate(self, user_id: int) -> Optional[Features]:
+        return self._candidates.get(user_id)
+
+    def job(self, job_id: int) -> Optional[Features]:
+        return self._jobs.get(job_id)
+
+    def top_jobs(self, user_id: int, limit: int, exclude: Iterable[int] = ()) -> List[Tuple[int, int]]:
+        # Returns (score, job_id) pairs, best first; ties go to the newer (higher id) post. Own posts are skipped.
+        excluded = set(exclude)
+        with self._lock:
+            candidate = self._candidates.get(user_id)
+            if candidate is None:
+                return []
+            job_ids = {job_id for token in candidate.skills for job_id in self._job_postings.get(token, ())}
+            scored = [
+                (fit_score(candidate, self._jobs[job_id]), job_id)
+                for job_id in job_ids - excluded
+                if self._owners[job_id] != user_id
+            ]
+        return heapq.nlargest(limit, scored)
+
+    def _add_job(self, job_id: int, owner_id: int, features: Features) -> None:
+        self._jobs[job_id] = features
+        self._owners[job_id] = owner_id
+        for token in features.skills:
+            self._job_postings[token].add(job_id)
+
+    def _remove_job(self, job_id: int) -> None:
+        self._owners.pop(job_id, None)
+        for token in self._jobs.pop(job_id, Features(frozenset())).skills:
+            posting = self._job_postings.get(token)
+            if posting is not None:
+                posting.discard(job_id)
+                if not posting:
+                    del self._job_postings[token]
+
+    def _clear(self) -> None:
+        self._jobs.clear()
+        self._owners.clear()
+        self._candidates.clear()
+        self._job_postings.clear()
+
+
+fit_index = FitIndex()
+
+
+def ensure_fit_index(db: Session) -> FitIndex:
+    if not fit_index.built:
+        fit_index.build(db)
+    return fit_index
+
+
+def index_candidate(user: User) -> None:
+    fit_index.upsert_candidate(
+        user.id, candidate_features(user.skills, user.time_zone, user.availability, user.preferences)
+    )
+
+
+def index_job_post(post: JobPost) -> None:
+    features = job_features(post.skills, post.time_zone, post.work_style, post.availability)
+    fit_index.upsert_job(post.id, post.owner_id, features)
+
+
+def _attribute_score(candidate_value: Optional[str], job_value: Optional[str], weight: int) -> int:
+    # Unknown on either side is neutral (half credit), so sparse profiles are not ranked below mismatches.
+    if candidate_value is None or job_value is None:
+        return weight // 2
+    return weight if candidate_value == job_value else 0
+
+
+def _normalize(value) -> Optional[str]:
+    if not isinstance(value, str):
+        return None
+    return value.strip().lower() or None
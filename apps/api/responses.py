@@ -0,0 +1,24 @@
+# JSON responses for list endpoints that skip FastAPI's second validation pass of the response_model.
+from functools import lru_cache
+from typing import Optional, Sequence
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(item_type: type) -> TypeAdapter:
+    return TypeAdapter(list[item_type])
+
+
+def json_list_response(items: Sequence[BaseModel], response: Optional[Response] = None) -> Response:
+    """Encodes already-validated schema objects straight to JSON bytes in pydantic-core.
+
+    Returning a Response makes FastAPI skip re-validating the list against response_model and
+    round-tripping it through jsonable_encoder + json.dumps. Headers set on the injected `response`
+    (X-Next-Cursor, Link) are carried over, since FastAPI doesn't merge them into a returned Response.
+    """
+    body = _list_adapter(type(items[0])).dump_json(items) if items else b"[]"
+    fast = Response(content=body, media_type="application/json")
+    if response is not None:
+        fast.raw_headers.extend(response.headers.raw)
+    return fast
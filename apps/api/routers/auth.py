@@ -1,30 +1,43 @@
-# Lightweight auth endpoints (password hashing only, no sessions/JWT).
+# Auth endpoints: signup/login issue signed, expiring bearer tokens (see security.py).
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from crud import login, signup
-from db import get_db
-from schemas import AuthLogin, AuthResponse, AuthSignup, ForgotPasswordRequest
+from crud import login, reset_password, signup
+from db import get_db, run_db
+from metrics import TimedRoute
+from schemas import AuthLogin, AuthPasswordReset, AuthResponse, AuthSignup, ForgotPasswordRequest
+from tasks import enqueue
 
-router = APIRouter(prefix="/api/auth", tags=["auth"])
+router = APIRouter(prefix="/api/auth", tags=["auth"], route_class=TimedRoute)
 
 
 @router.post("/signup", response_model=AuthResponse, status_code=status.HTTP_201_CREATED)
-def signup_endpoint(payload: AuthSignup, db: Session = Depends(get_db)):
+async def signup_endpoint(payload: AuthSignup, db: Session = Depends(get_db)):
     try:
-        return signup(db, payload)
+        return await run_db(db, signup, payload)
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
 
 
 @router.post("/login", response_model=AuthResponse)
-def login_endpoint(payload: AuthLogin, db: Session = Depends(get_db)):
-    result = login(db, payload)
+async def login_endpoint(payload: AuthLogin, db: Session = Depends(get_db)):
+    result = await run_db(db, login, payload)
     if not result:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
     return result
 
 
 @router.post("/forgot")
-def forgot_password(payload: ForgotPasswordRequest):
-    # In a real app we'd email a reset link; here we simply acknowledge receipt.
+async def forgot_password(payload: ForgotPasswordRequest):
+    # The email goes out from a worker; the reply is the same whether or not the address is registered.
+    enqueue("send_password_reset", email=payload.email)
     return {"message": f"Password reset link sent to {payload.email}"}
+
+
+@router.post("/reset")
+async def reset_password_endpoint(payload: AuthPasswordReset, db: Session = Depends(get_db)):
+    # The token from the emailed link; see security.issue_reset_token.
+    try:
+        await run_db(db, reset_password, payload)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    return {"message": "Password updated"}
@@ -0,0 +1,32 @@
+# Typeahead suggestions for the search form, answered from the in-process prefix index.
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.orm import Session
+from autocomplete import MAX_SUGGESTIONS, AutocompleteField, autocomplete_index, ensure_autocomplete_index
+from db import get_read_db, run_db
+from metrics import TimedRoute
+from responses import json_list_response
+from schemas import AutocompleteSuggestion
+
+router = APIRouter(prefix="/api/autocomplete", tags=["autocomplete"], route_class=TimedRoute)
+
+# Keystrokes repeat prefixes (typing, then backspacing); a short browser cache absorbs those.
+CACHE_CONTROL = "max-age=30"
+
+
+@router.get("", response_model=list[AutocompleteSuggestion])
+async def autocomplete(
+    field: AutocompleteField = Query(...),
+    prefix: str = Query("", max_length=120, description="Typed text; empty returns the most used values"),
+    limit: int = Query(10, ge=1, le=MAX_SUGGESTIONS),
+    db: Session = Depends(get_read_db),
+):
+    if not autocomplete_index.built:
+        # Built at startup; otherwise the first request builds it. Afterwards no request touches the database.
+        await run_db(db, ensure_autocomplete_index)
+    suggestions = [
+        AutocompleteSuggestion(value=value, count=count)
+        for value, count in autocomplete_index.suggest(field, prefix, limit)
+    ]
+    response = json_list_response(suggestions)
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
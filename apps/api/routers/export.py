@@ -0,0 +1,88 @@
+# Full-table exports for analytics, streamed as NDJSON or CSV.
+from typing import Literal
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+from export import (
+    MEDIA_TYPES,
+    ExportFormat,
+    applications_export_query,
+    job_posts_export_query,
+    stream_export,
+    users_export_query,
+)
+from metrics import TimedRoute
+from models import ApplicationStatus, RoleType
+
+router = APIRouter(prefix="/api/export", tags=["export"], route_class=TimedRoute)
+
+AFTER_ID_DESCRIPTION = "Resume after this id (the last id of an interrupted export)"
+
+
+def _streaming_response(query, fmt: ExportFormat, name: str) -> StreamingResponse:
+    return StreamingResponse(
+        stream_export(query, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'},
+    )
+
+
+@router.get("/users")
+def export_users(
+    format: ExportFormat = Query("ndjson"),
+    after_id: int = Query(0, ge=0, description=AFTER_ID_DESCRIPTION),
+    q: str | None = Query(None),
+    role: RoleType | None = Query(None),
+    skills: list[str] | None = Query(None),
+    skills_match: Literal["all", "any"] = Query("all"),
+    location: str | None = Query(None),
+    availability: str | None = Query(None),
+    experience: str | None = Query(None),
+):
+    query = users_export_query(
+        after_id=after_id,
+        q=q,
+        role=role,
+        skills=skills,
+        location=location,
+        availability=availability,
+        experience=experience,
+        skills_match=skills_match,
+    )
+    return _streaming_response(query, format, "users")
+
+
+@router.get("/jobs")
+def export_jobs(
+    format: ExportFormat = Query("ndjson"),
+    after_id: int = Query(0, ge=0, description=AFTER_ID_DESCRIPTION),
+    q: str | None = Query(None),
+    role: RoleType | None = Query(None),
+    skills: list[str] | None = Query(None),
+    skills_match: Literal["all", "any"] = Query("all"),
+    location: str | None = Query(None),
+    work_style: str | None = Query(None),
+):
+    query = job_posts_export_query(
+        after_id=after_id,
+        q=q,
+        role=role,
+        skills=skills,
+        location=location,
+        work_style=work_style,
+        skills_match=skills_match,
+    )
+    return _streaming_response(query, format, "jobs")
+
+
+@router.get("/applications")
+def export_applications(
+    format: ExportFormat = Query("ndjson"),
+    after_id: int = Query(0, ge=0, description=AFTER_ID_DESCRIPTION),
+    job_post_id: int | None = Query(None),
+    applicant_id: int | None = Query(None),
+    status: ApplicationStatus | None = Query(None),
+):
+    query = applications_export_query(
+        after_id=after_id, job_post_id=job_post_id, applicant_id=applicant_id, status=status
+    )
+    return _streaming_response(query, format, "applications")
@@ -1,59 +1,216 @@
 # Endpoints for job posts and applications.
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
-from crud import apply_to_job, create_job_post, get_job_post, list_job_applications, list_job_posts, update_job_post
-from db import get_db
+from bulk import bulk_apply, bulk_create_job_posts, parse_records
+from conditional import is_conditional, is_not_modified, newest, not_modified, page_etag, resource_etag, set_validators
+from crud import (
+    apply_to_job,
+    create_job_post,
+    get_job_post,
+    get_job_post_version,
+    list_job_applications,
+    list_job_post_versions,
+    list_job_posts,
+    rank_job_applications,
+    update_application_status,
+    update_job_post,
+)
+from db import get_db, get_read_db, run_db
+from metrics import TimedRoute
 from models import RoleType
-from schemas import JobApplicationCreate, JobApplicationOut, JobPostCreate, JobPostOut, JobPostUpdate
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, set_page_headers
+from responses import json_list_response
+from schemas import (
+    BulkResult,
+    JobApplicationCreate,
+    JobApplicationOut,
+    JobApplicationStatusUpdate,
+    JobPostCard,
+    JobPostCreate,
+    JobPostOut,
+    JobPostUpdate,
+)
+from security import Principal, ensure_caller, optional_principal
 
-router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+router = APIRouter(prefix="/api/jobs", tags=["jobs"], route_class=TimedRoute)
 
 
-@router.get("", response_model=list[JobPostOut])
-def list_jobs(
+@router.get("", response_model=list[JobPostOut] | list[JobPostCard])
+async def list_jobs(
+    request: Request,
+    response: Response,
+    q: str | None = Query(None, description="Full-text search over title, headline, description and skills"),
     role: RoleType | None = Query(None),
     skills: list[str] | None = Query(None),
+    skills_match: Literal["all", "any"] = Query("all"),
     location: str | None = Query(None),
     work_style: str | None = Query(None),
-    db: Session = Depends(get_db),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(None),
+    view: Literal["full", "card"] = Query("full"),
+    sort: Literal["created", "popular"] = Query("created", description="popular: most applications first"),
+    db: Session = Depends(get_read_db),
 ):
-    return list_job_posts(db, role=role, skills=skills, location=location, work_style=work_style)
+    page = dict(
+        role=role,
+        skills=skills,
+        location=location,
+        work_style=work_style,
+        skills_match=skills_match,
+        limit=limit,
+        cursor=cursor,
+        q=q,
+        sort=sort,
+    )
+    try:
+        if "if-none-match" in request.headers:
+            rows, next_cursor = await run_db(db, list_job_post_versions, **page)
+            etag = page_etag(rows, next_cursor, view)
+            if is_not_modified(request, etag, None):
+                return not_modified(etag, newest(rows))
+        jobs, next_cursor = await run_db(db, list_job_posts, **page, view=view)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    set_page_headers(request, response, next_cursor)
+    set_validators(response, page_etag(jobs, next_cursor, view), newest(jobs))
+    return json_list_response(jobs, response)
 
 
 @router.post("", response_model=JobPostOut, status_code=status.HTTP_201_CREATED)
-def create_job(payload: JobPostCreate, db: Session = Depends(get_db)):
+async def create_job(
+    payload: JobPostCreate,
+    principal: Principal | None = Depends(optional_principal),
+    db: Session = Depends(get_db),
+):
+    ensure_caller(principal, payload.owner_id)
     try:
-        return create_job_post(db, payload)
+        return await run_db(db, create_job_post, payload, principal=principal)
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
 
 
+@router.post("/bulk", response_model=BulkResult)
+async def bulk_create_jobs(
+    request: Request,
+    principal: Principal | None = Depends(optional_principal),
+    db: Session = Depends(get_db),
+):
+    try:
+        records = parse_records(await request.body(), request.headers.get("content-type"))
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    return await run_db(db, bulk_create_job_posts, records, principal=principal)
+
+
 @router.get("/{job_id}", response_model=JobPostOut)
-def get_job(job_id: int, db: Session = Depends(get_db)):
-    job = get_job_post(db, job_id)
+async def get_job(job_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
+    if is_conditional(request):
+        current = await run_db(db, get_job_post_version, job_id)
+        if current is not None:
+            etag = resource_etag("job", job_id, current.version)
+            if is_not_modified(request, etag, current.updated_at):
+                return not_modified(etag, current.updated_at)
+    job = await run_db(db, get_job_post, job_id)
     if not job:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    set_validators(response, resource_etag("job", job.id, job.version), job.updated_at)
     return job
 
 
 @router.put("/{job_id}", response_model=JobPostOut)
-def update_job(job_id: int, payload: JobPostUpdate, db: Session = Depends(get_db)):
-    updated = update_job_post(db, job_id, payload)
+async def update_job(
+    job_id: int,
+    payload: JobPostUpdate,
+    principal: Principal | None = Depends(optional_principal),
+    db: Session = Depends(get_db),
+):
+    try:
+        updated = await run_db(db, update_job_post, job_id, payload, principal=principal)
+    except PermissionError as exc:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(exc))
     if not updated:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
     return updated
 
 
 @router.post("/{job_id}/apply", response_model=JobApplicationOut, status_code=status.HTTP_201_CREATED)
-def apply(job_id: int, payload: JobApplicationCreate, db: Session = Depends(get_db)):
+async def apply(
+    job_id: int,
+    payload: JobApplicationCreate,
+    response: Response,
+    principal: Principal | None = Depends(optional_principal),
+    db: Session = Depends(get_db),
+):
     if payload.job_post_id != job_id:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="job_post_id mismatch")
+    ensure_caller(principal, payload.applicant_id)
+    try:
+        application, created = await run_db(
+            db, apply_to_job, job_id, payload.applicant_id, payload.cover_letter, principal=principal
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    if not created:
+        response.status_code = status.HTTP_200_OK  # Already applied: the existing application, unchanged.
+    return application
+
+
+@router.post("/{job_id}/applications/bulk", response_model=BulkResult)
+async def bulk_apply_to_job(
+    job_id: int,
+    request: Request,
+    principal: Principal | None = Depends(optional_principal),
+    db: Session = Depends(get_db),
+):
     try:
-        return apply_to_job(db, job_id, payload.applicant_id, payload.cover_letter)
+        records = parse_records(await request.body(), request.headers.get("content-type"))
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    result = await run_db(db, bulk_apply, job_id, records, principal=principal)
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return result
 
 
 @router.get("/{job_id}/applications", response_model=list[JobApplicationOut])
-def list_applications(job_id: int, db: Session = Depends(get_db)):
-    return list_job_applications(db, job_id)
+async def list_applications(
+    job_id: int,
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(None),
+    sort: Literal["created", "fit"] = Query("created", description="fit: one page, best-fitting applicants first"),
+    db: Session = Depends(get_read_db),
+):
+    if sort == "fit":
+        if cursor:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="sort=fit does not take a cursor")
+        return json_list_response(await run_db(db, rank_job_applications, job_id, limit=limit))
+    try:
+        applications, next_cursor = await run_db(db, list_job_applications, job_id, limit=limit, cursor=cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    set_page_headers(request, response, next_cursor)
+    return json_list_response(applications, response)
+
+
+@router.patch("/{job_id}/applications/{application_id}", response_model=JobApplicationOut)
+async def update_application(
+    job_id: int,
+    application_id: int,
+    payload: JobApplicationStatusUpdate,
+    principal: Principal | None = Depends(optional_principal),
+    db: Session = Depends(get_db),
+):
+    try:
+        updated = await run_db(
+            db, update_application_status, job_id, application_id, payload.status, principal=principal
+        )
+    except PermissionError as exc:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(exc))
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+    if not updated:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Application not found")
+    return updated
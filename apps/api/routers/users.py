@@ -1,42 +1,124 @@
 # Endpoints for user profiles (create, update, view, search).
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
-from crud import create_user, get_user, list_users, update_user
-from db import get_db
+from bulk import bulk_create_users, parse_records
+from conditional import is_conditional, is_not_modified, newest, not_modified, page_etag, resource_etag, set_validators
+from crud import create_user, get_user, get_user_version, list_user_versions, list_users, recommend_jobs, update_user
+from db import get_db, get_read_db, run_db
+from matching import MATCH_TOP_K, find_user_matches
+from metrics import TimedRoute
 from models import RoleType
-from schemas import UserCreate, UserOut, UserUpdate
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, set_page_headers
+from responses import json_list_response
+from schemas import BulkResult, MatchSuggestionOut, RecommendedJobOut, UserCard, UserCreate, UserOut, UserUpdate
+from security import Principal, ensure_caller, optional_principal
 
-router = APIRouter(prefix="/api/users", tags=["users"])
+router = APIRouter(prefix="/api/users", tags=["users"], route_class=TimedRoute)
 
 
-@router.get("", response_model=list[UserOut])
-def list_profiles(
+@router.get("", response_model=list[UserOut] | list[UserCard])
+async def list_profiles(
+    request: Request,
+    response: Response,
+    q: str | None = Query(None, description="Full-text search over name, headline, bio, experience and skills"),
     role: RoleType | None = Query(None),
     skills: list[str] | None = Query(None, description="Filter by skills (comma or multiple)"),
+    skills_match: Literal["all", "any"] = Query("all", description="Require all listed skills or any of them"),
     location: str | None = Query(None),
     availability: str | None = Query(None),
     experience: str | None = Query(None),
-    db: Session = Depends(get_db),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(None, description="Opaque cursor from the previous page's X-Next-Cursor header"),
+    view: Literal["full", "card"] = Query("full", description="card returns only the fields listing pages render"),
+    db: Session = Depends(get_read_db),
 ):
-    return list_users(db, role=role, skills=skills, location=location, availability=availability, experience=experience)
+    page = dict(
+        role=role,
+        skills=skills,
+        location=location,
+        availability=availability,
+        experience=experience,
+        skills_match=skills_match,
+        limit=limit,
+        cursor=cursor,
+        q=q,
+    )
+    try:
+        # Lists revalidate on If-None-Match only: a row leaving the filter doesn't move the page's newest timestamp.
+        if "if-none-match" in request.headers:
+            rows, next_cursor = await run_db(db, list_user_versions, **page)
+            etag = page_etag(rows, next_cursor, view)
+            if is_not_modified(request, etag, None):
+                return not_modified(etag, newest(rows))
+        users, next_cursor = await run_db(db, list_users, **page, view=view)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    set_page_headers(request, response, next_cursor)
+    set_validators(response, page_etag(users, next_cursor, view), newest(users))
+    return json_list_response(users, response)
 
 
 @router.post("", response_model=UserOut, status_code=status.HTTP_201_CREATED)
-def create_profile(payload: UserCreate, db: Session = Depends(get_db)):
-    return create_user(db, payload)
+async def create_profile(payload: UserCreate, db: Session = Depends(get_db)):
+    return await run_db(db, create_user, payload)
+
+
+@router.post("/bulk", response_model=BulkResult)
+async def bulk_create_profiles(request: Request, db: Session = Depends(get_db)):
+    # Body is a JSON array of profiles or NDJSON (Content-Type: application/x-ndjson); bad rows are reported, not fatal.
+    try:
+        records = parse_records(await request.body(), request.headers.get("content-type"))
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    return await run_db(db, bulk_create_users, records)
 
 
 @router.get("/{user_id}", response_model=UserOut)
-def get_profile(user_id: int, db: Session = Depends(get_db)):
-    user = get_user(db, user_id)
+async def get_profile(user_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
+    if is_conditional(request):
+        current = await run_db(db, get_user_version, user_id)
+        if current is not None:
+            etag = resource_etag("user", user_id, current.version)
+            if is_not_modified(request, etag, current.updated_at):
+                return not_modified(etag, current.updated_at)
+    user = await run_db(db, get_user, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    set_validators(response, resource_etag("user", user.id, user.version), user.updated_at)
     return user
 
 
 @router.put("/{user_id}", response_model=UserOut)
-def update_profile(user_id: int, payload: UserUpdate, db: Session = Depends(get_db)):
-    updated = update_user(db, user_id, payload)
+async def update_profile(
+    user_id: int,
+    payload: UserUpdate,
+    principal: Principal | None = Depends(optional_principal),
+    db: Session = Depends(get_db),
+):
+    ensure_caller(principal, user_id)
+    updated = await run_db(db, update_user, user_id, payload)
     if not updated:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     return updated
+
+
+@router.get("/{user_id}/matches", response_model=list[MatchSuggestionOut])
+async def get_matches(
+    user_id: int, limit: int = Query(10, ge=1, le=MATCH_TOP_K), db: Session = Depends(get_read_db)
+):
+    matches = await run_db(db, find_user_matches, user_id, limit=limit)
+    if matches is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return json_list_response(matches)
+
+
+@router.get("/{user_id}/recommended-jobs", response_model=list[RecommendedJobOut])
+async def get_recommended_jobs(
+    user_id: int, limit: int = Query(10, ge=1, le=50), db: Session = Depends(get_read_db)
+):
+    # Best-fitting open roles the user has not applied to, scored on skills, time zone, work style and availability.
+    jobs = await run_db(db, recommend_jobs, user_id, limit=limit)
+    if jobs is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return json_list_response(jobs)
@@ -3,9 +3,16 @@ CREATE TABLE IF NOT EXISTS users (
   id SERIAL PRIMARY KEY,
   name VARCHAR(120) NOT NULL,
   email VARCHAR(255) UNIQUE,
+  password_hash VARCHAR(255),
   profile_photo VARCHAR(255),
   headline VARCHAR(255),
   bio TEXT,
+  experience TEXT,
+  startups TEXT,
+  portfolio TEXT,
+  resume_url VARCHAR(255),
+  looking_for_cofounder BOOLEAN NOT NULL DEFAULT FALSE,
+  availability VARCHAR(80),
   skills TEXT,
   location VARCHAR(120),
   time_zone VARCHAR(80),
@@ -25,6 +32,8 @@ CREATE TABLE IF NOT EXISTS job_posts (
   time_zone VARCHAR(80),
   work_style VARCHAR(60),
   availability VARCHAR(80),
+  timeline VARCHAR(120),
+  compensation VARCHAR(120),
   created_at TIMESTAMPTZ DEFAULT NOW() NOT NULL,
   owner_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE
 );
@@ -37,3 +46,57 @@ CREATE TABLE IF NOT EXISTS job_applications (
   cover_letter TEXT,
   created_at TIMESTAMPTZ DEFAULT NOW() NOT NULL
 );
+
+-- Normalized skill tokens (lowercased, trimmed); users.skills / job_posts.skills keep the display CSV.
+CREATE TABLE IF NOT EXISTS user_skills (
+  user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  skill VARCHAR(120) NOT NULL,
+  PRIMARY KEY (user_id, skill)
+);
+CREATE INDEX IF NOT EXISTS ix_user_skills_skill_user_id ON user_skills (skill, user_id);
+
+CREATE TABLE IF NOT EXISTS job_post_skills (
+  job_post_id INTEGER NOT NULL REFERENCES job_posts(id) ON DELETE CASCADE,
+  skill VARCHAR(120) NOT NULL,
+  PRIMARY KEY (job_post_id, skill)
+);
+CREATE INDEX IF NOT EXISTS ix_job_post_skills_skill_job_post_id ON job_post_skills (skill, job_post_id);
+
+-- Keyset pagination: list endpoints seek on (created_at, id).
+CREATE INDEX IF NOT EXISTS ix_users_created_at_id ON users (created_at, id);
+CREATE INDEX IF NOT EXISTS ix_job_posts_created_at_id ON job_posts (created_at, id);
+CREATE INDEX IF NOT EXISTS ix_job_applications_job_post_id_created_at_id ON job_applications (job_post_id, created_at, id);
+
+-- Application counters per post, kept by the write paths (see counters.py); sort=popular seeks on the index.
+ALTER TABLE job_posts ADD COLUMN IF NOT EXISTS applications_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE job_posts ADD COLUMN IF NOT EXISTS applied_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE job_posts ADD COLUMN IF NOT EXISTS reviewed_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE job_posts ADD COLUMN IF NOT EXISTS interviewing_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE job_posts ADD COLUMN IF NOT EXISTS rejected_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE job_posts ADD COLUMN IF NOT EXISTS accepted_count INTEGER NOT NULL DEFAULT 0;
+CREATE INDEX IF NOT EXISTS ix_job_posts_applications_count_id ON job_posts (applications_count, id);
+
+-- Row versions for conditional GETs (ETag / Last-Modified); every UPDATE bumps both.
+ALTER TABLE users ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP;
+UPDATE users SET updated_at = created_at WHERE updated_at IS NULL;
+ALTER TABLE users ALTER COLUMN updated_at SET NOT NULL;
+ALTER TABLE users ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE job_posts ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP;
+UPDATE job_posts SET updated_at = created_at WHERE updated_at IS NULL;
+ALTER TABLE job_posts ALTER COLUMN updated_at SET NOT NULL;
+ALTER TABLE job_posts ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+
+-- One application per applicant and post (apply uses INSERT ... ON CONFLICT DO NOTHING).
+CREATE UNIQUE INDEX IF NOT EXISTS uq_job_applications_job_post_id_applicant_id ON job_applications (job_post_id, applicant_id);
+
+-- Full-text search (GET /api/users?q=, /api/jobs?q=); SQLite uses FTS5 tables instead, see search.py.
+ALTER TABLE users ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+  to_tsvector('english', coalesce(name, '') || ' ' || coalesce(headline, '') || ' ' || coalesce(bio, '') || ' ' ||
+    coalesce(experience, '') || ' ' || coalesce(skills, '') || ' ' || coalesce(location, '') || ' ' || coalesce(availability, ''))
+) STORED;
+CREATE INDEX IF NOT EXISTS ix_users_search_vector ON users USING GIN (search_vector);
+ALTER TABLE job_posts ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+  to_tsvector('english', coalesce(title, '') || ' ' || coalesce(headline, '') || ' ' || coalesce(description, '') || ' ' ||
+    coalesce(skills, '') || ' ' || coalesce(location, '') || ' ' || coalesce(work_style, '') || ' ' || coalesce(availability, ''))
+) STORED;
+CREATE INDEX IF NOT EXISTS ix_job_posts_search_vector ON job_posts USING GIN (search_vector);
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
 from models import ApplicationStatus, RoleType
 from utils import split_csv
@@ -31,6 +31,8 @@ class UserBase(BaseModel):
     @field_validator("portfolio", mode="before")
     @classmethod
     def _split_portfolio(cls, value):
+        if value is None:
+            return []
         return split_csv(value) if isinstance(value, str) else value
 
 
@@ -70,8 +72,32 @@ class UserUpdate(BaseModel):
 class UserOut(UserBase):
     model_config = ConfigDict(from_attributes=True)
 
+    # Stored emails were validated as EmailStr on the way in; re-checking them on every read costs ~10x the
+    # rest of the model.
+    email: Optional[str] = Field(None, json_schema_extra={"format": "email"})
     id: int
     created_at: datetime
+    updated_at: datetime
+    version: int
+
+
+class UserCard(BaseModel):
+    # Compact listing projection: only what the browse/search cards render.
+    id: int
+    name: str
+    headline: Optional[str] = None
+    role: RoleType
+    location: Optional[str] = None
+    availability: Optional[str] = None
+    skills: List[str] = Field(default_factory=list)
+    created_at: datetime
+    updated_at: datetime
+    version: int
+
+    @field_validator("skills", mode="before")
+    @classmethod
+    def _split_skills(cls, value):
+        return split_csv(value) if isinstance(value, str) else value
 
 
 class JobPostBase(BaseModel):
@@ -123,6 +149,31 @@ class JobPostOut(JobPostBase):
     owner_id: int
     owner_name: Optional[str] = None
     created_at: datetime
+    updated_at: datetime
+    version: int
+    applications_count: int = 0
+    status_counts: Dict[ApplicationStatus, int] = Field(default_factory=dict)
+
+
+class RecommendedJobOut(JobPostOut):
+    fit_score: int
+
+
+class JobPostCard(BaseModel):
+    id: int
+    title: str
+    headline: Optional[str] = None
+    role: RoleType
+    location: Optional[str] = None
+    work_style: Optional[str] = None
+    timeline: Optional[str] = None
+    compensation: Optional[str] = None
+    owner_id: int
+    owner_name: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    version: int
+    applications_count: int = 0
 
 
 class JobApplicationCreate(BaseModel):
@@ -131,6 +182,10 @@ class JobApplicationCreate(BaseModel):
     cover_letter: Optional[str] = None
 
 
+class JobApplicationStatusUpdate(BaseModel):
+    status: ApplicationStatus
+
+
 class JobApplicationOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -142,6 +197,25 @@ class JobApplicationOut(BaseModel):
     created_at: datetime
     applicant_name: Optional[str] = None
     job_title: Optional[str] = None
+    fit_score: Optional[int] = None  # Only set when listing with sort=fit.
+
+
+class MatchSuggestionOut(BaseModel):
+    user_id: int
+    name: str
+    headline: Optional[str] = None
+    role: RoleType
+    location: Optional[str] = None
+    time_zone: Optional[str] = None
+    availability: Optional[str] = None
+    looking_for_cofounder: bool = False
+    skills: List[str] = Field(default_factory=list)
+    match_score: int
+
+    @field_validator("skills", mode="before")
+    @classmethod
+    def _split_skills(cls, value):
+        return split_csv(value) if isinstance(value, str) else value
 
 
 class AuthSignup(BaseModel):
@@ -163,3 +237,24 @@ class AuthResponse(BaseModel):
 
 class ForgotPasswordRequest(BaseModel):
     email: EmailStr
+
+
+class AuthPasswordReset(BaseModel):
+    token: str
+    password: str = Field(min_length=1)
+
+
+class BulkRowError(BaseModel):
+    index: int
+    error: str
+
+
+class BulkResult(BaseModel):
+    inserted: int
+    ids: List[int] = Field(default_factory=list)
+    errors: List[BulkRowError] = Field(default_factory=list)
+
+
+class AutocompleteSuggestion(BaseModel):
+    value: str
+    count: int  # Profiles and job posts using the value.
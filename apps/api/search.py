@@ -0,0 +1,108 @@
+# Full-text search over profiles and job posts: tsvector + GIN on Postgres, FTS5 on SQLite.
+import re
+from typing import Dict, Tuple
+from sqlalchemy import Select, column, func, literal_column, select, table, text
+from sqlalchemy.engine import Connection
+
+# Indexed text per table; users.skills / job_posts.skills are CSV, which both tokenizers split on commas.
+SEARCH_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "users": ("name", "headline", "bio", "experience", "skills", "location", "availability"),
+    "job_posts": ("title", "headline", "description", "skills", "location", "work_style", "availability"),
+}
+TEXT_SEARCH_CONFIG = "english"
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def install_fulltext(connection: Connection) -> None:
+    # Idempotent; safe to run on every boot and from migrations.
+    if connection.dialect.name == "postgresql":
+        for table_name, columns in SEARCH_COLUMNS.items():
+            for statement in _postgres_ddl(table_name, columns):
+                connection.execute(text(statement))
+    elif connection.dialect.name == "sqlite":
+        for table_name, columns in SEARCH_COLUMNS.items():
+            exists = connection.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": f"{table_name}_fts"},
+            ).first()
+            _drop_stale_update_trigger(connection, table_name, columns)
+            for statement in _sqlite_ddl(table_name, columns):
+                connection.execute(text(statement))
+            if not exists:
+                # Index rows written before the FTS table existed.
+                connection.execute(text(f"INSERT INTO {table_name}_fts({table_name}_fts) VALUES ('rebuild')"))
+
+
+def apply_search(query: Select, dialect_name: str, table_name: str, id_col, q: str) -> Select:
+    # Restricts `query` to rows matching `q` and orders them by relevance, best first.
+    if dialect_name == "postgresql":
+        vector = literal_column(f"{table_name}.search_vector")
+        tsquery = func.websearch_to_tsquery(literal_column(f"'{TEXT_SEARCH_CONFIG}'::regconfig"), q)
+        return query.where(vector.op("@@")(tsquery)).order_by(func.ts_rank(vector, tsquery).desc(), id_col)
+
+    fts = table(f"{table_name}_fts", column("rowid"), column("rank"))
+    return (
+        query.join(fts, fts.c.rowid == id_col)
+        .where(literal_column(fts.name).op("MATCH")(fts5_query(q)))
+        .order_by(fts.c.rank, id_col)
+    )
+
+
+def match_clause(dialect_name: str, table_name: str, id_col, q: str):
+    # Unranked filter for callers that keep their own ordering (exports stream in id order).
+    if dialect_name == "postgresql":
+        tsquery = func.websearch_to_tsquery(literal_column(f"'{TEXT_SEARCH_CONFIG}'::regconfig"), q)
+        return literal_column(f"{table_name}.search_vector").op("@@")(tsquery)
+
+    fts = table(f"{table_name}_fts", column("rowid"))
+    matches = select(fts.c.rowid).where(literal_column(fts.name).op("MATCH")(fts5_query(q)))
+    return id_col.in_(matches)
+
+
+def fts5_query(q: str) -> str:
+    # Quote each term so user input can't inject FTS5 operators; the last term is prefix-matched for typing.
+    terms = _TERM.findall(q)
+    if not terms:
+        return '""'
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def _postgres_ddl(table_name: str, columns: Tuple[str, ...]) -> Tuple[str, ...]:
+    document = " || ' ' || ".join(f"coalesce({name}, '')" for name in columns)
+    return (
+        f"ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS (to_tsvector('{TEXT_SEARCH_CONFIG}', {document})) STORED",
+        f"CREATE INDEX IF NOT EXISTS ix_{table_name}_search_vector ON {table_name} USING GIN (search_vector)",
+    )
+
+
+def _sqlite_ddl(table_name: str, columns: Tuple[str, ...]) -> Tuple[str, ...]:
+    # External-content FTS5 table kept in sync by triggers, so the text is stored once (in the base table).
+    fts = f"{table_name}_fts"
+    names = ", ".join(columns)
+    new_values = ", ".join(f"new.{name}" for name in columns)
+    old_values = ", ".join(f"old.{name}" for name in columns)
+    return (
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({names}, content='{table_name}', content_rowid='id')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table_name} BEGIN "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table_name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); END",
+        # Only edits to indexed text re-index the row; counter and version bumps leave the FTS table alone.
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {names} ON {table_name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END",
+    )
+
+
+def _drop_stale_update_trigger(connection: Connection, table_name: str, columns: Tuple[str, ...]) -> None:
+    # Databases indexed before the update trigger named its columns re-index on every UPDATE; replace theirs.
+    trigger = f"{table_name}_fts_au"
+    sql = connection.execute(
+        text("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = :name"), {"name": trigger}
+    ).scalar()
+    if sql is not None and f"AFTER UPDATE OF {', '.join(columns)} ON" not in sql:
+        connection.execute(text(f"DROP TRIGGER {trigger}"))
@@ -0,0 +1,219 @@
+# Signed, expiring session and password-reset tokens (HS256 JWT) and a TTL cache of resolved principals.
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+from fastapi import Depends, Header, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from db import get_db, run_db
+from models import RoleType, User
+
+logger = logging.getLogger(__name__)
+
+TOKEN_TTL_SECONDS = int(os.getenv("JWT_TTL_SECONDS", str(7 * 24 * 3600)))
+PASSWORD_RESET_TTL_SECONDS = int(os.getenv("PASSWORD_RESET_TTL_SECONDS", "3600"))
+PASSWORD_RESET_PURPOSE = "password_reset"
+PRINCIPAL_TTL_SECONDS = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "300"))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+# Without a token, write endpoints fall back to the ids in the payload unless this is set.
+AUTH_REQUIRED = os.getenv("AUTH_REQUIRED", "").lower() in {"1", "true", "yes"}
+
+
+def _load_secret() -> bytes:
+    secret = os.getenv("JWT_SECRET")
+    if not secret:
+        logger.warning("JWT_SECRET is not set; tokens will not survive a restart or validate across workers")
+        secret = secrets.token_urlsafe(32)
+    return secret.encode("utf-8")
+
+
+_SECRET = _load_secret()
+_HEADER = {"alg": "HS256", "typ": "JWT"}
+
+
+class InvalidToken(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Principal:
+    user_id: int
+    role: RoleType
+    name: str
+
+
+def issue_token(user_id: int, now: Optional[float] = None) -> str:
+    return _encode({"sub": str(user_id)}, TOKEN_TTL_SECONDS, now)
+
+
+def verify_token(token: str, now: Optional[float] = None) -> int:
+    # Pure CPU: checks the signature and expiry and returns the user id, without touching the database.
+    claims = _decode(token, now)
+    if "purpose" in claims:
+        raise InvalidToken("Not a session token")
+    return _subject(claims)
+
+
+def issue_reset_token(user_id: int, version: int, now: Optional[float] = None) -> str:
+    """Short-lived token for one password reset.
+
+    It carries the user's row version, which every UPDATE of the row bumps (setting the password included), so
+    the token stops working once it has been used or the profile has changed since it was sent.
+    """
+    claims = {"sub": str(user_id), "purpose": PASSWORD_RESET_PURPOSE, "ver": version}
+    return _encode(claims, PASSWORD_RESET_TTL_SECONDS, now)
+
+
+def verify_reset_token(token: str, now: Optional[float] = None) -> Tuple[int, int]:
+    # Returns (user id, row version); the caller checks the version against the row.
+    claims = _decode(token, now)
+    if claims.get("purpose") != PASSWORD_RESET_PURPOSE:
+        raise InvalidToken("Not a password reset token")
+    try:
+        return _subject(claims), int(claims["ver"])
+    except (KeyError, TypeError, ValueError) as exc:
+        raise InvalidToken("Malformed token") from exc
+
+
+def _encode(claims: dict, ttl: int, now: Optional[float]) -> str:
+    issued_at = int(now if now is not None else time.time())
+    claims = {**claims, "iat": issued_at, "exp": issued_at + ttl}
+    signing_input = f"{_b64encode_json(_HEADER)}.{_b64encode_json(claims)}"
+    return f"{signing_input}.{_b64encode(_sign(signing_input))}"
+
+
+def _decode(token: str, now: Optional[float]) -> dict:
+    # Checks the signature and expiry and returns the claims.
+    try:
+        header_b64, claims_b64, signature_b64 = token.split(".")
+        signing_input = f"{header_b64}.{claims_b64}"
+        if not hmac.compare_digest(_b64decode(signature_b64), _sign(signing_input)):
+            raise InvalidToken("Invalid token signature")
+        header = json.loads(_b64decode(header_b64))
+        claims = json.loads(_b64decode(claims_b64))
+        if header.get("alg") != "HS256":
+            raise InvalidToken("Unsupported token algorithm")
+        if int(claims["exp"]) <= (now if now is not None else time.time()):
+            raise InvalidToken("Token expired")
+        return claims
+    except InvalidToken:
+        raise
+    except (ValueError, KeyError, TypeError) as exc:
+        raise InvalidToken("Malformed token") from exc
+
+
+def _subject(claims: dict) -> int:
+    try:
+        return int(claims["sub"])
+    except (KeyError, TypeError, ValueError) as exc:
+        raise InvalidToken("Malformed token") from exc
+
+
+class PrincipalCache:
+    """user id -> Principal, bounded and time-limited so role/name changes propagate across workers."""
+
+    def __init__(self, ttl: int = PRINCIPAL_TTL_SECONDS, max_entries: int = PRINCIPAL_CACHE_SIZE) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, tuple[float, Principal]]" = OrderedDict()
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, principal = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return principal
+
+    def put(self, principal: Principal) -> None:
+        with self._lock:
+            self._entries[principal.user_id] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(principal.user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def refresh(self, user: User) -> None:
+        # Called after profile writes; only replaces principals that are already cached.
+        with self._lock:
+            cached = user.id in self._entries
+        if cached:
+            self.put(principal_for(user))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+principal_cache = PrincipalCache()
+
+
+def principal_for(user: User) -> Principal:
+    return Principal(user_id=user.id, role=user.role, name=user.name)
+
+
+def _load_principal(db: Session, user_id: int) -> Optional[Principal]:
+    row = db.execute(select(User.id, User.role, User.name).where(User.id == user_id)).first()
+    return Principal(user_id=row.id, role=row.role, name=row.name) if row else None
+
+
+async def optional_principal(
+    authorization: Optional[str] = Header(None), db: Session = Depends(get_db)
+) -> Optional[Principal]:
+    """The caller behind `Authorization: Bearer <token>`, or None for anonymous requests.
+
+    A present but invalid token is always rejected; a cached principal means no query at all.
+    """
+    if not authorization:
+        if AUTH_REQUIRED:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required")
+        return None
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Expected a Bearer token")
+    try:
+        user_id = verify_token(token.strip())
+    except InvalidToken as exc:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc))
+
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        principal = await run_db(db, _load_principal, user_id)
+        if principal is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unknown user")
+        principal_cache.put(principal)
+    return principal
+
+
+def ensure_caller(principal: Optional[Principal], user_id: int) -> None:
+    if principal is not None and principal.user_id != user_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Token does not belong to this user")
+
+
+def _sign(signing_input: str) -> bytes:
+    return hmac.new(_SECRET, signing_input.encode("ascii"), hashlib.sha256).digest()
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _b64encode_json(value: dict) -> str:
+    return _b64encode(json.dumps(value, separators=(",", ":"), sort_keys=True).encode("utf-8"))
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
@@ -1,13 +1,30 @@
 # Seed helpers to populate the database with demo data for LaunchCircle.
+#
+#   python seed.py --users 100000 --job-posts 20000 --applications 500000
+import argparse
+import itertools
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+from sqlalchemy import func, insert, select, text
 from sqlalchemy.orm import Session
-from models import ApplicationStatus, JobApplication, JobPost, RoleType, User
-from utils import join_csv
+from counters import reconcile_application_counts
+from models import ApplicationStatus, JobApplication, JobPost, JobPostSkill, RoleType, User, UserSkill
+from utils import join_csv, skill_tokens
 
 
-def seed_database(session: Session) -> None:
-    if session.query(User).first():
-        return
+def seed_database(
+    session: Session, users: int = 0, job_posts: int = 0, applications: int = 0, rng_seed: int = 7
+) -> None:
+    # Demo rows go into an empty database only; synthetic volumes are added on top when requested.
+    if not session.query(User).first():
+        _seed_demo(session)
+    if users or job_posts or applications:
+        seed_synthetic(session, users=users, job_posts=job_posts, applications=applications, rng_seed=rng_seed)
+
 
+def _seed_demo(session: Session) -> None:
     users = [
         User(
             name="Ava Chen",
@@ -79,6 +96,8 @@ def seed_database(session: Session) -> None:
         ),
     ]
 
+    for user in users:
+        user.skill_tags = [UserSkill(skill=skill) for skill in skill_tokens(user.skills)]
     session.add_all(users)
     session.flush()
 
@@ -112,6 +131,8 @@ def seed_database(session: Session) -> None:
             owner_id=users[1].id,
         ),
     ]
+    for post in job_posts:
+        post.skill_tags = [JobPostSkill(skill=skill) for skill in skill_tokens(post.skills)]
     session.add_all(job_posts)
     session.flush()
 
@@ -125,3 +146,236 @@ def seed_database(session: Session) -> None:
     ]
     session.add_all(applications)
     session.commit()
+    reconcile_application_counts(session)
+
+
+def backfill_skill_tags(session: Session) -> None:
+    # Databases created before the skill tag tables existed only have the CSV columns; fill the tags once.
+    if session.execute(select(UserSkill.user_id).limit(1)).first() or session.execute(
+        select(JobPostSkill.job_post_id).limit(1)
+    ).first():
+        return
+
+    user_rows = session.execute(select(User.id, User.skills).where(User.skills.is_not(None))).all()
+    session.add_all(
+        UserSkill(user_id=user_id, skill=skill) for user_id, skills in user_rows for skill in skill_tokens(skills)
+    )
+    post_rows = session.execute(select(JobPost.id, JobPost.skills).where(JobPost.skills.is_not(None))).all()
+    session.add_all(
+        JobPostSkill(job_post_id=post_id, skill=skill) for post_id, csv in post_rows for skill in skill_tokens(csv)
+    )
+    session.commit()
+
+
+# Synthetic volumes for load tests and benchmarks. Skill popularity is Zipf-like (a few skills are
+# everywhere, most are niche), locations are weighted towards a handful of hubs, and applications
+# concentrate on popular posts, so filters and joins see realistic selectivity.
+SYNTHETIC_SKILLS = (
+    "Python", "JavaScript", "React", "SQL", "TypeScript", "Node.js", "Product strategy", "Figma", "AWS", "Go",
+    "Postgres", "Growth", "Sales", "Docker", "Kubernetes", "Machine learning", "Data analysis", "Fundraising",
+    "UX research", "Java", "Swift", "Kotlin", "Copywriting", "SEO", "GTM", "Rust", "Next.js", "GraphQL",
+    "Terraform", "Customer success", "Django", "FastAPI", "Brand design", "Recruiting", "Finance", "Legal ops",
+    "Payments", "Security", "iOS", "Android", "Content marketing", "Community", "Partnerships", "LLMs",
+    "Computer vision", "Embedded", "Hardware", "Supply chain", "Healthcare", "Climate",
+)
+SYNTHETIC_LOCATIONS = (
+    # (location, time zone, weight)
+    ("Remote", "UTC", 24),
+    ("San Francisco, CA", "America/Los_Angeles", 12),
+    ("New York, NY", "America/New_York", 11),
+    ("London, UK", "Europe/London", 9),
+    ("Berlin, Germany", "Europe/Berlin", 6),
+    ("Bangalore, India", "Asia/Kolkata", 8),
+    ("Toronto, Canada", "America/Toronto", 5),
+    ("Lagos, Nigeria", "Africa/Lagos", 5),
+    ("Singapore", "Asia/Singapore", 4),
+    ("Sao Paulo, Brazil", "America/Sao_Paulo", 4),
+    ("Austin, TX", "America/Chicago", 4),
+    ("Paris, France", "Europe/Paris", 4),
+    ("Nairobi, Kenya", "Africa/Nairobi", 2),
+    ("Sydney, Australia", "Australia/Sydney", 2),
+)
+SYNTHETIC_TALENT_ROLES = (
+    (RoleType.software_engineer, 30),
+    (RoleType.software_developer, 15),
+    (RoleType.designer, 12),
+    (RoleType.product_manager, 10),
+    (RoleType.marketer, 8),
+    (RoleType.growth, 6),
+    (RoleType.sales, 6),
+    (RoleType.operations, 5),
+    (RoleType.job_seeker, 8),
+)
+SYNTHETIC_CHUNK_SIZE = 5000
+
+
+def seed_synthetic(
+    session: Session,
+    users: int = 1000,
+    job_posts: int = 200,
+    applications: int = 5000,
+    rng_seed: int = 7,
+    chunk_size: int = SYNTHETIC_CHUNK_SIZE,
+) -> dict:
+    """Appends generated users, job posts and applications using chunked executemany inserts.
+
+    Ids are assigned here (continuing from the current maximum) so skill tags can be inserted in the
+    same pass without reading ids back. Safe to run on a populated database; returns the inserted counts.
+    """
+    rng = random.Random(rng_seed)
+    now = datetime.utcnow()
+    skill_weights = list(itertools.accumulate(1 / (rank + 1) ** 1.1 for rank in range(len(SYNTHETIC_SKILLS))))
+    location_weights = list(itertools.accumulate(weight for _, _, weight in SYNTHETIC_LOCATIONS))
+    role_weights = list(itertools.accumulate(weight for _, weight in SYNTHETIC_TALENT_ROLES))
+
+    def pick_skills(low: int, high: int) -> List[str]:
+        picked = rng.choices(SYNTHETIC_SKILLS, cum_weights=skill_weights, k=rng.randint(low, high))
+        return list(dict.fromkeys(picked))
+
+    def created_at(position: int, total: int) -> datetime:
+        # Spread over two years, increasing with id like real sign-ups.
+        return now - timedelta(days=730) + timedelta(days=730 * position / max(total, 1), seconds=rng.random())
+
+    first_user_id = (session.execute(select(func.max(User.id))).scalar() or 0) + 1
+    owners: List[int] = list(
+        session.execute(select(User.id).where(User.role.in_([RoleType.founder, RoleType.job_provider]))).scalars()
+    )
+    talent: List[int] = list(
+        session.execute(select(User.id).where(User.role.not_in([RoleType.founder, RoleType.job_provider]))).scalars()
+    )
+
+    def user_rows(start: int, stop: int):
+        for n in range(start, stop):
+            user_id = first_user_id + n
+            roll = rng.random()
+            if roll < 0.08:
+                role = RoleType.founder
+            elif roll < 0.12:
+                role = RoleType.job_provider
+            else:
+                role = rng.choices(SYNTHETIC_TALENT_ROLES, cum_weights=role_weights)[0][0]
+            (owners if role in (RoleType.founder, RoleType.job_provider) else talent).append(user_id)
+            location, time_zone, _ = rng.choices(SYNTHETIC_LOCATIONS, cum_weights=location_weights)[0]
+            skills = pick_skills(2, 6)
+            yield {
+                "id": user_id,
+                "name": f"Synthetic User {user_id}",
+                "email": f"user{user_id}@synthetic.launchcircle.dev",
+                "headline": f"{role.value.replace('_', ' ').title()} | {skills[0]}",
+                "bio": f"Works on {', '.join(skills)} from {location}.",
+                "experience": f"{rng.randint(0, 15)} years",
+                "looking_for_cofounder": role == RoleType.founder and rng.random() < 0.6,
+                "availability": rng.choice(("full-time", "full-time", "part-time", "contract")),
+                "skills": join_csv(skills),
+                "location": location,
+                "time_zone": time_zone,
+                "role": role,
+                "preferences": {"work_style": rng.choice(("remote", "remote", "hybrid", "onsite"))},
+                "created_at": created_at(n, users),
+            }
+
+    _insert_chunked(session, User, UserSkill, "user_id", user_rows(0, users), chunk_size)
+    if job_posts and not owners:
+        raise ValueError("Job posts need at least one founder or job provider")
+
+    first_post_id = (session.execute(select(func.max(JobPost.id))).scalar() or 0) + 1
+
+    def post_rows():
+        for n in range(job_posts):
+            post_id = first_post_id + n
+            skills = pick_skills(2, 4)
+            location, time_zone, _ = rng.choices(SYNTHETIC_LOCATIONS, cum_weights=location_weights)[0]
+            yield {
+                "id": post_id,
+                "title": f"{skills[0]} {rng.choice(('Engineer', 'Lead', 'Designer', 'Specialist', 'Cofounder'))}",
+                "headline": f"Help us scale with {skills[-1]}",
+                "description": f"Looking for someone strong in {', '.join(skills)}.",
+                "role": rng.choices(SYNTHETIC_TALENT_ROLES, cum_weights=role_weights)[0][0],
+                "skills": join_csv(skills),
+                "location": location,
+                "time_zone": time_zone,
+                "work_style": rng.choice(("remote", "hybrid", "onsite")),
+                "availability": rng.choice(("full-time", "part-time", "contract")),
+                "timeline": rng.choice(("ASAP", "1-3 months", "3-6 months")),
+                "owner_id": rng.choice(owners),
+                "created_at": created_at(n, job_posts),
+            }
+
+    _insert_chunked(session, JobPost, JobPostSkill, "job_post_id", post_rows(), chunk_size)
+
+    post_ids = list(session.execute(select(JobPost.id)).scalars()) if applications else []
+    if applications and (not post_ids or not talent):
+        raise ValueError("Applications need at least one job post and one applicant")
+    # Popularity follows the post's position in a shuffled order, so the hottest posts are spread over time.
+    rng.shuffle(post_ids)
+    post_weights = list(itertools.accumulate(1 / (rank + 1) ** 0.8 for rank in range(len(post_ids))))
+    statuses = list(ApplicationStatus)
+    # (job_post_id, applicant_id) is unique: redraw pairs that were already used, here or in earlier runs.
+    taken = set(session.execute(select(JobApplication.job_post_id, JobApplication.applicant_id)).tuples())
+    if len(taken) + applications > len(post_ids) * len(talent) // 2:
+        raise ValueError("Too many applications for the number of job posts and applicants")
+
+    def application_rows():
+        for n in range(applications):
+            pair = (rng.choices(post_ids, cum_weights=post_weights)[0], rng.choice(talent))
+            while pair in taken:
+                pair = (rng.choices(post_ids, cum_weights=post_weights)[0], rng.choice(talent))
+            taken.add(pair)
+            yield {
+                "job_post_id": pair[0],
+                "applicant_id": pair[1],
+                "status": rng.choices(statuses, weights=(70, 12, 8, 8, 2))[0],
+                "created_at": created_at(n, applications),
+            }
+
+    _insert_chunked(session, JobApplication, None, None, application_rows(), chunk_size)
+    if applications:
+        reconcile_application_counts(session)
+    _sync_sequences(session)
+    return {"users": users, "job_posts": job_posts, "applications": applications}
+
+
+def _insert_chunked(session: Session, model, tag_model, tag_key: Optional[str], rows: Iterable[dict], chunk_size: int):
+    # One multi-row INSERT batch and one commit per chunk keeps memory flat at millions of rows.
+    iterator = iter(rows)
+    while chunk := list(itertools.islice(iterator, chunk_size)):
+        session.execute(insert(model), chunk)
+        if tag_model is not None:
+            tags = [{tag_key: row["id"], "skill": skill} for row in chunk for skill in skill_tokens(row["skills"])]
+            session.execute(insert(tag_model), tags)
+        session.commit()
+
+
+def _sync_sequences(session: Session) -> None:
+    # Explicit ids bypass Postgres sequences; move them past the generated rows.
+    if session.get_bind().dialect.name != "postgresql":
+        return
+    for table in ("users", "job_posts", "job_applications"):
+        session.execute(
+            text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT coalesce(max(id), 1) FROM {table}))")
+        )
+    session.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Add synthetic users, job posts and applications to DATABASE_URL.")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--job-posts", type=int, default=200)
+    parser.add_argument("--applications", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    from db import SessionLocal, init_db
+
+    init_db(seed=False)
+    started = time.perf_counter()
+    with SessionLocal() as session:
+        seed_database(
+            session, users=args.users, job_posts=args.job_posts, applications=args.applications, rng_seed=args.seed
+        )
+    elapsed = time.perf_counter() - started
+    print(f"seeded {args.users} users, {args.job_posts} job posts, {args.applications} applications in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# SQLite production profile (SQLITE_PROFILE=production) for single-node deployments on a SQLite file: WAL with tuned
+# pragmas, writers that take the write lock only when they write, read-only reader connections, and WAL maintenance.
+#
+#   python bench/sqlite_profile.py      # compares it with the default configuration
+import logging
+import os
+import threading
+from typing import Dict, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+
+logger = logging.getLogger(__name__)
+
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "default").lower()
+SQLITE_MMAP_BYTES = int(os.getenv("SQLITE_MMAP_BYTES", str(256 * 1024 * 1024)))
+SQLITE_CACHE_KIB = int(os.getenv("SQLITE_CACHE_KIB", str(64 * 1024)))  # Page cache per connection.
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_READERS = int(os.getenv("SQLITE_READERS", "8"))
+SQLITE_WRITER_CONNECTIONS = int(os.getenv("SQLITE_WRITER_CONNECTIONS", "4"))
+SQLITE_MAINTENANCE_SECONDS = float(os.getenv("SQLITE_MAINTENANCE_SECONDS", "300"))
+# Statements the writer runs outside a transaction; anything else starts one with BEGIN IMMEDIATE.
+_READS = ("SELECT", "PRAGMA", "EXPLAIN")
+
+
+def uses_profile(url: str, profile: Optional[str] = None) -> bool:
+    # WAL needs a file; in-memory databases and the async driver keep the default setup.
+    parsed = make_url(url)
+    return (
+        (profile or SQLITE_PROFILE) == "production"
+        and parsed.get_backend_name() == "sqlite"
+        and parsed.get_driver_name() == "pysqlite"
+        and parsed.database not in (None, "", ":memory:")
+    )
+
+
+def pragmas() -> Dict[str, object]:
+    return {
+        "journal_mode": "WAL",  # Readers never block the writer, and a commit appends to the log instead of a journal.
+        "synchronous": "NORMAL",  # fsync at checkpoints, not every commit; WAL stays consistent after a crash.
+        "busy_timeout": SQLITE_BUSY_TIMEOUT_MS,
+        "cache_size": -SQLITE_CACHE_KIB,  # Negative: KiB rather than pages.
+        "mmap_size": SQLITE_MMAP_BYTES,
+        "temp_store": "MEMORY",
+    }
+
+
+def install_pragmas(engine: Engine, writer: bool) -> None:
+    """Applies the pragmas to every new connection of `engine`; reader connections are also query_only.
+
+    Writer connections open their transaction with BEGIN IMMEDIATE at the first write statement; until then a
+    transaction's SELECTs run as autocommit statements (each sees the latest commit, as under READ COMMITTED),
+    so the read part of a write request holds no lock. Taking the write lock up front means a writer waits its
+    turn under busy_timeout; a deferred transaction upgrading after another connection committed would instead
+    fail with "database is locked" at once.
+    """
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        if writer:
+            dbapi_connection.isolation_level = None  # pysqlite would otherwise emit its own deferred BEGIN.
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas().items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        if not writer:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+    if writer:
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _begin_on_first_write(conn, cursor, statement, parameters, context, executemany):
+            if not cursor.connection.in_transaction and not statement.lstrip()[:7].upper().startswith(_READS):
+                cursor.execute("BEGIN IMMEDIATE")
+
+
+def writer_pool_options() -> dict:
+    # A few connections so requests can read while one writes; SQLite's write lock lets one write at a time.
+    return {"pool_size": SQLITE_WRITER_CONNECTIONS, "max_overflow": 0}
+
+
+def reader_pool_options() -> dict:
+    return {"pool_size": SQLITE_READERS, "max_overflow": 0}
+
+
+class SQLiteMaintenance:
+    """Background thread that checkpoints the WAL and runs PRAGMA optimize every `interval` seconds.
+
+    SQLite's auto-checkpoint only runs on commit and can't finish while readers hold old snapshots, so a busy
+    reader pool lets the WAL grow; the periodic passive checkpoint catches up. stop() truncates the WAL.
+    """
+
+    def __init__(self, engine: Engine, interval: float = SQLITE_MAINTENANCE_SECONDS) -> None:
+        self.engine = engine
+        self.interval = interval
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._loop, name="sqlite-maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.run_once("TRUNCATE")
+
+    def run_once(self, mode: str = "PASSIVE") -> Tuple[int, int, int]:
+        """(busy, WAL frames, frames checkpointed), as PRAGMA wal_checkpoint reports them."""
+        # PRAGMAs on a raw connection never open a transaction; a checkpoint can't run inside one.
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            result = tuple(cursor.execute(f"PRAGMA wal_checkpoint({mode})").fetchone())
+            cursor.execute("PRAGMA optimize")
+            cursor.close()
+        finally:
+            connection.close()
+        return result
+
+    def _loop(self) -> None:
+        while not self._stopping.wait(self.interval):
+            try:
+                busy, frames, checkpointed = self.run_once()
+                logger.debug("wal checkpoint: %d of %d frames (busy=%d)", checkpointed, frames, busy)
+            except Exception:
+                logger.warning("sqlite maintenance failed", exc_info=True)
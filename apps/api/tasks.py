@@ -0,0 +1,350 @@
+# Background task queue: Redis lists when REDIS_URL is set, a SQLite file otherwise, plus worker threads.
+# Write paths enqueue by name and return; handlers are registered with @task (see background.py).
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional
+from metrics import Counter, Gauge, Histogram, registry
+
+logger = logging.getLogger(__name__)
+
+TASK_QUEUE_PATH = os.getenv("TASK_QUEUE_PATH", "tasks.db")
+# Worker threads inside each API process; defaults to one without Redis, so local runs need no worker.py.
+INLINE_WORKERS = int(os.getenv("TASK_INLINE_WORKERS", "0" if os.getenv("REDIS_URL") else "1"))
+DEFAULT_MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", "5"))
+BACKOFF_BASE_SECONDS = float(os.getenv("TASK_BACKOFF_SECONDS", "2"))
+BACKOFF_MAX_SECONDS = 300.0
+# A reserved task whose worker died becomes runnable again after this long.
+VISIBILITY_TIMEOUT_SECONDS = 300
+POLL_SECONDS = 0.2
+KEY_PREFIX = "lc:tasks:"
+DEAD_LETTER_LIMIT = 1000
+
+TASK_SECONDS = registry.register(
+    Histogram("launchcircle_task_duration_seconds", "Task handler run time", ("task", "outcome"))
+)
+TASK_WAIT_SECONDS = registry.register(
+    Histogram("launchcircle_task_queue_wait_seconds", "Time from enqueue (or retry) to start", ("task",))
+)
+TASKS_ENQUEUED = registry.register(Counter("launchcircle_tasks_enqueued_total", "Tasks enqueued", ("task",)))
+TASK_ENQUEUE_FAILURES = registry.register(
+    Counter("launchcircle_task_enqueue_failures_total", "Tasks dropped because the queue was unavailable", ("task",))
+)
+
+
+@dataclass
+class Task:
+    name: str
+    payload: dict
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    attempts: int = 0
+    enqueued_at: float = field(default_factory=time.time)
+
+    def dumps(self) -> str:
+        return json.dumps(asdict(self), separators=(",", ":"))
+
+    @classmethod
+    def loads(cls, raw) -> "Task":
+        return cls(**json.loads(raw))
+
+
+@dataclass(frozen=True)
+class TaskSpec:
+    name: str
+    fn: Callable[..., None]
+    max_attempts: int
+
+
+_registry: Dict[str, TaskSpec] = {}
+
+
+def task(name: str, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+    """Registers `fn(**payload)` as the handler for `name`; it is retried with backoff when it raises."""
+
+    def decorator(fn):
+        _registry[name] = TaskSpec(name, fn, max_attempts)
+        return fn
+
+    return decorator
+
+
+class SQLiteQueue:
+    """One SQLite file shared by the API and `worker.py` processes on a host; ":memory:" keeps it in-process."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str) -> None:
+        self._lock = threading.Lock()
+        self._pushed = threading.Condition(self._lock)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks (id TEXT PRIMARY KEY, body TEXT NOT NULL, run_at REAL NOT NULL, "
+            "reserved_until REAL, dead INTEGER NOT NULL DEFAULT 0, last_error TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_tasks_dead_run_at ON tasks (dead, run_at)")
+
+    def push(self, item: Task, delay: float = 0.0) -> None:
+        with self._pushed:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tasks (id, body, run_at) VALUES (?, ?, ?)",
+                (item.id, item.dumps(), time.time() + delay),
+            )
+            self._pushed.notify()
+
+    def reserve(self, timeout: float) -> Optional[Task]:
+        deadline = time.monotonic() + timeout
+        with self._pushed:
+            while True:
+                now = time.time()
+                row = self._conn.execute(
+                    "UPDATE tasks SET reserved_until = ? WHERE id = (SELECT id FROM tasks WHERE dead = 0 AND "
+                    "run_at <= ? AND (reserved_until IS NULL OR reserved_until < ?) ORDER BY run_at LIMIT 1) "
+                    "RETURNING body",
+                    (now + VISIBILITY_TIMEOUT_SECONDS, now, now),
+                ).fetchone()
+                remaining = deadline - time.monotonic()
+                if row is not None or remaining <= 0:
+                    return Task.loads(row[0]) if row else None
+                # Woken by an in-process push; other processes' pushes are picked up by polling.
+                self._pushed.wait(min(remaining, POLL_SECONDS))
+
+    def ack(self, item: Task) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM tasks WHERE id = ?", (item.id,))
+
+    def retry(self, item: Task, delay: float, error: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE tasks SET body = ?, run_at = ?, reserved_until = NULL, last_error = ? WHERE id = ?",
+                (item.dumps(), time.time() + delay, error, item.id),
+            )
+
+    def bury(self, item: Task, error: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE tasks SET body = ?, dead = 1, last_error = ? WHERE id = ?", (item.dumps(), error, item.id)
+            )
+
+    def depth(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT dead, count(*) FROM tasks GROUP BY dead").fetchall()
+        counts = dict(rows)
+        return {"pending": counts.get(0, 0), "dead": counts.get(1, 0)}
+
+
+class RedisQueue:
+    """Ready list, a sorted set of delayed retries, and a processing list recovered after the visibility timeout."""
+
+    name = "redis"
+
+    def __init__(self, url: str) -> None:
+        import redis  # Optional dependency, only needed when REDIS_URL is set.
+
+        self._client = redis.Redis.from_url(url)
+        self._ready, self._delayed = f"{KEY_PREFIX}ready", f"{KEY_PREFIX}delayed"
+        self._processing, self._reserved = f"{KEY_PREFIX}processing", f"{KEY_PREFIX}reserved"
+        self._dead = f"{KEY_PREFIX}dead"
+
+    def push(self, item: Task, delay: float = 0.0) -> None:
+        if delay > 0:
+            self._client.zadd(self._delayed, {item.dumps(): time.time() + delay})
+        else:
+            self._client.lpush(self._ready, item.dumps())
+
+    def reserve(self, timeout: float) -> Optional[Task]:
+        self._promote_due()
+        raw = self._client.blmove(self._ready, self._processing, max(timeout, 0.01), "RIGHT", "LEFT")
+        if raw is None:
+            return None
+        self._client.hset(self._reserved, raw, time.time() + VISIBILITY_TIMEOUT_SECONDS)
+        item = Task.loads(raw)
+        item._raw = raw  # The exact bytes, needed to remove it from the processing list.
+        return item
+
+    def ack(self, item: Task) -> None:
+        self._release(item)
+
+    def retry(self, item: Task, delay: float, error: str) -> None:
+        self._release(item)
+        self._client.zadd(self._delayed, {item.dumps(): time.time() + delay})
+
+    def bury(self, item: Task, error: str) -> None:
+        self._release(item)
+        pipe = self._client.pipeline(transaction=False)
+        pipe.lpush(self._dead, json.dumps({"task": asdict(item), "error": error}))
+        pipe.ltrim(self._dead, 0, DEAD_LETTER_LIMIT - 1)
+        pipe.execute()
+
+    def depth(self) -> Dict[str, int]:
+        pipe = self._client.pipeline(transaction=False)
+        pipe.llen(self._ready)
+        pipe.zcard(self._delayed)
+        pipe.llen(self._processing)
+        pipe.llen(self._dead)
+        ready, delayed, processing, dead = pipe.execute()
+        return {"pending": ready + delayed + processing, "dead": dead}
+
+    def recover(self) -> int:
+        # Puts back tasks whose worker died mid-run; LREM decides the race between two recovering workers.
+        now, recovered = time.time(), 0
+        for raw, deadline in self._client.hgetall(self._reserved).items():
+            if float(deadline) < now and self._client.lrem(self._processing, 1, raw):
+                self._client.lpush(self._ready, raw)
+                recovered += 1
+            if float(deadline) < now:
+                self._client.hdel(self._reserved, raw)
+        return recovered
+
+    def _promote_due(self) -> None:
+        for raw in self._client.zrangebyscore(self._delayed, "-inf", time.time(), start=0, num=100):
+            if self._client.zrem(self._delayed, raw):  # Only the worker that removed it re-queues it.
+                self._client.lpush(self._ready, raw)
+
+    def _release(self, item: Task) -> None:
+        raw = getattr(item, "_raw", item.dumps())
+        pipe = self._client.pipeline(transaction=False)
+        pipe.lrem(self._processing, 1, raw)
+        pipe.hdel(self._reserved, raw)
+        pipe.execute()
+
+
+def create_queue():
+    url = os.getenv("REDIS_URL")
+    if url:
+        try:
+            return RedisQueue(url)
+        except ImportError:
+            logger.warning("REDIS_URL is set but the redis package is not installed; using the SQLite task queue")
+    return SQLiteQueue(TASK_QUEUE_PATH)
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_queue():
+    # Created on first use, so processes that never enqueue (migrations, benchmarks) never open the queue.
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = create_queue()
+    return _queue
+
+
+def enqueue(name: str, delay: float = 0.0, **payload) -> Optional[str]:
+    """Queues `name(**payload)` and returns the task id; a queue outage is logged, never raised to the caller."""
+    item = Task(name=name, payload=payload)
+    try:
+        get_queue().push(item, delay)
+    except Exception:
+        logger.warning("could not enqueue task %s", name, exc_info=True)
+        TASK_ENQUEUE_FAILURES.inc(1, name)
+        return None
+    TASKS_ENQUEUED.inc(1, name)
+    return item.id
+
+
+def backoff_seconds(attempts: int, base: float = BACKOFF_BASE_SECONDS) -> float:
+    # Exponential with full jitter between half and all of the step, so retries of a burst spread out.
+    step = min(BACKOFF_MAX_SECONDS, base * 2 ** max(attempts - 1, 0))
+    return step * random.uniform(0.5, 1.0)
+
+
+class Worker:
+    """Runs registered handlers for queued tasks on `concurrency` threads."""
+
+    def __init__(self, queue=None, concurrency: int = 1, backoff_base: float = BACKOFF_BASE_SECONDS) -> None:
+        self.queue = queue if queue is not None else get_queue()
+        self.concurrency = concurrency
+        self.backoff_base = backoff_base
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        for index in range(self.concurrency):
+            thread = threading.Thread(target=self._loop, name=f"task-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stopping.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads.clear()
+
+    def run_once(self, timeout: float = 0.0) -> bool:
+        # Runs at most one task; False when nothing was ready within `timeout`.
+        item = self.queue.reserve(timeout)
+        if item is None:
+            return False
+        self._execute(item)
+        return True
+
+    def drain(self) -> int:
+        ran = 0
+        while self.run_once():
+            ran += 1
+        return ran
+
+    def _loop(self) -> None:
+        last_recovery = 0.0
+        while not self._stopping.is_set():
+            try:
+                if hasattr(self.queue, "recover") and time.monotonic() - last_recovery > VISIBILITY_TIMEOUT_SECONDS / 5:
+                    self.queue.recover()
+                    last_recovery = time.monotonic()
+                self.run_once(timeout=1.0)
+            except Exception:  # Queue outage: back off instead of spinning.
+                logger.exception("task worker loop failed")
+                self._stopping.wait(1.0)
+
+    def _execute(self, item: Task) -> None:
+        TASK_WAIT_SECONDS.observe(max(time.time() - item.enqueued_at, 0.0), item.name)
+        spec = _registry.get(item.name)
+        if spec is None:
+            logger.error("no handler registered for task %s", item.name)
+            self.queue.bury(item, "unknown task")
+            return
+        started = time.perf_counter()
+        try:
+            spec.fn(**item.payload)
+        except Exception as exc:
+            item.attempts += 1
+            error = f"{type(exc).__name__}: {exc}"
+            if item.attempts >= spec.max_attempts:
+                outcome = "dead"
+                logger.exception("task %s failed %d times; giving up", item.name, item.attempts)
+                self.queue.bury(item, error)
+            else:
+                outcome = "retry"
+                logger.warning("task %s failed (attempt %d): %s", item.name, item.attempts, error)
+                item.enqueued_at = time.time()
+                self.queue.retry(item, backoff_seconds(item.attempts, self.backoff_base), error)
+        else:
+            outcome = "ok"
+            self.queue.ack(item)
+        TASK_SECONDS.observe(time.perf_counter() - started, item.name, outcome)
+
+
+def _queue_gauges() -> Iterable[Gauge]:
+    depth = Gauge("launchcircle_task_queue_depth", "Queued tasks by state", ("backend", "state"))
+    if _queue is not None:
+        try:
+            for state, count in _queue.depth().items():
+                depth.set(count, _queue.name, state)
+        except Exception:
+            logger.warning("could not read the task queue depth", exc_info=True)
+    return (depth,)
+
+
+registry.add_collector(_queue_gauges)
@@ -0,0 +1,48 @@
+# Shared test helpers.
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@contextmanager
+def count_statements(engine: Engine) -> Iterator[List[str]]:
+    # Collects every SQL statement sent to the driver while the block runs.
+    statements: List[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+
+@contextmanager
+def capture_statements(engine: Engine) -> Iterator[List[Tuple[str, Any]]]:
+    # Like count_statements, but keeps the bound parameters so a statement can be re-run (e.g. under EXPLAIN).
+    captured: List[Tuple[str, Any]] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        yield captured
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+
+@contextmanager
+def cache_disabled() -> Iterator[None]:
+    # Forces reads through to the database, e.g. when counting the statements a path issues.
+    from cache import response_cache
+
+    previous, response_cache.enabled = response_cache.enabled, False
+    try:
+        yield
+    finally:
+        response_cache.enabled = previous
@@ -1,7 +1,17 @@
+import csv
+import io
+import json
 import os
 import pathlib
+import sqlite3
 import sys
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
 
 CURRENT_DIR = pathlib.Path(__file__).resolve()
 API_DIR = CURRENT_DIR.parent.parent
@@ -12,10 +22,18 @@ if TEST_DB.exists():
     TEST_DB.unlink()
 
 os.environ["DATABASE_URL"] = "sqlite:///./test.db"
+os.environ["TASK_QUEUE_PATH"] = ":memory:"
 
 import db  # noqa: E402
+from cache import response_cache  # noqa: E402
+from counters import reconcile_application_counts  # noqa: E402
+from helpers import cache_disabled, count_statements  # noqa: E402
 from main import app  # noqa: E402
 from models import RoleType  # noqa: E402
+from search import install_fulltext  # noqa: E402
+from security import InvalidToken, issue_reset_token, issue_token, verify_reset_token, verify_token  # noqa: E402
+from sqlite_profile import SQLITE_WRITER_CONNECTIONS, SQLiteMaintenance  # noqa: E402
+from tasks import Worker, enqueue, get_queue, task  # noqa: E402
 
 db.init_db(seed=True)
 client = TestClient(app)
@@ -48,7 +66,7 @@ def test_create_and_fetch_user():
 
 
 def test_profiles_search():
-    res = client.get("/api/users", params={"role": RoleType.founder})
+    res = client.get("/api/users", params={"role": RoleType.founder.value})
     assert res.status_code == 200
     users = res.json()
     assert isinstance(users, list)
@@ -91,3 +109,742 @@ def test_auth_signup_and_login():
     res_login = client.post("/api/auth/login", json=login_payload)
     assert res_login.status_code == 200
     assert "token" in res_login.json()
+
+
+def test_user_matches_use_shared_skills():
+    base = {"role": RoleType.software_engineer, "looking_for_cofounder": True}
+    subject = client.post("/api/users", json={**base, "name": "Match Subject", "skills": ["Rust", "WebAssembly"]}).json()
+    strong = client.post("/api/users", json={**base, "name": "Strong Match", "skills": ["rust", "WebAssembly"]}).json()
+    weak = client.post("/api/users", json={**base, "name": "Weak Match", "skills": ["Rust", "Go", "Kotlin"]}).json()
+    client.post("/api/users", json={**base, "name": "No Match", "skills": ["Figma"]})
+
+    res = client.get(f"/api/users/{subject['id']}/matches", params={"limit": 5})
+    assert res.status_code == 200
+    matches = res.json()
+    assert [m["user_id"] for m in matches[:2]] == [strong["id"], weak["id"]]
+    assert all(m["name"] != "No Match" for m in matches)
+    assert matches[0]["match_score"] > matches[1]["match_score"]
+
+    # Updating a profile re-indexes it, so the weak candidate can overtake.
+    client.put(f"/api/users/{weak['id']}", json={"skills": ["Rust", "WebAssembly"]})
+    updated = client.get(f"/api/users/{subject['id']}/matches", params={"limit": 1}).json()
+    assert updated[0]["user_id"] == min(strong["id"], weak["id"])
+
+    assert client.get("/api/users/999999/matches").status_code == 404
+
+
+def test_batch_matches_are_served_and_recomputed_incrementally():
+    pytest.importorskip("scipy")
+    from match_batch import recompute_matches
+    from matching import skill_index
+    from models import UserMatch, UserMatchState
+
+    base = {"role": RoleType.software_engineer}
+    subject = client.post("/api/users", json={**base, "name": "Batch Subject", "skills": ["Haskell", "Nix"]}).json()
+    peer = client.post("/api/users", json={**base, "name": "Batch Peer", "skills": ["haskell", "nix"]}).json()
+    url = f"/api/users/{subject['id']}/matches"
+    try:
+        with db.SessionLocal() as session:
+            first = recompute_matches(session)
+        assert first.full and first.recomputed == first.users
+
+        with count_statements(db.engine) as statements:
+            served = client.get(url, params={"limit": 5}).json()
+        assert len(statements) == 1
+        assert [(m["match_score"], m["user_id"]) for m in served] == skill_index.top_matches(subject["id"], 5)
+        assert served[0]["user_id"] == peer["id"]
+
+        client.put(f"/api/users/{peer['id']}", json={"skills": ["Figma"]})
+        with db.SessionLocal() as session:
+            second = recompute_matches(session)
+        assert not second.full and second.changed == 1 and second.recomputed < first.recomputed
+        assert peer["id"] not in [m["user_id"] for m in client.get(url).json()]
+    finally:
+        with db.SessionLocal() as session:
+            session.query(UserMatch).delete()
+            session.query(UserMatchState).delete()
+            session.commit()
+
+
+def test_recommended_jobs_and_fit_sorted_applicants():
+    seeker = client.post(
+        "/api/users",
+        json={
+            "name": "Fit Seeker",
+            "role": RoleType.job_seeker,
+            "skills": ["Solidity", "Cairo"],
+            "time_zone": "UTC",
+            "availability": "Full-time",
+            "preferences": {"work_style": "Remote"},
+        },
+    ).json()
+    weak = client.post("/api/users", json={"name": "Weak Fit", "role": RoleType.job_seeker, "skills": ["Cairo"]}).json()
+    job = {"role": RoleType.software_engineer, "owner_id": 1, "time_zone": "UTC", "availability": "Full-time"}
+    best = client.post(
+        "/api/jobs", json={**job, "title": "Contracts", "skills": ["solidity", "cairo"], "work_style": "remote"}
+    ).json()
+    partial = client.post(
+        "/api/jobs", json={**job, "title": "Protocol", "skills": ["Solidity", "Go"], "work_style": "onsite"}
+    ).json()
+
+    recommended = client.get(f"/api/users/{seeker['id']}/recommended-jobs").json()
+    assert [j["id"] for j in recommended[:2]] == [best["id"], partial["id"]]
+    assert recommended[0]["fit_score"] == 100 > recommended[1]["fit_score"]
+
+    for applicant in (weak, seeker):
+        client.post(f"/api/jobs/{best['id']}/apply", json={"job_post_id": best["id"], "applicant_id": applicant["id"]})
+    assert best["id"] not in [j["id"] for j in client.get(f"/api/users/{seeker['id']}/recommended-jobs").json()]
+
+    url = f"/api/jobs/{best['id']}/applications"
+    assert [a["applicant_id"] for a in client.get(url).json()] == [weak["id"], seeker["id"]]
+    ranked = client.get(url, params={"sort": "fit"}).json()
+    assert [a["applicant_id"] for a in ranked] == [seeker["id"], weak["id"]]
+    assert ranked[0]["fit_score"] > ranked[1]["fit_score"]
+    assert client.get(url, params={"sort": "fit", "cursor": "x"}).status_code == 400
+    assert client.get("/api/users/999999/recommended-jobs").status_code == 404
+
+
+def test_skill_filter_is_exact_token_match():
+    base = {"role": RoleType.software_developer}
+    java = client.post("/api/users", json={**base, "name": "Java Dev", "skills": ["Java", "Spring"]}).json()
+    js = client.post("/api/users", json={**base, "name": "JS Dev", "skills": ["JavaScript", "Spring"]}).json()
+
+    ids = {u["id"] for u in client.get("/api/users", params={"skills": "java"}).json()}
+    assert java["id"] in ids and js["id"] not in ids
+
+    both = {u["id"] for u in client.get("/api/users", params=[("skills", "Java"), ("skills", "spring")]).json()}
+    assert both == {java["id"]}
+    any_of = client.get("/api/users", params={"skills": "java,javascript", "skills_match": "any"}).json()
+    assert {java["id"], js["id"]} <= {u["id"] for u in any_of}
+
+    client.put(f"/api/users/{js['id']}", json={"skills": ["Java"]})
+    ids = {u["id"] for u in client.get("/api/users", params={"skills": "java"}).json()}
+    assert {java["id"], js["id"]} <= ids
+    # Wire format still exposes the original display strings.
+    assert client.get(f"/api/users/{js['id']}").json()["skills"] == ["Java"]
+
+    jobs = client.get("/api/jobs", params={"skills": "postgres"}).json()
+    assert [j["title"] for j in jobs] == ["Backend Engineer (Payments)"]
+
+
+def test_list_endpoints_paginate_with_cursor():
+    everyone = client.get("/api/users", params={"limit": 200}).json()
+    seen = []
+    params = {"limit": 2}
+    while True:
+        res = client.get("/api/users", params=params)
+        assert res.status_code == 200
+        page = res.json()
+        assert len(page) <= 2
+        seen.extend(u["id"] for u in page)
+        next_cursor = res.headers.get("X-Next-Cursor")
+        if not next_cursor:
+            break
+        assert 'rel="next"' in res.headers["Link"]
+        params = {"limit": 2, "cursor": next_cursor}
+    assert seen == [u["id"] for u in everyone]
+    assert len(seen) == len(set(seen))
+
+    assert client.get("/api/users", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/api/jobs", params={"limit": 10_000}).status_code == 422
+
+    first = client.get("/api/jobs", params={"limit": 1})
+    assert len(first.json()) == 1 and "X-Next-Cursor" in first.headers
+    apps = client.get("/api/jobs/1/applications", params={"limit": 1})
+    assert apps.status_code == 200 and len(apps.json()) == 1
+
+
+def test_list_responses_serialize_like_detail_responses():
+    listed = client.get("/api/users", params={"limit": 200})
+    assert listed.headers["content-type"] == "application/json"
+    user = next(u for u in listed.json() if u["email"])
+    assert user == client.get(f"/api/users/{user['id']}").json()
+    job = client.get("/api/jobs", params={"limit": 1}).json()[0]
+    assert job == client.get(f"/api/jobs/{job['id']}").json()
+    assert client.get("/api/jobs/999999/applications").json() == []
+
+
+def test_list_and_detail_paths_use_fixed_statement_counts():
+    job_id = client.post(
+        "/api/jobs",
+        json={"title": "Query Budget", "role": RoleType.designer, "owner_id": 1, "skills": ["Figma"]},
+    ).json()["id"]
+    for applicant_id in (3, 4):
+        client.post(f"/api/jobs/{job_id}/apply", json={"job_post_id": job_id, "applicant_id": applicant_id})
+
+    def statements_for(url, params=None):
+        with cache_disabled(), count_statements(db.engine) as statements:
+            assert client.get(url, params=params).status_code == 200
+        return len(statements)
+
+    # One SELECT regardless of how many rows (and related owners/applicants) the page holds.
+    assert statements_for("/api/jobs", {"limit": 1}) == statements_for("/api/jobs", {"limit": 200}) == 1
+    apps_url = f"/api/jobs/{job_id}/applications"
+    assert statements_for(apps_url, {"limit": 1}) == statements_for(apps_url, {"limit": 200}) == 1
+    assert statements_for(f"/api/jobs/{job_id}") == 1
+    assert statements_for("/api/users", {"limit": 200}) == 1
+
+
+def test_card_view_projects_listing_fields():
+    with cache_disabled(), count_statements(db.engine) as statements:
+        res = client.get("/api/users", params={"view": "card", "skills": "react"})
+    assert res.status_code == 200
+    cards = res.json()
+    assert [c["name"] for c in cards] == ["Samira Patel"]
+    assert set(cards[0]) == {
+        "id", "name", "headline", "role", "location", "availability", "skills", "created_at", "updated_at", "version"
+    }
+    assert cards[0]["skills"] == ["Next.js", "React", "TypeScript", "Design systems"]
+    select_list = statements[0].split(" FROM ")[0]
+    assert "password_hash" not in select_list and "bio" not in select_list
+
+    jobs = client.get("/api/jobs", params={"view": "card", "skills": "payments"}).json()
+    assert jobs[0]["owner_name"] == "Leo Martinez"
+    assert "description" not in jobs[0]
+    # The default view keeps the full objects.
+    assert "description" in client.get("/api/jobs", params={"skills": "payments"}).json()[0]
+
+
+def test_full_text_search_ranks_profiles_and_jobs():
+    base = {"role": RoleType.designer}
+    strong = client.post(
+        "/api/users",
+        json={**base, "name": "Mara Kline", "headline": "Motion designer", "bio": "Motion graphics and motion systems"},
+    ).json()
+    weak = client.post("/api/users", json={**base, "name": "Otto Vance", "bio": "Some motion work"}).json()
+
+    results = client.get("/api/users", params={"q": "motion"}).json()
+    assert [u["id"] for u in results[:2]] == [strong["id"], weak["id"]]
+    # Updates are picked up by the index, and the last term is prefix matched.
+    client.put(f"/api/users/{weak['id']}", json={"bio": "Illustration"})
+    assert [u["id"] for u in client.get("/api/users", params={"q": "moti"}).json()] == [strong["id"]]
+    cards = client.get("/api/users", params={"q": "mara", "view": "card", "role": RoleType.designer.value}).json()
+    assert [c["id"] for c in cards] == [strong["id"]]
+
+    jobs = client.get("/api/jobs", params={"q": "reconciliation"}).json()
+    assert [j["title"] for j in jobs] == ["Backend Engineer (Payments)"]
+    assert client.get("/api/jobs", params={"q": '"unbalanced OR'}).status_code == 200
+    assert client.get("/api/users", params={"q": "motion", "cursor": "abc"}).status_code == 400
+
+
+def test_full_text_index_is_only_rewritten_when_indexed_columns_change():
+    def fts_changes(statement):
+        with sqlite3.connect(TEST_DB) as conn:
+            before = conn.total_changes
+            assert conn.execute(statement).rowcount == 1
+            # total_changes also counts the rows written by triggers, FTS5 shadow tables included.
+            return conn.total_changes - before
+
+    assert fts_changes("UPDATE job_posts SET applications_count = applications_count WHERE id = 1") == 1
+    assert fts_changes("UPDATE users SET version = version + 1 WHERE id = 1") == 1
+    assert fts_changes("UPDATE job_posts SET title = title WHERE id = 1") > 1
+
+    # Databases indexed by an older boot have an update trigger without a column list; it is replaced.
+    with db.engine.begin() as connection:
+        connection.execute(text("DROP TRIGGER users_fts_au"))
+        connection.execute(
+            text(
+                "CREATE TRIGGER users_fts_au AFTER UPDATE ON users BEGIN "
+                "INSERT INTO users_fts(users_fts, rowid, name) VALUES ('delete', old.id, old.name); "
+                "INSERT INTO users_fts(rowid, name) VALUES (new.id, new.name); END"
+            )
+        )
+        install_fulltext(connection)
+    assert fts_changes("UPDATE users SET version = version + 1 WHERE id = 1") == 1
+
+
+def test_reads_are_cached_until_a_write_invalidates_them():
+    user = client.post("/api/users", json={"name": "Cache Me", "role": RoleType.founder}).json()
+    response_cache.reset_stats()
+
+    with count_statements(db.engine) as statements:
+        assert client.get(f"/api/users/{user['id']}").json()["name"] == "Cache Me"
+        assert client.get(f"/api/users/{user['id']}").json()["name"] == "Cache Me"
+    assert len(statements) == 1
+    stats = client.get("/api/cache/stats").json()
+    assert stats["backend"] == "lru"
+    assert stats["namespaces"]["users:get"] == {"hits": 1, "misses": 1}
+
+    job = client.post("/api/jobs", json={"title": "Cached Role", "role": RoleType.designer, "owner_id": user["id"]}).json()
+    client.get(f"/api/jobs/{job['id']}")
+    client.get("/api/jobs", params={"skills": ["b", "A"]})
+    client.get("/api/jobs", params={"skills": ["a, b"]})  # Same normalized filter, same key.
+    assert client.get("/api/cache/stats").json()["namespaces"]["jobs:list"] == {"hits": 1, "misses": 1}
+
+    # Renaming the owner invalidates the user and every job view that embeds their name.
+    client.put(f"/api/users/{user['id']}", json={"name": "Cache Renamed"})
+    assert client.get(f"/api/users/{user['id']}").json()["name"] == "Cache Renamed"
+    assert client.get(f"/api/jobs/{job['id']}").json()["owner_name"] == "Cache Renamed"
+
+    client.post(f"/api/jobs/{job['id']}/apply", json={"job_post_id": job["id"], "applicant_id": 4})
+    assert len(client.get(f"/api/jobs/{job['id']}/applications").json()) == 1
+    client.post(f"/api/jobs/{job['id']}/apply", json={"job_post_id": job["id"], "applicant_id": 3})
+    assert len(client.get(f"/api/jobs/{job['id']}/applications").json()) == 2
+
+
+def test_filters_that_match_differently_do_not_share_a_cache_entry():
+    client.post("/api/users", json={"name": "Port Resident", "role": RoleType.founder, "location": "Port Louisville"})
+    client.post("/api/users", json={"name": "City Resident", "role": RoleType.founder, "location": "Louisville"})
+
+    # ilike matches the raw value, so a leading space excludes "Louisville" itself.
+    assert len(client.get("/api/users", params={"location": " Louisville"}).json()) == 1
+    assert len(client.get("/api/users", params={"location": "Louisville"}).json()) == 2
+
+
+def test_async_session_mode_serves_the_same_routes():
+    app.dependency_overrides.update(db.ASYNC_OVERRIDES)
+    try:
+        with cache_disabled(), TestClient(app) as async_client:
+            created = async_client.post(
+                "/api/users", json={"name": "Async User", "role": RoleType.job_seeker, "skills": ["Elixir"]}
+            )
+            assert created.status_code == 201
+            user_id = created.json()["id"]
+            assert async_client.get(f"/api/users/{user_id}").json()["skills"] == ["Elixir"]
+            assert [u["id"] for u in async_client.get("/api/users", params={"skills": "elixir"}).json()] == [user_id]
+            jobs = async_client.get("/api/jobs", params={"limit": 1})
+            assert jobs.status_code == 200 and jobs.json()[0]["owner_name"]
+            applied = async_client.post("/api/jobs/1/apply", json={"job_post_id": 1, "applicant_id": user_id})
+            assert applied.status_code == 201 and applied.json()["job_title"]
+    finally:
+        for dependency in db.ASYNC_OVERRIDES:
+            app.dependency_overrides.pop(dependency, None)
+
+
+def test_signed_tokens_identify_the_caller_without_user_queries():
+    signup = client.post(
+        "/api/auth/signup",
+        json={"name": "Token User", "email": "token@example.com", "password": "pw", "role": RoleType.job_seeker},
+    ).json()
+    user_id, token = signup["user"]["id"], signup["token"]
+    auth = {"Authorization": f"Bearer {token}"}
+    assert verify_token(token) == user_id
+
+    assert client.put(f"/api/users/{user_id}", json={"headline": "Mine"}, headers=auth).status_code == 200
+    assert client.put("/api/users/1", json={"headline": "Not mine"}, headers=auth).status_code == 403
+    tampered = token[:-2] + ("A" if token[-2] != "A" else "B") + token[-1]
+    assert client.put(f"/api/users/{user_id}", json={}, headers={"Authorization": f"Bearer {tampered}"}).status_code == 401
+
+    with count_statements(db.engine) as statements:
+        res = client.post("/api/jobs/1/apply", json={"job_post_id": 1, "applicant_id": user_id}, headers=auth)
+    assert res.status_code == 201
+    assert res.json()["applicant_name"] == "Token User"
+    assert not [sql for sql in statements if "FROM users" in sql]
+
+    owner_token = issue_token(2)
+    job = client.post(
+        "/api/jobs",
+        json={"title": "Token Role", "role": RoleType.designer, "owner_id": 2},
+        headers={"Authorization": f"Bearer {owner_token}"},
+    )
+    assert job.status_code == 201 and job.json()["owner_name"] == "Leo Martinez"
+    assert client.put(f"/api/jobs/{job.json()['id']}", json={"title": "Hijack"}, headers=auth).status_code == 403
+
+    with pytest.raises(InvalidToken):
+        verify_token(token, now=10**12)
+
+
+def test_bulk_ingest_reports_row_errors_without_aborting():
+    users = [
+        {"name": "Bulk One", "email": "bulk.one@example.com", "role": "designer", "skills": "Figma, Bulkimport"},
+        {"name": "Bulk Dup", "email": "bulk.one@example.com", "role": "designer"},
+        {"name": "No Role"},
+        {"name": "Bulk Two", "email": "bulk.two@example.com", "role": "job_seeker", "skills": ["Bulkimport"]},
+    ]
+    res = client.post("/api/users/bulk", json=users)
+    assert res.status_code == 200
+    body = res.json()
+    assert body["inserted"] == 2
+    assert [error["index"] for error in body["errors"]] == [1, 2]
+    first_id, second_id = body["ids"]
+    filtered = client.get("/api/users", params={"skills": "bulkimport"}).json()
+    assert {user["id"] for user in filtered} == {first_id, second_id}
+
+    ndjson = "\n".join(
+        [
+            '{"title": "Bulk Role", "role": "designer", "skills": ["Bulkimport"], "owner_id": 2}',
+            "{not json",
+            f'{{"title": "Bad Owner", "role": "designer", "owner_id": {second_id}}}',
+        ]
+    )
+    res = client.post("/api/jobs/bulk", content=ndjson, headers={"Content-Type": "application/x-ndjson"})
+    body = res.json()
+    assert body["inserted"] == 1
+    assert [error["index"] for error in body["errors"]] == [1, 2]
+    job_id = body["ids"][0]
+
+    res = client.post(
+        f"/api/jobs/{job_id}/applications/bulk",
+        json=[{"applicant_id": first_id}, {"applicant_id": second_id, "cover_letter": "Hi"}, {"applicant_id": 2}],
+    )
+    body = res.json()
+    assert body["inserted"] == 2
+    assert body["errors"] == [{"index": 2, "error": "Job providers cannot apply to roles"}]
+    applications = client.get(f"/api/jobs/{job_id}/applications").json()
+    assert [a["applicant_id"] for a in applications] == [first_id, second_id]
+
+    assert client.post("/api/users/bulk", json={"name": "x"}).status_code == 400
+    assert client.post("/api/jobs/999999/applications/bulk", json=[{"applicant_id": 3}]).status_code == 404
+
+
+
+def test_bulk_imports_queue_match_refreshes_and_an_applicant_digest(monkeypatch, caplog):
+    import background
+    import bulk
+
+    Worker(backoff_base=0).drain()
+    monkeypatch.setattr(bulk, "TASK_BATCH_SIZE", 2)
+    users = [{"name": f"Queued {i}", "role": "designer", "skills": ["Figma", "Queuedbulk"]} for i in range(3)]
+    user_ids = client.post("/api/users/bulk", json=users).json()["ids"]
+    job = {"title": "Digest Role", "role": RoleType.designer, "owner_id": 2}
+    job_id = client.post("/api/jobs", json=job).json()["id"]
+    rows = [{"applicant_id": user_id} for user_id in user_ids]
+    application_ids = client.post(f"/api/jobs/{job_id}/applications/bulk", json=rows).json()["ids"]
+
+    queued = []
+    while (item := get_queue().reserve(0)) is not None:
+        get_queue().ack(item)
+        queued.append((item.name, item.payload))
+    assert queued == [
+        ("refresh_user_matches_batch", {"user_ids": user_ids[:2]}),
+        ("refresh_user_matches_batch", {"user_ids": user_ids[2:]}),
+        ("notify_applications", {"job_post_id": job_id, "application_ids": application_ids}),
+    ]
+
+    for name, payload in queued:
+        with caplog.at_level("INFO", logger="background"):
+            getattr(background, name)(**payload)
+    assert "email to leo@launchcircle.dev: 3 new applicants for Digest Role" in caplog.text
+    with count_statements(db.engine) as statements:
+        matches = client.get(f"/api/users/{user_ids[0]}/matches", params={"limit": 5}).json()
+    assert len(statements) == 1  # Stored by the batch task.
+    assert {match["user_id"] for match in matches} >= set(user_ids[1:])
+
+def test_export_streams_filtered_rows_and_resumes_from_watermark():
+    res = client.get("/api/export/users", params={"role": "job_provider"})
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in res.text.splitlines()]
+    assert rows and all(row["role"] == "job_provider" for row in rows)
+    assert "password_hash" not in rows[0]
+    ids = [row["id"] for row in rows]
+    assert ids == sorted(ids)
+
+    everyone = [json.loads(line)["id"] for line in client.get("/api/export/users").text.splitlines()]
+    resumed = client.get("/api/export/users", params={"after_id": everyone[0]}).text.splitlines()
+    assert [json.loads(line)["id"] for line in resumed] == everyone[1:]
+
+    res = client.get("/api/export/jobs", params={"format": "csv"})
+    assert res.headers["content-type"].startswith("text/csv")
+    jobs = list(csv.DictReader(io.StringIO(res.text)))
+    assert jobs and {"id", "title", "owner_name"} <= jobs[0].keys()
+    assert client.get("/api/export/applications", params={"format": "xml"}).status_code == 422
+
+
+def test_production_boot_migrates_once_then_only_checks_the_revision(tmp_path):
+    from sqlalchemy import create_engine
+
+    from boot import alembic_head, boot_production
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'boot.db'}")
+    with pytest.raises(RuntimeError):
+        boot_production(engine, migrate=False, seed=False)
+
+    first = boot_production(engine, migrate=True, seed=False)
+    assert first.migrated and first.revision == alembic_head()
+
+    with count_statements(engine) as statements:
+        second = boot_production(engine, migrate=True, seed=False)
+    assert not second.migrated and second.revision == first.revision
+    assert len(statements) == 1 and "alembic_version" in statements[0]
+    engine.dispose()
+
+
+def test_metrics_endpoint_and_server_timing():
+    with cache_disabled():
+        res = client.get("/api/users/1")
+    assert res.status_code == 200
+    timing = res.headers["server-timing"]
+    assert 'db;dur=' in timing and 'desc="1 queries"' in timing
+    assert "serialize;dur=" in timing and "total;dur=" in timing
+
+    metrics = client.get("/api/metrics")
+    assert metrics.headers["content-type"].startswith("text/plain")
+    body = metrics.text
+    route = 'route="/api/users/{user_id}"'
+    assert f'launchcircle_http_request_duration_seconds_count{{method="GET",{route},status="200"}}' in body
+    assert f'launchcircle_db_statements_per_request_bucket{{{route},le="1"}}' in body
+    assert "launchcircle_http_requests_in_flight 1" in body  # the scrape itself
+    assert 'launchcircle_db_pool_checked_out{engine="primary"}' in body
+
+
+def test_writes_use_returning_and_retries_are_idempotent():
+    job = {"title": "Retry Role", "role": RoleType.designer, "owner_id": 1}
+    job_id = client.post("/api/jobs", json=job).json()["id"]
+    apply_url = f"/api/jobs/{job_id}/apply"
+    with count_statements(db.engine) as statements:
+        first = client.post(apply_url, json={"job_post_id": job_id, "applicant_id": 4, "cover_letter": "Hi"})
+    assert first.status_code == 201 and first.json()["job_title"] == "Retry Role"
+    # One validation SELECT, the INSERT ... RETURNING and the counter UPDATE; no refresh or relationship loads.
+    assert len(statements) == 3
+    again = client.post(apply_url, json={"job_post_id": job_id, "applicant_id": 4, "cover_letter": "Hi again"})
+    assert again.status_code == 200 and again.json() == first.json()
+    assert len(client.get(f"/api/jobs/{job_id}/applications").json()) == 1
+
+    payload = {"name": "Idem User", "email": "idem@example.com", "role": RoleType.job_seeker, "skills": ["Go"]}
+    headers = {"Idempotency-Key": "create-idem-user"}
+    created = client.post("/api/users", json=payload, headers=headers)
+    with count_statements(db.engine) as statements:
+        replayed = client.post("/api/users", json=payload, headers=headers)
+    assert created.status_code == replayed.status_code == 201
+    assert replayed.json() == created.json() and replayed.headers["idempotent-replayed"] == "true"
+    assert statements == []
+    changed = client.post("/api/users", json={**payload, "name": "Other"}, headers=headers)
+    assert changed.status_code == 422
+
+    user_id = created.json()["id"]
+    updated = client.put(f"/api/users/{user_id}", json={"skills": ["Go", "Rust"], "name": "Idem Renamed"})
+    assert updated.json()["skills"] == ["Go", "Rust"] and updated.json()["name"] == "Idem Renamed"
+    assert user_id in [u["id"] for u in client.get("/api/users", params={"skills": "rust"}).json()]
+    assert client.put("/api/users/999999", json={"name": "Nobody"}).status_code == 404
+
+
+def test_application_counters_follow_applies_and_status_changes():
+    job = {"title": "Counted Role", "role": RoleType.designer, "owner_id": 2}
+    job_id = client.post("/api/jobs", json=job).json()["id"]
+    applied = [
+        client.post(f"/api/jobs/{job_id}/apply", json={"job_post_id": job_id, "applicant_id": applicant}).json()
+        for applicant in (1, 3, 4)
+    ]
+    client.post(f"/api/jobs/{job_id}/apply", json={"job_post_id": job_id, "applicant_id": 3})  # duplicate
+    res = client.patch(f"/api/jobs/{job_id}/applications/{applied[0]['id']}", json={"status": "interviewing"})
+    assert res.status_code == 200 and res.json()["status"] == "interviewing"
+    owner_only = {"Authorization": f"Bearer {issue_token(3)}"}
+    url = f"/api/jobs/{job_id}/applications/{applied[1]['id']}"
+    assert client.patch(url, json={"status": "accepted"}, headers=owner_only).status_code == 403
+    assert client.patch(f"/api/jobs/{job_id}/applications/999999", json={"status": "accepted"}).status_code == 404
+
+    job = client.get(f"/api/jobs/{job_id}").json()
+    assert job["applications_count"] == 3
+    assert job["status_counts"] == {"applied": 2, "reviewed": 0, "interviewing": 1, "rejected": 0, "accepted": 0}
+
+    popular = client.get("/api/jobs", params={"sort": "popular", "limit": 1})
+    assert popular.json()[0]["applications_count"] >= 3
+    cursor = popular.headers["x-next-cursor"]
+    second = client.get("/api/jobs", params={"sort": "popular", "limit": 1, "cursor": cursor})
+    assert second.json()[0]["applications_count"] <= popular.json()[0]["applications_count"]
+    assert client.get("/api/jobs", params={"sort": "popular", "q": "role"}).status_code == 400
+
+    with db.SessionLocal() as session:
+        drift = text("UPDATE job_posts SET applications_count = 99, applied_count = 0 WHERE id = :id")
+        session.execute(drift, {"id": job_id})
+        session.commit()
+        report = reconcile_application_counts(session)
+    assert report.repaired == 1
+    response_cache.invalidate(f"job:{job_id}")
+    assert client.get(f"/api/jobs/{job_id}").json()["applications_count"] == 3
+
+
+def test_background_tasks_run_off_request_with_retries(caplog):
+    worker = Worker(backoff_base=0)
+    worker.drain()
+    payload = {"name": "Queue User", "email": "queue@example.com", "role": RoleType.designer, "skills": ["Figma"]}
+    user_id = client.post("/api/users", json=payload).json()["id"]
+    client.put(f"/api/users/{user_id}", json={"skills": ["Figma", "Python"]})
+    job = {"title": "Queue Role", "role": RoleType.designer, "owner_id": 2}
+    job_id = client.post("/api/jobs", json=job).json()["id"]
+    client.post(f"/api/jobs/{job_id}/apply", json={"job_post_id": job_id, "applicant_id": user_id})
+    assert client.post("/api/auth/forgot", json={"email": "queue@example.com"}).status_code == 200
+    assert get_queue().depth()["pending"] == 4  # create + update refreshes, the notification and the reset email
+
+    live = client.get(f"/api/users/{user_id}/matches", params={"limit": 5}).json()
+    with caplog.at_level("INFO", logger="background"):
+        assert worker.drain() == 4
+    assert "email to leo@launchcircle.dev: New applicant for Queue Role" in caplog.text
+    assert "email to queue@example.com: Reset your LaunchCircle password" in caplog.text
+    with count_statements(db.engine) as statements:
+        stored = client.get(f"/api/users/{user_id}/matches", params={"limit": 5}).json()
+    assert stored == live and len(statements) == 1  # served from user_matches, no index lookups
+
+    calls = []
+
+    @task("flaky_test_task", max_attempts=2)
+    def flaky(n):
+        calls.append(n)
+        if len(calls) == 1:
+            raise RuntimeError("first call fails")
+
+    enqueue("flaky_test_task", n=1)
+    assert worker.run_once() and worker.run_once()
+    assert calls == [1, 1] and get_queue().depth() == {"pending": 0, "dead": 0}
+    metrics = client.get("/api/metrics").text
+    assert 'launchcircle_task_duration_seconds_count{task="flaky_test_task",outcome="retry"} 1' in metrics
+    assert 'launchcircle_task_duration_seconds_count{task="flaky_test_task",outcome="ok"} 1' in metrics
+    assert 'launchcircle_task_queue_depth{backend="sqlite",state="pending"} 0' in metrics
+
+
+
+def test_password_reset_link_carries_a_single_use_token(monkeypatch):
+    import background
+
+    sent = []
+    monkeypatch.setattr(background, "send_email", lambda to, subject, body: sent.append((to, body)))
+    signup = {"name": "Reset Me", "email": "reset@example.com", "password": "old-pw", "role": "founder"}
+    user_id = client.post("/api/auth/signup", json=signup).json()["user"]["id"]
+    background.send_password_reset(email="nobody@example.com")
+    background.send_password_reset(email="reset@example.com")
+    assert [to for to, _ in sent] == ["reset@example.com"]
+    link = next(word for word in sent[0][1].split() if "/reset-password?" in word)
+    query = parse_qs(urlparse(link).query)
+    assert list(query) == ["token"]
+    token = query["token"][0]
+    assert verify_reset_token(token)[0] == user_id
+    with pytest.raises(InvalidToken):
+        verify_token(token)  # Not usable as a session token...
+    session = {"token": issue_token(user_id), "password": "x"}
+    assert client.post("/api/auth/reset", json=session).status_code == 400  # ...nor the other way round.
+
+    assert client.post("/api/auth/reset", json={"token": token, "password": "new-pw"}).status_code == 200
+    assert client.post("/api/auth/login", json={"email": "reset@example.com", "password": "new-pw"}).status_code == 200
+    assert client.post("/api/auth/login", json={"email": "reset@example.com", "password": "old-pw"}).status_code == 401
+    assert client.post("/api/auth/reset", json={"token": token, "password": "again"}).status_code == 400
+
+    version = client.get(f"/api/users/{user_id}").json()["version"]
+    expired = issue_reset_token(user_id, version, now=time.time() - 2 * 24 * 3600)
+    assert client.post("/api/auth/reset", json={"token": expired, "password": "late"}).status_code == 400
+
+def test_conditional_gets_answer_304_from_row_versions():
+    owner = {"name": "Etag Founder", "role": RoleType.founder}
+    owner_id = client.post("/api/users", json=owner).json()["id"]
+    first = client.get(f"/api/users/{owner_id}")
+    etag, modified = first.headers["etag"], first.headers["last-modified"]
+    assert etag == f'W/"user-{owner_id}-1"' and first.json()["version"] == 1
+    with count_statements(db.engine) as statements:
+        res = client.get(f"/api/users/{owner_id}", headers={"If-None-Match": etag})
+    assert res.status_code == 304 and res.content == b"" and res.headers["etag"] == etag
+    assert len(statements) == 1 and "users.version" in statements[0] and "users.bio" not in statements[0]
+    assert client.get(f"/api/users/{owner_id}", headers={"If-Modified-Since": modified}).status_code == 304
+
+    job = {"title": "Etag Role", "role": RoleType.designer, "owner_id": owner_id}
+    job_id = client.post("/api/jobs", json=job).json()["id"]
+    job_etag = client.get(f"/api/jobs/{job_id}").headers["etag"]
+    assert client.get(f"/api/jobs/{job_id}", headers={"If-None-Match": job_etag}).status_code == 304
+    # Applying moves the post's counters, and renaming the owner its embedded name: both are new versions.
+    client.post(f"/api/jobs/{job_id}/apply", json={"job_post_id": job_id, "applicant_id": 1})
+    changed = client.get(f"/api/jobs/{job_id}", headers={"If-None-Match": job_etag})
+    assert changed.status_code == 200 and changed.json()["version"] == 2
+    client.put(f"/api/users/{owner_id}", json={"name": "Etag Founder Renamed"})
+    assert client.get(f"/api/users/{owner_id}", headers={"If-None-Match": etag}).status_code == 200
+    assert client.get(f"/api/jobs/{job_id}").json()["version"] == 3
+
+    page = client.get("/api/jobs", params={"limit": 3})
+    assert page.headers["etag"].startswith('W/"') and "last-modified" in page.headers
+    revalidate = {"If-None-Match": page.headers["etag"]}
+    with cache_disabled(), count_statements(db.engine) as statements:
+        res = client.get("/api/jobs", params={"limit": 3}, headers=revalidate)
+    assert res.status_code == 304 and len(statements) == 1
+    client.put(f"/api/jobs/{job_id}", json={"headline": "Now hiring"})
+    assert client.get("/api/jobs", params={"limit": 3}, headers=revalidate).status_code == 200
+
+
+
+def test_list_etags_differ_between_card_and_full_views():
+    for path in ("/api/users", "/api/jobs"):
+        card = client.get(path, params={"view": "card", "limit": 5})
+        etag = card.headers["ETag"]
+        assert client.get(path, params={"view": "card", "limit": 5}, headers={"If-None-Match": etag}).status_code == 304
+        full = client.get(path, params={"view": "full", "limit": 5}, headers={"If-None-Match": etag})
+        assert full.status_code == 200 and full.headers["ETag"] != etag
+        assert full.json() != card.json()
+
+def test_reads_go_to_replicas_and_writers_read_their_writes(tmp_path):
+    # The replica is a snapshot of the primary that stops receiving changes, i.e. one that lags forever.
+    replica_path = tmp_path / "replica.db"
+    with sqlite3.connect(TEST_DB) as primary, sqlite3.connect(replica_path) as replica:
+        primary.backup(replica)
+    db.configure_replicas([f"sqlite:///{replica_path}"])
+    try:
+        writer, reader = TestClient(app), TestClient(app)
+        with cache_disabled():
+            res = writer.post("/api/users", json={"name": "Replica Lag", "role": RoleType.designer})
+            assert db.PRIMARY_COOKIE in res.cookies
+            user_id = res.json()["id"]
+            assert writer.get(f"/api/users/{user_id}").status_code == 200
+            with count_statements(db.engine) as primary_statements:
+                assert reader.get(f"/api/users/{user_id}").status_code == 404
+                assert reader.get("/api/jobs", params={"limit": 1}).status_code == 200
+            assert primary_statements == []
+    finally:
+        db.configure_replicas([])
+    assert db.engine.pool.size() == db.DB_POOL_SIZE
+
+
+def test_sqlite_production_profile_locks_only_for_writes(tmp_path):
+    url = f"sqlite:///{tmp_path / 'profile.db'}"
+    writer = db._create_engine(url, profile="production")
+    reader = db._create_engine(url, role="reader", profile="production")
+    try:
+        with writer.begin() as conn:
+            conn.execute(text("CREATE TABLE hits (id INTEGER PRIMARY KEY, n INTEGER)"))
+        assert writer.pool.size() == SQLITE_WRITER_CONNECTIONS
+        with writer.connect() as reading, writer.connect() as writing:
+            # A transaction that has only read holds no lock, so another one can write meanwhile.
+            reading.execute(text("SELECT count(*) FROM hits")).scalar()
+            assert not reading.connection.dbapi_connection.in_transaction
+            writing.execute(text("INSERT INTO hits (n) VALUES (0)"))
+            assert writing.connection.dbapi_connection.in_transaction
+            writing.commit()
+            assert reading.execute(text("SELECT count(*) FROM hits")).scalar() == 1
+        with reader.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            with pytest.raises(OperationalError):
+                conn.execute(text("INSERT INTO hits (n) VALUES (1)"))
+
+        def write(n):
+            # Read-then-write: with deferred transactions this is the shape that hits "database is locked".
+            for _ in range(10):
+                with writer.begin() as conn:
+                    conn.execute(text("SELECT count(*) FROM hits")).scalar()
+                    conn.execute(text("INSERT INTO hits (n) VALUES (:n)"), {"n": n})
+
+        threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        with reader.connect() as conn:
+            assert conn.execute(text("SELECT count(*) FROM hits")).scalar() == 41
+        busy, frames, checkpointed = SQLiteMaintenance(writer).run_once()
+        assert busy == 0 and checkpointed == frames
+    finally:
+        writer.dispose()
+        reader.dispose()
+
+
+def test_autocomplete_suggests_by_prefix_and_follows_writes():
+    res = client.get("/api/autocomplete", params={"field": "skills", "prefix": "Rea"})
+    assert res.status_code == 200
+    before = {row["value"].lower(): row["count"] for row in res.json()}
+    assert "react" in before
+    counts = [row["count"] for row in res.json()]
+    assert counts == sorted(counts, reverse=True)
+
+    user = client.post(
+        "/api/users",
+        json={"name": "Typeahead", "role": RoleType.designer, "skills": ["React", "Reasonml"], "location": "Reykjavik"},
+    ).json()
+    with count_statements(db.engine) as statements:
+        res = client.get("/api/autocomplete", params={"field": "skills", "prefix": "rea"})
+        skills = {row["value"].lower(): row["count"] for row in res.json()}
+        places = client.get("/api/autocomplete", params={"field": "location", "prefix": "  rEyk"}).json()
+    assert statements == []
+    assert skills["react"] == before["react"] + 1 and skills["reasonml"] == 1
+    assert places == [{"value": "Reykjavik", "count": 1}]
+
+    client.put(f"/api/users/{user['id']}", json={"skills": ["React"], "location": "Oslo"})
+    assert client.get("/api/autocomplete", params={"field": "location", "prefix": "reyk"}).json() == []
+    assert "Reasonml" not in {row["value"] for row in client.get("/api/autocomplete?field=skills&prefix=rea").json()}
+    roles = client.get("/api/autocomplete", params={"field": "role", "prefix": "", "limit": 3}).json()
+    assert len(roles) == 3
+    assert client.get("/api/autocomplete", params={"field": "bio", "prefix": "a"}).status_code == 422
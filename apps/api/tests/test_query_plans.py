@@ -0,0 +1,191 @@
+# Query-plan regression suite: runs every crud/matching read against a synthetic dataset and checks its plans.
+#
+# Snapshots live in tests/query_plans/<dialect>.json. A scenario fails when it issues more statements than
+# its snapshot or when a plan gains a full table scan or a temporary sort the snapshot does not have.
+# Regenerate after an intentional change with UPDATE_QUERY_PLANS=1 and review the diff.
+# SQLite always runs; set PLAN_POSTGRES_URL to an empty scratch database to check Postgres plans as well.
+import json
+import os
+import pathlib
+import re
+import sys
+
+import pytest
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session
+
+API_DIR = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(API_DIR))
+
+import crud  # noqa: E402
+from helpers import cache_disabled, capture_statements  # noqa: E402
+from matching import find_user_matches, skill_index  # noqa: E402
+from models import Base, JobApplication, JobPost, RoleType, User, UserMatch  # noqa: E402
+from pagination import encode_cursor  # noqa: E402
+from ranking import fit_index  # noqa: E402
+from schemas import AuthLogin  # noqa: E402
+from search import install_fulltext  # noqa: E402
+from seed import seed_synthetic  # noqa: E402
+
+SNAPSHOT_DIR = pathlib.Path(__file__).resolve().parent / "query_plans"
+UPDATE_SNAPSHOTS = os.getenv("UPDATE_QUERY_PLANS", "").lower() in {"1", "true", "yes"}
+USERS = int(os.getenv("PLAN_SUITE_USERS", "3000"))
+JOB_POSTS = USERS // 5
+APPLICATIONS = USERS * 2
+
+# (dialect, pattern) -> plan lines that count as regressions when they are new.
+REGRESSIONS = {
+    "sqlite": (re.compile(r"^SCAN \w+$"), re.compile(r"USE TEMP B-TREE")),
+    "postgresql": (re.compile(r"Seq Scan on \w+"), re.compile(r"^Sort\b")),
+}
+
+SCENARIOS = {
+    "get_user": lambda db, ids: crud.get_user(db, ids["user"]),
+    "list_users": lambda db, ids: crud.list_users(db),
+    "list_users_page_two": lambda db, ids: crud.list_users(db, cursor=ids["user_cursor"]),
+    "list_users_role": lambda db, ids: crud.list_users(db, role=RoleType.designer),
+    "list_users_skills_all": lambda db, ids: crud.list_users(db, skills=["python", "sql"]),
+    "list_users_skills_any": lambda db, ids: crud.list_users(db, skills=["rust", "llms"], skills_match="any"),
+    "list_users_location": lambda db, ids: crud.list_users(db, location="berlin"),
+    "list_users_card": lambda db, ids: crud.list_users(db, view="card"),
+    "list_users_search": lambda db, ids: crud.list_users(db, q="python"),
+    "get_job_post": lambda db, ids: crud.get_job_post(db, ids["job"]),
+    "list_job_posts": lambda db, ids: crud.list_job_posts(db),
+    "list_job_posts_page_two": lambda db, ids: crud.list_job_posts(db, cursor=ids["job_cursor"]),
+    "list_job_posts_role_skills": lambda db, ids: crud.list_job_posts(
+        db, role=RoleType.software_engineer, skills=["react"]
+    ),
+    "list_job_posts_work_style": lambda db, ids: crud.list_job_posts(db, work_style="remote"),
+    "list_job_posts_card": lambda db, ids: crud.list_job_posts(db, view="card"),
+    "list_job_posts_search": lambda db, ids: crud.list_job_posts(db, q="react"),
+    "list_job_posts_popular": lambda db, ids: crud.list_job_posts(db, sort="popular"),
+    "list_job_posts_popular_role": lambda db, ids: crud.list_job_posts(db, role=RoleType.designer, sort="popular"),
+    "list_job_applications": lambda db, ids: crud.list_job_applications(db, ids["job"]),
+    "rank_job_applications": lambda db, ids: crud.rank_job_applications(db, ids["job"]),
+    "recommend_jobs": lambda db, ids: crud.recommend_jobs(db, ids["user"]),
+    "login": lambda db, ids: crud.login(db, AuthLogin(email=ids["email"], password="x")),
+    "find_user_matches": lambda db, ids: find_user_matches(db, ids["user"]),
+    "find_user_matches_precomputed": lambda db, ids: find_user_matches(db, ids["matched_user"], limit=20),
+}
+
+
+def _database_urls():
+    urls = [pytest.param("sqlite", id="sqlite")]
+    if os.getenv("PLAN_POSTGRES_URL"):
+        urls.append(pytest.param("postgresql", id="postgresql"))
+    return urls
+
+
+@pytest.fixture(scope="module", params=_database_urls())
+def plan_db(request, tmp_path_factory):
+    if request.param == "sqlite":
+        url = f"sqlite:///{tmp_path_factory.mktemp('plans') / 'plans.db'}"
+    else:
+        url = os.environ["PLAN_POSTGRES_URL"]
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        install_fulltext(connection)
+    ids = _load_dataset(engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("ANALYZE")
+    skill_index.reset()
+    fit_index.reset()
+    yield engine, ids
+    # The indexes are process-wide; don't leak this dataset into other tests.
+    skill_index.reset()
+    fit_index.reset()
+    engine.dispose()
+
+
+@pytest.mark.parametrize("scenario", list(SCENARIOS))
+def test_query_plans_match_snapshot(plan_db, scenario):
+    engine, ids = plan_db
+    dialect = engine.dialect.name
+    skill_index.reset()
+    fit_index.reset()
+    with cache_disabled(), Session(engine) as db, capture_statements(engine) as statements:
+        SCENARIOS[scenario](db, ids)
+    selects = [(sql, params) for sql, params in statements if sql.lstrip().upper().startswith("SELECT")]
+    observed = {"statements": len(selects), "plans": [_explain(engine, sql, params) for sql, params in selects]}
+
+    snapshot_path = SNAPSHOT_DIR / f"{dialect}.json"
+    snapshots = json.loads(snapshot_path.read_text()) if snapshot_path.exists() else {}
+    if UPDATE_SNAPSHOTS:
+        snapshots[scenario] = observed
+        SNAPSHOT_DIR.mkdir(exist_ok=True)
+        snapshot_path.write_text(json.dumps(snapshots, indent=2, sort_keys=True) + "\n")
+        return
+
+    expected = snapshots.get(scenario)
+    assert expected is not None, f"No {dialect} plan snapshot for {scenario}; run with UPDATE_QUERY_PLANS=1"
+    assert observed["statements"] <= expected["statements"], (
+        f"{scenario} now issues {observed['statements']} statements (snapshot: {expected['statements']})"
+    )
+    known = _regressions(dialect, expected["plans"])
+    new = _regressions(dialect, observed["plans"]) - known
+    assert not new, f"{scenario} plan regressed: {sorted(new)}\n" + json.dumps(observed["plans"], indent=2)
+
+
+def _load_dataset(engine) -> dict:
+    # Same seed every run, so snapshots only change when the queries or indexes do.
+    with Session(engine) as db:
+        seed_synthetic(db, users=USERS, job_posts=JOB_POSTS, applications=APPLICATIONS, rng_seed=13)
+        user = db.execute(select(User.id, User.email).where(User.role == RoleType.software_engineer)).first()
+        job_id = db.execute(
+            select(JobApplication.job_post_id).group_by(JobApplication.job_post_id).order_by(func.count().desc())
+        ).scalar()
+        middle_user = db.execute(select(User.created_at, User.id).order_by(User.id).offset(USERS // 2)).first()
+        middle_post = db.execute(
+            select(JobPost.created_at, JobPost.id).order_by(JobPost.id).offset(JOB_POSTS // 2)
+        ).first()
+        # A stored list for one user, as match_batch.py writes them (the batch job itself needs numpy).
+        matched_user, *candidates = db.execute(select(User.id).order_by(User.id.desc()).limit(51)).scalars()
+        db.execute(
+            insert(UserMatch),
+            [
+                {"user_id": matched_user, "rank": rank, "candidate_id": candidate, "score": 90 - rank}
+                for rank, candidate in enumerate(candidates)
+            ],
+        )
+        db.commit()
+    return {
+        "user": user.id,
+        "email": user.email,
+        "job": job_id,
+        "matched_user": matched_user,
+        "user_cursor": encode_cursor(*middle_user),
+        "job_cursor": encode_cursor(*middle_post),
+    }
+
+
+def _explain(engine, sql: str, params) -> dict:
+    with engine.connect() as connection:
+        if engine.dialect.name == "postgresql":
+            rows = connection.exec_driver_sql(f"EXPLAIN (COSTS OFF) {sql}", params).all()
+            plan = [row[0].strip().removeprefix("-> ").strip() for row in rows]
+        else:
+            rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", params).all()
+            plan = _sqlite_tree(rows)
+    return {"sql": " ".join(sql.split()), "plan": plan}
+
+
+def _sqlite_tree(rows) -> list:
+    # Rows are (id, parent, notused, detail); indent each step under its parent.
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return lines
+
+
+def _regressions(dialect: str, plans: list) -> set:
+    patterns = REGRESSIONS[dialect]
+    return {
+        line.strip()
+        for entry in plans
+        for line in entry["plan"]
+        if any(pattern.search(line.strip()) for pattern in patterns)
+    }
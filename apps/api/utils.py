@@ -16,3 +16,9 @@ def join_csv(items: Iterable[str] | None) -> str:
 
 def normalize_tokens(items: Iterable[str] | None) -> List[str]:
     return [token.strip().lower() for token in items or [] if token and str(token).strip()]
+
+
+def skill_tokens(value: str | Iterable[str] | None, max_length: int = 120) -> List[str]:
+    # Distinct lowercase skill tokens, in first-seen order, as stored in the skill tag tables.
+    items = split_csv(value) if isinstance(value, str) else [part for item in value or [] for part in split_csv(item)]
+    return list(dict.fromkeys(token[:max_length] for token in normalize_tokens(items)))
@@ -0,0 +1,53 @@
+# Standalone background worker for the task queue (tasks.py); the API can also run workers in-process.
+#
+#   python worker.py --concurrency 4 --metrics-port 9100
+import argparse
+import logging
+import signal
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import background
+from metrics import registry
+from tasks import Worker, get_queue
+
+INDEX_MAX_AGE_SECONDS = 300
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        body = registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        pass  # Scrapes would flood the worker log.
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run queued background tasks.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Worker threads")
+    parser.add_argument("--metrics-port", type=int, default=0, help="Serve Prometheus metrics on this port")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    # This process's match index only learns about the users its own tasks touch; rebuild it now and then.
+    background.index_max_age_seconds = INDEX_MAX_AGE_SECONDS
+    if args.metrics_port:
+        server = ThreadingHTTPServer(("0.0.0.0", args.metrics_port), _MetricsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    worker = Worker(get_queue(), concurrency=args.concurrency)
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+    signal.signal(signal.SIGINT, lambda *_: stopping.set())
+    worker.start()
+    logging.getLogger(__name__).info("running %d workers on the %s queue", args.concurrency, worker.queue.name)
+    stopping.wait()
+    worker.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import ApplyForm from './ApplyForm';
 import {notFound} from 'next/navigation';
+import {revalidatingFetch} from '../../../lib/revalidatingFetch';
 
 const apiBase = process.env.NEXT_PUBLIC_API_BASE_URL ?? 'http://localhost:8000';
 
@@ -21,7 +22,7 @@ type Job = {
 
 async function fetchJob(id: string): Promise<Job | null> {
   try {
-    const res = await fetch(`${apiBase}/api/jobs/${id}`, {cache: 'no-store'});
+    const res = await revalidatingFetch(`${apiBase}/api/jobs/${id}`);
     if (!res.ok) return null;
     return (await res.json()) as Job;
   } catch {
@@ -1,3 +1,5 @@
+import {revalidatingFetch} from '../../lib/revalidatingFetch';
+
 const apiBase = process.env.NEXT_PUBLIC_API_BASE_URL ?? 'http://localhost:8000';
 
 type Job = {
@@ -12,24 +14,27 @@ type Job = {
   owner_name?: string | null;
 };
 
-async function fetchJobs(searchParams: URLSearchParams): Promise<Job[]> {
+async function fetchJobs(searchParams: URLSearchParams): Promise<{jobs: Job[]; nextCursor: string | null}> {
   try {
-    const res = await fetch(`${apiBase}/api/jobs?${searchParams.toString()}`, {cache: 'no-store'});
-    if (!res.ok) return [];
-    return (await res.json()) as Job[];
+    const res = await revalidatingFetch(`${apiBase}/api/jobs?${searchParams.toString()}`);
+    if (!res.ok) return {jobs: [], nextCursor: null};
+    return {jobs: (await res.json()) as Job[], nextCursor: res.headers.get('X-Next-Cursor')};
   } catch {
-    return [];
+    return {jobs: [], nextCursor: null};
   }
 }
 
 export default async function JobsPage({searchParams}: {searchParams: Record<string, string | string[] | undefined>}) {
-  const params = new URLSearchParams();
+  const params = new URLSearchParams({view: 'card'});
   if (searchParams.role && typeof searchParams.role === 'string') params.set('role', searchParams.role);
   if (searchParams.location && typeof searchParams.location === 'string') params.set('location', searchParams.location);
   if (searchParams.skills && typeof searchParams.skills === 'string') params.append('skills', searchParams.skills);
   if (searchParams.work_style && typeof searchParams.work_style === 'string') params.set('work_style', searchParams.work_style);
+  if (searchParams.cursor && typeof searchParams.cursor === 'string') params.set('cursor', searchParams.cursor);
 
-  const jobs = await fetchJobs(params);
+  const {jobs, nextCursor} = await fetchJobs(params);
+  const nextParams = new URLSearchParams(params);
+  if (nextCursor) nextParams.set('cursor', nextCursor);
   return (
     <main className="stack surface">
       <div className="page-heading" style={{marginBottom: 8}}>
@@ -92,6 +97,11 @@ export default async function JobsPage({searchParams}: {searchParams: Record<str
         ))}
         {!jobs.length ? <div className="muted">No jobs posted yet.</div> : null}
       </div>
+      {nextCursor ? (
+        <a className="button secondary" href={`/jobs?${nextParams.toString()}`}>
+          Next page
+        </a>
+      ) : null}
     </main>
   );
 }
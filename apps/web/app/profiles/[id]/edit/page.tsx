@@ -46,7 +46,7 @@ export default function EditProfilePage() {
 
   useEffect(() => {
     const load = async () => {
-      const res = await fetch(`${apiBase}/api/users/${id}`, {cache: 'no-store'});
+      const res = await fetch(`${apiBase}/api/users/${id}`, {cache: 'no-cache'});
       if (res.ok) {
         const data = (await res.json()) as UserProfile;
         setUser(data);
@@ -1,4 +1,5 @@
 import {notFound} from 'next/navigation';
+import {revalidatingFetch} from '../../../lib/revalidatingFetch';
 
 type UserProfile = {
   id: number;
@@ -24,7 +25,7 @@ const apiBase = process.env.NEXT_PUBLIC_API_BASE_URL ?? 'http://localhost:8000';
 
 async function fetchUser(id: string): Promise<UserProfile | null> {
   try {
-    const res = await fetch(`${apiBase}/api/users/${id}`, {cache: 'no-store'});
+    const res = await revalidatingFetch(`${apiBase}/api/users/${id}`);
     if (!res.ok) return null;
     return (await res.json()) as UserProfile;
   } catch {
@@ -1,3 +1,5 @@
+import {revalidatingFetch} from '../../lib/revalidatingFetch';
+
 const apiBase = process.env.NEXT_PUBLIC_API_BASE_URL ?? 'http://localhost:8000';
 
 type User = {
@@ -9,25 +11,28 @@ type User = {
   skills: string[];
 };
 
-async function fetchUsers(searchParams: URLSearchParams): Promise<User[]> {
+async function fetchUsers(searchParams: URLSearchParams): Promise<{users: User[]; nextCursor: string | null}> {
   try {
-    const res = await fetch(`${apiBase}/api/users?${searchParams.toString()}`, {cache: 'no-store'});
-    if (!res.ok) return [];
-    return (await res.json()) as User[];
+    const res = await revalidatingFetch(`${apiBase}/api/users?${searchParams.toString()}`);
+    if (!res.ok) return {users: [], nextCursor: null};
+    return {users: (await res.json()) as User[], nextCursor: res.headers.get('X-Next-Cursor')};
   } catch {
-    return [];
+    return {users: [], nextCursor: null};
   }
 }
 
 export default async function ProfilesPage({searchParams}: {searchParams: Record<string, string | string[] | undefined>}) {
-  const params = new URLSearchParams();
+  const params = new URLSearchParams({view: 'card'});
   if (searchParams.role && typeof searchParams.role === 'string') params.set('role', searchParams.role);
   if (searchParams.location && typeof searchParams.location === 'string') params.set('location', searchParams.location);
   if (searchParams.skills && typeof searchParams.skills === 'string') params.append('skills', searchParams.skills);
   if (searchParams.availability && typeof searchParams.availability === 'string') params.set('availability', searchParams.availability);
   if (searchParams.experience && typeof searchParams.experience === 'string') params.set('experience', searchParams.experience);
+  if (searchParams.cursor && typeof searchParams.cursor === 'string') params.set('cursor', searchParams.cursor);
 
-  const users = await fetchUsers(params);
+  const {users, nextCursor} = await fetchUsers(params);
+  const nextParams = new URLSearchParams(params);
+  if (nextCursor) nextParams.set('cursor', nextCursor);
   return (
     <main className="stack surface">
       <div className="page-heading" style={{marginBottom: 8}}>
@@ -95,6 +100,11 @@ export default async function ProfilesPage({searchParams}: {searchParams: Record
         ))}
         {!users.length ? <div className="muted">No profiles yet.</div> : null}
       </div>
+      {nextCursor ? (
+        <a className="button secondary" href={`/profiles?${nextParams.toString()}`}>
+          Next page
+        </a>
+      ) : null}
     </main>
   );
 }
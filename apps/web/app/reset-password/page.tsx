@@ -0,0 +1,61 @@
+"use client";
+
+import {FormEvent, useState} from 'react';
+
+const apiBase = process.env.NEXT_PUBLIC_API_BASE_URL ?? 'http://localhost:8000';
+
+export default function ResetPasswordPage({searchParams}: {searchParams: Record<string, string | string[] | undefined>}) {
+  const token = typeof searchParams.token === 'string' ? searchParams.token : '';
+  const [status, setStatus] = useState<string>('');
+
+  const handleSubmit = async (e: FormEvent<HTMLFormElement>) => {
+    e.preventDefault();
+    const form = new FormData(e.currentTarget);
+    if (form.get('password') !== form.get('confirm')) {
+      setStatus('Passwords do not match.');
+      return;
+    }
+    setStatus('Saving...');
+    const res = await fetch(`${apiBase}/api/auth/reset`, {
+      method: 'POST',
+      headers: {'Content-Type': 'application/json'},
+      body: JSON.stringify({token, password: form.get('password')}),
+    });
+    if (res.ok) {
+      setStatus('Password updated. You can log in now.');
+    } else {
+      const err = await res.json().catch(() => ({}));
+      setStatus(typeof err.detail === 'string' ? err.detail : 'Unable to reset password.');
+    }
+  };
+
+  return (
+    <main className="stack surface">
+      <div className="page-heading">
+        <div>
+          <div className="badge">Reset</div>
+          <h2 style={{margin: '6px 0'}}>Choose a new password</h2>
+          <p className="muted" style={{margin: 0}}>
+            {token ? 'The link works once and expires after an hour.' : <>This link is incomplete. <a href="/auth/forgot">Request a new one</a>.</>}
+          </p>
+        </div>
+      </div>
+      <form className="stack" onSubmit={handleSubmit}>
+        <label>
+          New password
+          <input name="password" type="password" required disabled={!token} />
+        </label>
+        <label>
+          Confirm password
+          <input name="confirm" type="password" required disabled={!token} />
+        </label>
+        <div className="row" style={{justifyContent: 'space-between', alignItems: 'center'}}>
+          <span className="muted">{status}</span>
+          <button className="button" type="submit" disabled={!token}>
+            Save password
+          </button>
+        </div>
+      </form>
+    </main>
+  );
+}
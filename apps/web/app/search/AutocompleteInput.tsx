@@ -0,0 +1,61 @@
+"use client";
+
+import {ChangeEvent, useEffect, useRef, useState} from 'react';
+
+const apiBase = process.env.NEXT_PUBLIC_API_BASE_URL ?? 'http://localhost:8000';
+
+type Suggestion = {value: string; count: number};
+
+type Props = {
+  name: string;
+  field: 'skills' | 'location' | 'role';
+  placeholder?: string;
+  defaultValue?: string;
+  // Comma-separated inputs (skills) complete the last entry and keep the ones before it.
+  multiple?: boolean;
+};
+
+export default function AutocompleteInput({name, field, placeholder, defaultValue = '', multiple = false}: Props) {
+  const [value, setValue] = useState(defaultValue);
+  const [options, setOptions] = useState<string[]>([]);
+  const timer = useRef<ReturnType<typeof setTimeout> | undefined>(undefined);
+  const listId = `${name}-suggestions`;
+
+  useEffect(() => () => clearTimeout(timer.current), []);
+
+  const handleChange = (e: ChangeEvent<HTMLInputElement>) => {
+    const next = e.target.value;
+    setValue(next);
+    clearTimeout(timer.current);
+    const cut = multiple ? next.lastIndexOf(',') + 1 : 0;
+    const head = next.slice(0, cut);
+    const prefix = next.slice(cut).trim();
+    if (!prefix) {
+      setOptions([]);
+      return;
+    }
+    timer.current = setTimeout(async () => {
+      try {
+        const params = new URLSearchParams({field, prefix, limit: '8'});
+        const res = await fetch(`${apiBase}/api/autocomplete?${params.toString()}`);
+        if (!res.ok) return;
+        const suggestions = (await res.json()) as Suggestion[];
+        const spacer = head && !head.endsWith(' ') ? ' ' : '';
+        setOptions(suggestions.map((suggestion) => `${head}${spacer}${suggestion.value}`));
+      } catch {
+        setOptions([]);
+      }
+    }, 120);
+  };
+
+  return (
+    <>
+      <input name={name} placeholder={placeholder} value={value} onChange={handleChange} list={listId} autoComplete="off" />
+      <datalist id={listId}>
+        {options.map((option) => (
+          <option key={option} value={option} />
+        ))}
+      </datalist>
+    </>
+  );
+}
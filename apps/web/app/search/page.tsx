@@ -1,3 +1,5 @@
+import AutocompleteInput from './AutocompleteInput';
+
 const apiBase = process.env.NEXT_PUBLIC_API_BASE_URL ?? 'http://localhost:8000';
 
 type User = {id: number; name: string; headline?: string | null; role: string; location?: string | null; availability?: string | null; skills: string[]};
@@ -24,7 +26,7 @@ async function fetchJobs(params: URLSearchParams): Promise<Job[]> {
 }
 
 export default async function SearchPage({searchParams}: {searchParams: Record<string, string | string[] | undefined>}) {
-  const params = new URLSearchParams();
+  const params = new URLSearchParams({view: 'card'});
   if (searchParams.role && typeof searchParams.role === 'string') params.set('role', searchParams.role);
   if (searchParams.skills && typeof searchParams.skills === 'string') params.append('skills', searchParams.skills);
   if (searchParams.location && typeof searchParams.location === 'string') params.set('location', searchParams.location);
@@ -45,15 +47,15 @@ export default async function SearchPage({searchParams}: {searchParams: Record<s
       <form className="form-grid" method="get" style={{marginBottom: 12}}>
         <label>
           Role
-          <input name="role" placeholder="founder, software_engineer" defaultValue={typeof searchParams.role === 'string' ? searchParams.role : ''} />
+          <AutocompleteInput name="role" field="role" placeholder="founder, software_engineer" defaultValue={typeof searchParams.role === 'string' ? searchParams.role : ''} />
         </label>
         <label>
           Skills (comma)
-          <input name="skills" placeholder="React, Python" defaultValue={typeof searchParams.skills === 'string' ? searchParams.skills : ''} />
+          <AutocompleteInput name="skills" field="skills" multiple placeholder="React, Python" defaultValue={typeof searchParams.skills === 'string' ? searchParams.skills : ''} />
         </label>
         <label>
           Location
-          <input name="location" placeholder="Remote, SF, NYC" defaultValue={typeof searchParams.location === 'string' ? searchParams.location : ''} />
+          <AutocompleteInput name="location" field="location" placeholder="Remote, SF, NYC" defaultValue={typeof searchParams.location === 'string' ? searchParams.location : ''} />
         </label>
         <label>
           Availability
@@ -0,0 +1,27 @@
+// Server-side GETs that revalidate with the API's ETags: on a 304 the remembered body and headers are replayed
+// instead of downloading the JSON again.
+type Entry = {etag: string; body: string; headers: [string, string][]};
+
+const MAX_ENTRIES = 500;
+const entries = new Map<string, Entry>();
+
+function remember(url: string, entry: Entry) {
+  // Map keeps insertion order, so re-inserting makes this the most recently used entry.
+  entries.delete(url);
+  entries.set(url, entry);
+  if (entries.size > MAX_ENTRIES) entries.delete(entries.keys().next().value);
+}
+
+export async function revalidatingFetch(url: string): Promise<Response> {
+  const known = entries.get(url);
+  const res = await fetch(url, {cache: 'no-store', headers: known ? {'If-None-Match': known.etag} : {}});
+  if (res.status === 304 && known) {
+    remember(url, known);
+    return new Response(known.body, {status: 200, headers: known.headers});
+  }
+  const etag = res.headers.get('ETag');
+  if (!res.ok || !etag) return res;
+  const body = await res.text();
+  remember(url, {etag, body, headers: Array.from(res.headers.entries())});
+  return new Response(body, {status: res.status, headers: res.headers});
+}